@@ -1,11 +1,19 @@
 import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output, State, ALL
+from dash.dependencies import Input, Output, State, ALL, ClientsideFunction
+from functools import lru_cache
+from log_tailer import LogTailer
+from ingestion_worker import IngestionWorker
+from log_repository import SEVERITIES, LogRepository
+from log_store import LogStore
+from syslog_receiver import SyslogReceiver
+import metrics
 import pandas as pd
-from risk_identification import get_logs_for_dashboard
 import plotly.express as px
-from datetime import datetime
 import json
+import os
+import threading
+import time
 
 # Initialize Dash app
 app = dash.Dash(
@@ -17,11 +25,104 @@ app = dash.Dash(
 
 # Get the logs data
 file_path = "syslogs.txt"
-logs_for_dashboard = get_logs_for_dashboard(file_path)
-df = pd.DataFrame(logs_for_dashboard)
 
-if 'timestamp' not in df.columns:
-    df['timestamp'] = pd.date_range(end=datetime.now(), periods=len(df), freq='H')
+# How often the browser checks for newly published rows and ingestion progress
+REFRESH_INTERVAL_MS = 2000
+
+# Log list pagination; only the current page is rendered and sent to the browser
+PAGE_SIZES = [25, 50, 100, 200]
+DEFAULT_PAGE_SIZE = 50
+
+# Lines shown when a template group in the grouped view is expanded
+GROUP_MEMBER_LIMIT = 20
+
+# Flagged spike windows listed under the trend chart
+SPIKE_LIST_LIMIT = 10
+
+# With CLIENTSIDE_MODE the server only publishes data: each browser is sent a columnar
+# snapshot of the newest CLIENT_SNAPSHOT_ROWS rows whenever the data version changes, and
+# filtering, paging, statistics, the trend chart and the modal run in assets/dashboard.js.
+# The grouped view needs the server's aggregates, so it is not offered in this mode
+CLIENTSIDE_MODE = False
+CLIENT_SNAPSHOT_ROWS = 5000
+
+# Spike records included in the snapshot, before the browser filters them
+CLIENT_SNAPSHOT_SPIKES = 100
+
+# Time range filter options, pushed down to the repository as a lower bound on event time
+TIME_RANGES = {
+    "all": None,
+    "1h": pd.Timedelta(hours=1),
+    "24h": pd.Timedelta(hours=24),
+    "7d": pd.Timedelta(days=7),
+    "30d": pd.Timedelta(days=30)
+}
+
+# Analyzed logs are persisted here so restarts resume instead of re-classifying;
+# set to None to keep them in memory instead
+STORE_PATH = "analyzed_logs.db"
+
+# Newest rows kept when logs are held in memory; older ones are evicted (None keeps everything)
+MEMORY_MAX_ROWS = 1000000
+
+# With INGEST_IN_PROCESS this process classifies the log file itself, which suits a single
+# server process. Under several workers (gunicorn -w N) set it to False and run
+# `python ingestion_worker.py` once instead: every worker then attaches to STORE_PATH
+# read-only, so classification and the stored rows are not repeated per worker
+INGEST_IN_PROCESS = True
+
+if not INGEST_IN_PROCESS:
+    repository = LogStore(STORE_PATH, read_only=True)
+elif STORE_PATH:
+    repository = LogStore(STORE_PATH)
+else:
+    repository = LogRepository(max_rows=MEMORY_MAX_ROWS)
+
+# Ingestion runs on a background worker started with the server, so importing this module
+# does no I/O and the dashboard can serve partial results while classification continues
+worker = IngestionWorker(repository, LogTailer(file_path)) if INGEST_IN_PROCESS else None
+worker_lock = threading.Lock()
+
+# Syslog listener feeding the same repository as the file tailer; set a port to None to disable it
+SYSLOG_UDP_PORT = None
+SYSLOG_TCP_PORT = None
+receiver = (
+    SyslogReceiver(repository, udp_port=SYSLOG_UDP_PORT, tcp_port=SYSLOG_TCP_PORT)
+    if INGEST_IN_PROCESS and (SYSLOG_UDP_PORT is not None or SYSLOG_TCP_PORT is not None) else None
+)
+
+def start_ingestion():
+    """Start the background ingestion worker, and the syslog receiver if enabled, once per process."""
+    with worker_lock:
+        if worker is not None and worker.ident is None:
+            worker.start()
+        if receiver is not None and receiver.ident is None:
+            receiver.start()
+
+@app.server.before_request
+def ensure_ingestion_started():
+    if worker is not None and worker.ident is None:
+        start_ingestion()
+
+def ingestion_progress():
+    """Return (state, bytes processed, file size in bytes) for the progress indicator.
+
+    Attached workers read the checkpoint the standalone ingester stores with its rows.
+    """
+    if worker is not None:
+        return worker.progress()
+    checkpoint = repository.load_checkpoint(file_path)
+    try:
+        total = os.path.getsize(file_path)
+    except OSError:
+        total = 0
+    processed = checkpoint[1] if checkpoint is not None else 0
+    return "attached", min(processed, total), total
+
+# Prometheus scrape target on the underlying Flask server
+@app.server.route('/metrics')
+def metrics_endpoint():
+    return app.server.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 # Custom CSS
 app.index_string = '''
@@ -128,12 +229,84 @@ app.index_string = '''
                 font-size: 0.9rem;
             }
             
+            .log-card {
+                display: flex;
+                flex-direction: column;
+                min-height: 0;
+            }
+            
             .log-container {
                 flex-grow: 1;
                 overflow-y: auto;
                 padding-right: 0.5rem;
             }
             
+            .pagination {
+                display: flex;
+                align-items: center;
+                gap: 12px;
+                margin-bottom: 1rem;
+            }
+            
+            .pagination button {
+                padding: 0.4rem 0.9rem;
+                border: 1px solid #cbd5e0;
+                border-radius: 6px;
+                background-color: #f8f9fa;
+                cursor: pointer;
+            }
+            
+            .page-info {
+                color: var(--text-secondary);
+                font-size: 0.9rem;
+                flex-grow: 1;
+            }
+            
+            .page-size {
+                width: 140px;
+            }
+            
+            .search-input {
+                width: 100%;
+                box-sizing: border-box;
+                margin-top: 0.75rem;
+                padding: 0.5rem 0.75rem;
+                border: 1px solid #cbd5e0;
+                border-radius: 4px;
+            }
+            
+            .view-mode {
+                margin-top: 0.75rem;
+                display: flex;
+                gap: 12px;
+                font-size: 0.9rem;
+            }
+            
+            .group-count {
+                font-weight: 600;
+                color: var(--text-secondary);
+            }
+            
+            .group-members {
+                display: grid;
+                gap: 0.5rem;
+                margin-top: 0.5rem;
+            }
+            
+            .group-members .log-entry {
+                margin-bottom: 0;
+                background-color: white;
+            }
+            
+            .group-toggle {
+                justify-self: start;
+                padding: 0.25rem 0.75rem;
+                border: 1px solid #cbd5e0;
+                border-radius: 6px;
+                background-color: white;
+                cursor: pointer;
+            }
+            
             .log-entry {
                 padding: 1rem;
                 margin-bottom: 1rem;
@@ -159,6 +332,11 @@ app.index_string = '''
                 line-height: 1.4;
             }
             
+            .spike-list {
+                max-height: 300px;
+                overflow-y: auto;
+            }
+            
             .log-timestamp {
                 color: var(--text-secondary);
                 font-size: 0.9rem;
@@ -283,6 +461,39 @@ app.layout = html.Div([
                     ],
                     value="All",
                     clearable=False
+                ),
+                dcc.Dropdown(
+                    id="time-range-dropdown",
+                    options=[
+                        {"label": "All time", "value": "all"},
+                        {"label": "Last hour", "value": "1h"},
+                        {"label": "Last 24 hours", "value": "24h"},
+                        {"label": "Last 7 days", "value": "7d"},
+                        {"label": "Last 30 days", "value": "30d"}
+                    ],
+                    value="all",
+                    clearable=False,
+                    style={'margin-top': '0.75rem'}
+                ),
+                # Grouped view collapses repeated events into one row per masked template
+                dcc.RadioItems(
+                    id="view-mode",
+                    options=[
+                        {"label": "Each line", "value": "lines"},
+                        {"label": "Group repeated events", "value": "groups"}
+                    ],
+                    value="lines",
+                    inline=True,
+                    className="view-mode",
+                    style={'display': 'none'} if CLIENTSIDE_MODE else None
+                ),
+                # Searched with the inverted index; quote words to match them as a phrase
+                dcc.Input(
+                    id="search-input",
+                    type="search",
+                    placeholder='Search logs, e.g. "dns resolution failed"',
+                    debounce=True,
+                    className="search-input"
                 )
             ], className="card"),
             
@@ -295,13 +506,23 @@ app.layout = html.Div([
                 html.Div(id="stats-content", className="stats-grid")
             ], className="card"),
             
+            # Ingestion progress
+            html.Div([
+                html.H3([
+                    html.I(className="fas fa-spinner"),
+                    "Ingestion"
+                ], className="card-title"),
+                html.Div(id="ingest-progress")
+            ], className="card"),
+            
             # Trend
             html.Div([
                 html.H3([
                     html.I(className="fas fa-chart-line"),
                     "Trend"
                 ], className="card-title"),
-                dcc.Graph(id="time-series-chart")
+                dcc.Graph(id="time-series-chart"),
+                html.Div(id="spike-list", className="spike-list")
             ], className="card")
         ], className="sidebar"),
         
@@ -312,11 +533,31 @@ app.layout = html.Div([
                     html.I(className="fas fa-list"),
                     "System Logs"
                 ], className="card-title"),
+                html.Div([
+                    html.Button([html.I(className="fas fa-chevron-left"), " Previous"], id="prev-page"),
+                    html.Span(id="page-info", className="page-info"),
+                    html.Button(["Next ", html.I(className="fas fa-chevron-right")], id="next-page"),
+                    dcc.Dropdown(
+                        id="page-size-dropdown",
+                        options=[{"label": f"{size} per page", "value": size} for size in PAGE_SIZES],
+                        value=DEFAULT_PAGE_SIZE,
+                        clearable=False,
+                        className="page-size"
+                    )
+                ], className="pagination"),
                 html.Div(id="log-output", className="log-container")
-            ], className="card", style={'height': '100%'})
+            ], className="card log-card", style={'height': '100%'})
         ], className="main-content")
     ], className="layout-container"),
     
+    # Refresh polling; the version bumps whenever the worker publishes new rows
+    dcc.Interval(id="refresh-interval", interval=REFRESH_INTERVAL_MS),
+    dcc.Store(id="data-version", data=0),
+    dcc.Store(id="page-cursor", data=0),
+    dcc.Store(id="expanded-templates", data=[]),
+    # Columnar JSON of the newest rows, only filled in CLIENTSIDE_MODE
+    dcc.Store(id="log-snapshot"),
+    
     # Modal remains the same
     html.Div(id="log-modal", className="modal", style={"display": "none"}, children=[
         html.Div(className="modal-content", children=[
@@ -330,57 +571,181 @@ app.layout = html.Div([
 ])
 
 @app.callback(
-    [Output('log-output', 'children'),
-     Output('stats-content', 'children'),
-     Output('time-series-chart', 'figure')],
-    [Input('severity-dropdown', 'value')]
+    [Output('data-version', 'data'),
+     Output('ingest-progress', 'children')],
+    [Input('refresh-interval', 'n_intervals')],
+    [State('data-version', 'data')]
 )
-def update_dashboard(severity):
-    if severity == "All":
-        filtered_df = df
-    else:
-        filtered_df = df[df['severity'] == severity]
+def refresh_data(n_intervals, data_version):
+    # The version is server-wide, so every client picks up rows as the worker publishes them
+    version = repository.version
+    state, processed, total = ingestion_progress()
+    progress = [
+        html.Progress(value=processed, max=max(total, 1), style={'width': '100%'}),
+        html.Div(f"{state.capitalize()} · {log_count(version)} logs · "
+                 f"{processed / total:.0%} of file" if total else f"{state.capitalize()} · no data yet",
+                 className="stat-label")
+    ]
     
-    # Logs display with suggestions
-    logs_display = []
-    for i, (_, row) in enumerate(filtered_df.iterrows()):
-        current_severity = row['severity']
-        log_entry = html.Div([
-            # Log header
+    if version == data_version:
+        return dash.no_update, progress
+    return version, progress
+
+@lru_cache(maxsize=2)
+def log_count(data_version):
+    """Number of stored logs, counted once per data version instead of on every client's refresh."""
+    return repository.count('All')
+
+def server_callback(*args, **kwargs):
+    """app.callback, except in CLIENTSIDE_MODE, where the browser handles the callback instead."""
+    if CLIENTSIDE_MODE:
+        return lambda function: function
+    return app.callback(*args, **kwargs)
+
+def time_range_start(time_range):
+    """Lower bound on event time for a time range, floored to the minute so it can key caches."""
+    delta = TIME_RANGES.get(time_range)
+    if delta is None:
+        return None
+    return (pd.Timestamp.now() - delta).floor('min')
+
+def page_count(total_rows, page_size):
+    """Number of pages needed to show total_rows, at least one."""
+    return max(1, -(-total_rows // page_size))
+
+@server_callback(
+    Output('page-cursor', 'data'),
+    [Input('prev-page', 'n_clicks'),
+     Input('next-page', 'n_clicks'),
+     Input('severity-dropdown', 'value'),
+     Input('time-range-dropdown', 'value'),
+     Input('search-input', 'value'),
+     Input('view-mode', 'value'),
+     Input('page-size-dropdown', 'value')],
+    [State('page-cursor', 'data')]
+)
+def change_page(prev_clicks, next_clicks, severity, time_range, query, view_mode, page_size, page):
+    ctx = dash.callback_context
+    triggered_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else None
+    page = page or 0
+    
+    # A new filter or page size starts again from the first page
+    if triggered_id == 'prev-page':
+        return max(0, page - 1)
+    if triggered_id == 'next-page':
+        count = repository.group_count if view_mode == "groups" else repository.count
+        total_rows = count(severity, time_range_start(time_range), query)
+        last_page = page_count(total_rows, page_size) - 1
+        return min(page + 1, last_page)
+    return 0
+
+SEVERITY_ICONS = {
+    'Critical': 'fas fa-exclamation-circle',
+    'Warning': 'fas fa-exclamation-triangle',
+    'Info': 'fas fa-info-circle'
+}
+
+@lru_cache(maxsize=128)
+@metrics.STAGE_SECONDS.time(stage="render")
+def render_page(severity, since, query, page, page_size, data_version):
+    """Log entries and page indicator for one page, memoized per data version."""
+    total_rows = repository.count(severity, since, query)
+    total_pages = page_count(total_rows, page_size)
+    page = min(page, total_pages - 1)
+    start = page * page_size
+    page_df = repository.page(severity, start, start + page_size, since, query)
+    page_info = (f"Page {page + 1} of {total_pages} · "
+                 f"rows {min(start + 1, total_rows)}–{start + len(page_df)} of {total_rows}")
+    
+    logs_display = [
+        render_log_entry(row, f"Log Entry {i+1}", severity)
+        for i, row in enumerate(page_df.to_dict('records'), start=start)
+    ]
+    return logs_display, page_info
+
+def render_log_entry(row, label, severity):
+    """One clickable log card; the id lets the modal look the log up server-side."""
+    current_severity = row['severity']
+    return html.Div([
+        # Log header
+        html.Div([
+            html.I(className=SEVERITY_ICONS.get(current_severity)),
+            html.Span(label),
+            html.Span(current_severity, className=f"severity-badge badge-{current_severity.lower()}")
+        ], className="log-header"),
+        # Log content
+        html.Div(row['log'], className="log-content"),
+        # Timestamp
+        html.Div(row['timestamp'].strftime('%Y-%m-%d %H:%M:%S'), className="log-timestamp")
+    ], 
+    className=f"log-entry severity-all-{current_severity.lower()}" if severity == "All" 
+    else f"log-entry severity-{current_severity.lower()}", 
+    id={'type': 'log-entry', 'index': row['id']})
+
+@lru_cache(maxsize=128)
+@metrics.STAGE_SECONDS.time(stage="render")
+def render_group_page(severity, since, query, page, page_size, expanded, data_version):
+    """One page of template groups, with members listed for the expanded ones."""
+    total_groups = repository.group_count(severity, since, query)
+    total_pages = page_count(total_groups, page_size)
+    page = min(page, total_pages - 1)
+    start = page * page_size
+    groups = repository.groups(severity, start, start + page_size, since, query)
+    page_info = (f"Page {page + 1} of {total_pages} · "
+                 f"events {min(start + 1, total_groups)}–{start + len(groups)} of {total_groups}")
+
+    groups_display = []
+    for group in groups.to_dict('records'):
+        group_severity = group['severity']
+        is_expanded = group['template'] in expanded
+        children = [
             html.Div([
-                html.I(className={
-                    'Critical': 'fas fa-exclamation-circle',
-                    'Warning': 'fas fa-exclamation-triangle',
-                    'Info': 'fas fa-info-circle'
-                }.get(current_severity)),
-                html.Span(f"Log Entry {i+1}"),
-                html.Span(current_severity, className=f"severity-badge badge-{current_severity.lower()}")
+                html.I(className=SEVERITY_ICONS.get(group_severity)),
+                html.Span(f"{group['count']}×", className="group-count"),
+                html.Span(group_severity, className=f"severity-badge badge-{group_severity.lower()}")
             ], className="log-header"),
-            # Log content
-            html.Div(row['log'], className="log-content"),
-            # Add suggestion and explanation as hidden divs
-            html.Div(row['suggestion'], style={'display': 'none'}, className="log-suggestion"),
-            html.Div(row['explanation'], style={'display': 'none'}, className="log-explanation"),
-            # Timestamp
-            html.Div(row['timestamp'].strftime('%Y-%m-%d %H:%M:%S'), className="log-timestamp")
-        ], 
-        className=f"log-entry severity-all-{current_severity.lower()}" if severity == "All" 
-        else f"log-entry severity-{current_severity.lower()}", 
-        id={'type': 'log-entry', 'index': row['id']})
-        logs_display.append(log_entry)
+            html.Div(group['template'], className="log-content"),
+            html.Div(f"First seen {group['first_seen']:%Y-%m-%d %H:%M:%S} · "
+                     f"last seen {group['last_seen']:%Y-%m-%d %H:%M:%S}", className="log-timestamp"),
+            html.Button(
+                "Hide lines" if is_expanded else f"Show {min(group['count'], GROUP_MEMBER_LIMIT)} of {group['count']} lines",
+                id={'type': 'group-toggle', 'index': group['template']},
+                className="group-toggle"
+            )
+        ]
+        # Members are only fetched for groups the user opened
+        if is_expanded:
+            members = repository.members(group['template'], severity, GROUP_MEMBER_LIMIT, since, query)
+            children.append(html.Div([
+                render_log_entry(row, f"Occurrence {i+1}", severity)
+                for i, row in enumerate(members.to_dict('records'))
+            ], className="group-members"))
+        groups_display.append(html.Div(
+            children,
+            className=f"log-entry severity-all-{group_severity.lower()}" if severity == "All"
+            else f"log-entry severity-{group_severity.lower()}"
+        ))
+
+    return groups_display, page_info
+
+@lru_cache(maxsize=32)
+@metrics.STAGE_SECONDS.time(stage="render")
+def render_summary(severity, since, query, data_version):
+    """Statistics, trend figure and flagged spikes for a filter, built from precomputed aggregates."""
+    total, unique, latest = repository.stats(severity, since, query)
     
     # Statistics
     stats = [
         html.Div([
-            html.Div(str(len(filtered_df)), className="stat-value"),
+            html.Div(str(total), className="stat-value"),
             html.Div("Total Logs", className="stat-label")
         ], className="stat-item"),
         html.Div([
-            html.Div(str(filtered_df['log'].nunique()), className="stat-value"),
+            html.Div(str(unique), className="stat-value"),
             html.Div("Unique Events", className="stat-label")
         ], className="stat-item"),
         html.Div([
-            html.Div(filtered_df['timestamp'].max().strftime('%H:%M'), className="stat-value"),
+            html.Div(latest.strftime('%H:%M') if latest is not None else "-", className="stat-value"),
             html.Div("Latest Event", className="stat-label")
         ], className="stat-item")
     ]
@@ -388,9 +753,8 @@ def update_dashboard(severity):
     # Time series chart
     if severity == "All":
         # Create stacked bar chart for "All" view
-        df_grouped = filtered_df.groupby(['timestamp', 'severity']).size().unstack(fill_value=0).reset_index()
         time_series = px.bar(
-            df_grouped,
+            repository.series(severity, since, query),
             x='timestamp',
             y=['Critical', 'Warning', 'Info'],
             title="Logs Frequency by Severity",
@@ -404,7 +768,7 @@ def update_dashboard(severity):
     else:
         # Single line chart for specific severity
         time_series = px.line(
-            filtered_df.groupby('timestamp').size().reset_index(name='count'),
+            repository.series(severity, since, query),
             x='timestamp',
             y='count',
             title=f"{severity} Logs Frequency"
@@ -425,23 +789,98 @@ def update_dashboard(severity):
         showlegend=True if severity == "All" else False,
         height=200
     )
-    
-    return logs_display, stats, time_series
 
-# Modal callback remains the same
+    # Flagged windows are shaded on the chart and listed under it
+    spikes = repository.spikes(severity, SPIKE_LIST_LIMIT, since)
+    for spike in spikes.itertuples():
+        time_series.add_vrect(
+            x0=spike.window_start, x1=spike.window_end, line_width=0, opacity=0.2,
+            fillcolor={'Critical': '#ff4757', 'Warning': '#ffa502', 'Info': '#2e86de'}.get(spike.severity)
+        )
+    spike_list = [render_spike(spike) for spike in spikes.to_dict('records')]
+
+    return stats, time_series, spike_list
+
+def render_spike(spike):
+    """One flagged window: what spiked, by how much, and when."""
+    baseline = spike['baseline']
+    ratio = f"{spike['count'] / baseline:.0f}x baseline" if baseline >= 1 else "new"
+    minutes = (spike['window_end'] - spike['window_start']).total_seconds() / 60
+    subject = f"{spike['key']} logs" if spike['kind'] == 'severity' else spike['key']
+    return html.Div([
+        html.Div([
+            html.I(className=SEVERITY_ICONS.get(spike['severity'])),
+            html.Span(f"Spike: {spike['count']} in {minutes:.0f} min ({ratio})"),
+            html.Span(spike['severity'], className=f"severity-badge badge-{spike['severity'].lower()}")
+        ], className="log-header"),
+        html.Div(subject, className="log-content"),
+        html.Div(f"{spike['window_start']:%Y-%m-%d %H:%M}–{spike['window_end']:%H:%M}", className="log-timestamp")
+    ], className=f"log-entry severity-{spike['severity'].lower()}")
+
+@server_callback(
+    [Output('log-output', 'children'),
+     Output('stats-content', 'children'),
+     Output('time-series-chart', 'figure'),
+     Output('spike-list', 'children'),
+     Output('page-info', 'children')],
+    [Input('severity-dropdown', 'value'),
+     Input('time-range-dropdown', 'value'),
+     Input('search-input', 'value'),
+     Input('view-mode', 'value'),
+     Input('expanded-templates', 'data'),
+     Input('data-version', 'data'),
+     Input('page-cursor', 'data'),
+     Input('page-size-dropdown', 'value')]
+)
+@metrics.CALLBACK_SECONDS.time(callback="update_dashboard")
+def update_dashboard(severity, time_range, query, view_mode, expanded, data_version, page, page_size):
+    # Outputs are memoized on the filters and the server's data version, not the client's copy
+    version = repository.version
+    since = time_range_start(time_range)
+    query = (query or "").strip()
+    if view_mode == "groups":
+        logs_display, page_info = render_group_page(
+            severity, since, query, page or 0, page_size, tuple(sorted(expanded or [])), version
+        )
+    else:
+        logs_display, page_info = render_page(severity, since, query, page or 0, page_size, version)
+    stats, time_series, spike_list = render_summary(severity, since, query, version)
+    return logs_display, stats, time_series, spike_list, page_info
+
+# Expanding a group toggles its template in the store; re-rendered buttons fire with n_clicks=None
 @app.callback(
+    Output('expanded-templates', 'data'),
+    [Input({'type': 'group-toggle', 'index': ALL}, 'n_clicks')],
+    [State('expanded-templates', 'data')]
+)
+def toggle_group(toggle_n_clicks, expanded):
+    ctx = dash.callback_context
+    if not ctx.triggered or not ctx.triggered[0]['value']:
+        return dash.no_update
+    template = json.loads(ctx.triggered[0]['prop_id'].rsplit('.', 1)[0])['index']
+    expanded = list(expanded or [])
+    if template in expanded:
+        expanded.remove(template)
+    else:
+        expanded.append(template)
+    return expanded
+
+# Modal details come from the server-side index, not from the rendered entries
+@server_callback(
     [Output('log-modal', 'style'),
      Output('modal-log-content', 'children'),
      Output('modal-suggestion', 'children'),
      Output('modal-explanation', 'children')],
     [Input({'type': 'log-entry', 'index': ALL}, 'n_clicks'),
-     Input('close-modal', 'n_clicks')],
-    [State('log-output', 'children')]
+     Input('close-modal', 'n_clicks')]
 )
-def manage_modal_display(log_n_clicks, close_n_clicks, log_entries):
+@metrics.CALLBACK_SECONDS.time(callback="manage_modal_display")
+def manage_modal_display(log_n_clicks, close_n_clicks):
     ctx = dash.callback_context
-    if not ctx.triggered:
-        return {"display": "none"}, "", "", ""
+    # Freshly rendered entries fire with n_clicks=None whenever new rows re-render the list;
+    # only real clicks change the modal, so one already open stays open
+    if not ctx.triggered or not ctx.triggered[0]['value']:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
     
     triggered_id = ctx.triggered[0]['prop_id'].split('.')[0]
     
@@ -450,33 +889,121 @@ def manage_modal_display(log_n_clicks, close_n_clicks, log_entries):
     
     try:
         log_id = json.loads(triggered_id)['index']
-        for entry in log_entries:
-            if entry['props']['id']['index'] == log_id:
-                log_content = entry['props']['children'][1]['props']['children']
-                suggestion = entry['props']['children'][2]['props']['children']
-                explanation = entry['props']['children'][3]['props']['children']
-                
-                modal_content = [
-                    html.H4("Log Message:", style={'margin-bottom': '8px'}),
-                    html.Div(log_content, style={'margin-bottom': '20px'}),
-                ]
-                
-                suggestion_content = [
-                    html.H4("Suggested Solution:", style={'margin-bottom': '8px'}),
-                    html.Div(suggestion, style={'margin-bottom': '20px'})
-                ]
-                
-                explanation_content = [
-                    html.H4("Explanation:", style={'margin-bottom': '8px'}),
-                    html.Div(explanation)
-                ]
-                
-                return {"display": "block"}, modal_content, suggestion_content, explanation_content
+        log = repository.get(log_id)
+        if log is not None:
+            modal_content = [
+                html.H4("Log Message:", style={'margin-bottom': '8px'}),
+                html.Div(log['log'], style={'margin-bottom': '20px'}),
+            ]
+            
+            suggestion_content = [
+                html.H4("Suggested Solution:", style={'margin-bottom': '8px'}),
+                html.Div(log['suggestion'], style={'margin-bottom': '20px'})
+            ]
+            
+            explanation_content = [
+                html.H4("Explanation:", style={'margin-bottom': '8px'}),
+                html.Div(log['explanation'])
+            ]
+            
+            return {"display": "block"}, modal_content, suggestion_content, explanation_content
     except Exception as e:
         print(f"Error in modal callback: {e}")
     
     return {"display": "none"}, "", "", ""
 
+def dictionary_encode(values, categories=None):
+    """(codes, categories) for a column, so each distinct string is sent once; missing values get code -1."""
+    categorical = pd.Categorical(values, categories=categories)
+    return categorical.codes.tolist(), categorical.categories.tolist()
+
+def epoch_seconds(timestamps):
+    """Naive timestamps as whole seconds since the epoch, read as UTC so the browser shows them unchanged."""
+    return timestamps.to_numpy().astype('datetime64[s]').astype('int64').tolist()
+
+@lru_cache(maxsize=2)
+@metrics.STAGE_SECONDS.time(stage="snapshot")
+def snapshot_json(data_version):
+    """Columnar JSON of the newest rows and spikes for the browser, built once per data version."""
+    frame = repository.tail(CLIENT_SNAPSHOT_ROWS)
+    spikes = repository.spikes('All', CLIENT_SNAPSHOT_SPIKES)
+    severity_codes, _ = dictionary_encode(frame['severity'], SEVERITIES)
+    snapshot = {
+        'version': data_version,
+        'total': repository.count('All'),
+        # Server local time minus UTC, so the browser applies time ranges on the server's clock
+        'clock_offset': round(pd.Timestamp.now().timestamp() - time.time()),
+        'time_ranges': {key: delta.total_seconds() if delta is not None else None for key, delta in TIME_RANGES.items()},
+        'spike_limit': SPIKE_LIST_LIMIT,
+        'severities': SEVERITIES,
+        'id': frame['id'].tolist(),
+        'log': frame['log'].tolist(),
+        'timestamp': epoch_seconds(frame['timestamp']),
+        'severity': severity_codes,
+        'spikes': {
+            'kind': spikes['kind'].tolist(),
+            'key': spikes['key'].tolist(),
+            'severity': spikes['severity'].tolist(),
+            'window_start': epoch_seconds(spikes['window_start']),
+            'window_end': epoch_seconds(spikes['window_end']),
+            'count': spikes['count'].tolist(),
+            'baseline': spikes['baseline'].tolist()
+        }
+    }
+    for column in ['template', 'suggestion', 'explanation']:
+        snapshot[column], snapshot[column + 's'] = dictionary_encode(frame[column])
+    # Sent as a string: every viewer of a version gets the same bytes without re-encoding
+    return json.dumps(snapshot, separators=(',', ':'))
+
+@metrics.CALLBACK_SECONDS.time(callback="publish_snapshot")
+def publish_snapshot(data_version):
+    return snapshot_json(repository.version)
+
+# In CLIENTSIDE_MODE the browser computes the dashboard from the snapshot (assets/dashboard.js),
+# and the server's only work per viewer is the refresh poll and one snapshot per data version
+if CLIENTSIDE_MODE:
+    app.callback(Output('log-snapshot', 'data'), [Input('data-version', 'data')])(publish_snapshot)
+
+    app.clientside_callback(
+        ClientsideFunction(namespace='pinto', function_name='change_page'),
+        Output('page-cursor', 'data'),
+        [Input('prev-page', 'n_clicks'),
+         Input('next-page', 'n_clicks'),
+         Input('severity-dropdown', 'value'),
+         Input('time-range-dropdown', 'value'),
+         Input('search-input', 'value'),
+         Input('page-size-dropdown', 'value')],
+        [State('page-cursor', 'data'),
+         State('log-snapshot', 'data')]
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace='pinto', function_name='update_dashboard'),
+        [Output('log-output', 'children'),
+         Output('stats-content', 'children'),
+         Output('time-series-chart', 'figure'),
+         Output('spike-list', 'children'),
+         Output('page-info', 'children')],
+        [Input('severity-dropdown', 'value'),
+         Input('time-range-dropdown', 'value'),
+         Input('search-input', 'value'),
+         Input('log-snapshot', 'data'),
+         Input('page-cursor', 'data'),
+         Input('page-size-dropdown', 'value')]
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace='pinto', function_name='manage_modal_display'),
+        [Output('log-modal', 'style'),
+         Output('modal-log-content', 'children'),
+         Output('modal-suggestion', 'children'),
+         Output('modal-explanation', 'children')],
+        [Input({'type': 'log-entry', 'index': ALL}, 'n_clicks'),
+         Input('close-modal', 'n_clicks')],
+        [State('log-snapshot', 'data')]
+    )
+
 if __name__ == '__main__':
+    # Ingestion starts with the first request, which is served by the reloader's child process
     app.run_server(debug=True)
     
\ No newline at end of file
@@ -0,0 +1,343 @@
+// Browser side of CLIENTSIDE_MODE (see app.py). The server publishes a columnar snapshot of
+// the newest rows to the log-snapshot store; these callbacks filter, page and render it, and
+// open the modal, without a round-trip. They mirror update_dashboard, change_page and
+// manage_modal_display in app.py, so both modes show the same thing for the same rows.
+(function () {
+    const SEVERITY_COLORS = {Critical: '#ff4757', Warning: '#ffa502', Info: '#2e86de'};
+    const SEVERITY_ICONS = {
+        Critical: 'fas fa-exclamation-circle',
+        Warning: 'fas fa-exclamation-triangle',
+        Info: 'fas fa-info-circle'
+    };
+
+    // Width of the trend chart buckets in seconds (TREND_BUCKET on the server)
+    const TREND_BUCKET_SECONDS = 3600;
+
+    // Tokens are runs of letters and digits, lowercased, as in search_index.tokenize
+    const TOKEN_PATTERN = /[\p{L}\p{N}]+/gu;
+
+    // The parsed snapshot, and the rows matching the last filter, reused until either changes
+    let parsed = {json: null, data: null};
+    let filtered = {key: null, rows: null};
+
+    function load(snapshot) {
+        if (!snapshot) {
+            return null;
+        }
+        if (parsed.json !== snapshot) {
+            const data = JSON.parse(snapshot);
+            data.positions = new Map(data.id.map((id, i) => [id, i]));
+            // Tokenized lazily, the first time a search needs a row
+            data.tokens = new Array(data.id.length);
+            parsed = {json: snapshot, data};
+            filtered = {key: null, rows: null};
+        }
+        return parsed.data;
+    }
+
+    function tokenize(text) {
+        return text.toLowerCase().match(TOKEN_PATTERN) || [];
+    }
+
+    function parseQuery(text) {
+        // Quoted text is one phrase, every other word a single-token phrase (search_index.parse_query)
+        const phrases = [];
+        for (const [, quoted, bare] of (text || '').matchAll(/"([^"]*)"?|(\S+)/g)) {
+            if (quoted !== undefined) {
+                const tokens = tokenize(quoted);
+                if (tokens.length) {
+                    phrases.push(tokens);
+                }
+            } else {
+                for (const token of tokenize(bare)) {
+                    phrases.push([token]);
+                }
+            }
+        }
+        return phrases;
+    }
+
+    function containsPhrase(tokens, phrase) {
+        for (let start = 0; start + phrase.length <= tokens.length; start++) {
+            if (phrase.every((token, offset) => tokens[start + offset] === token)) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    function timeRangeStart(data, timeRange) {
+        // Floored to the minute on the server's clock, like time_range_start
+        const seconds = data.time_ranges[timeRange];
+        if (seconds === null || seconds === undefined) {
+            return null;
+        }
+        const now = Date.now() / 1000 + data.clock_offset;
+        return Math.floor((now - seconds) / 60) * 60;
+    }
+
+    function filterRows(data, severity, since, query) {
+        const key = JSON.stringify([severity, since, query || '']);
+        if (filtered.key === key) {
+            return filtered.rows;
+        }
+        const code = data.severities.indexOf(severity);
+        const phrases = parseQuery(query);
+        const rows = [];
+        for (let i = 0; i < data.id.length; i++) {
+            if (severity !== 'All' && data.severity[i] !== code) {
+                continue;
+            }
+            if (since !== null && data.timestamp[i] < since) {
+                continue;
+            }
+            if (phrases.length) {
+                const tokens = data.tokens[i] || (data.tokens[i] = tokenize(data.log[i]));
+                if (!phrases.every(phrase => containsPhrase(tokens, phrase))) {
+                    continue;
+                }
+            }
+            rows.push(i);
+        }
+        filtered = {key, rows};
+        return rows;
+    }
+
+    function pageCount(totalRows, pageSize) {
+        return Math.max(1, Math.ceil(totalRows / pageSize));
+    }
+
+    function formatTime(seconds) {
+        // Timestamps are naive server times encoded as UTC, so UTC formatting shows them unchanged
+        return new Date(seconds * 1000).toISOString().slice(0, 19).replace('T', ' ');
+    }
+
+    function dictionaryValue(data, column, i) {
+        const code = data[column][i];
+        return code >= 0 ? data[column + 's'][code] : '';
+    }
+
+    function element(type, props, children) {
+        return {type, namespace: 'dash_html_components', props: Object.assign({children}, props)};
+    }
+
+    function entryClass(severity, filterSeverity) {
+        return filterSeverity === 'All'
+            ? `log-entry severity-all-${severity.toLowerCase()}`
+            : `log-entry severity-${severity.toLowerCase()}`;
+    }
+
+    function renderLogEntry(data, i, label, filterSeverity) {
+        const severity = data.severities[data.severity[i]];
+        return element('Div', {
+            className: entryClass(severity, filterSeverity),
+            id: {type: 'log-entry', index: data.id[i]}
+        }, [
+            element('Div', {className: 'log-header'}, [
+                element('I', {className: SEVERITY_ICONS[severity]}),
+                element('Span', {}, label),
+                element('Span', {className: `severity-badge badge-${severity.toLowerCase()}`}, severity)
+            ]),
+            element('Div', {className: 'log-content'}, data.log[i]),
+            element('Div', {className: 'log-timestamp'}, formatTime(data.timestamp[i]))
+        ]);
+    }
+
+    function renderStats(data, rows) {
+        const templates = new Set();
+        let latest = null;
+        for (const i of rows) {
+            templates.add(data.template[i]);
+            if (latest === null || data.timestamp[i] > latest) {
+                latest = data.timestamp[i];
+            }
+        }
+        const item = (value, label) => element('Div', {className: 'stat-item'}, [
+            element('Div', {className: 'stat-value'}, value),
+            element('Div', {className: 'stat-label'}, label)
+        ]);
+        return [
+            item(String(rows.length), 'Total Logs'),
+            item(String(templates.size), 'Unique Events'),
+            item(latest !== null ? formatTime(latest).slice(11, 16) : '-', 'Latest Event')
+        ];
+    }
+
+    function selectSpikes(data, severity, since) {
+        const spikes = data.spikes;
+        const selected = [];
+        for (let i = 0; i < spikes.kind.length && selected.length < data.spike_limit; i++) {
+            if (severity !== 'All' && spikes.severity[i] !== severity) {
+                continue;
+            }
+            if (since !== null && spikes.window_end[i] < since) {
+                continue;
+            }
+            selected.push({
+                kind: spikes.kind[i],
+                key: spikes.key[i],
+                severity: spikes.severity[i],
+                window_start: spikes.window_start[i],
+                window_end: spikes.window_end[i],
+                count: spikes.count[i],
+                baseline: spikes.baseline[i]
+            });
+        }
+        return selected;
+    }
+
+    function renderFigure(data, rows, severity, spikes) {
+        const counts = new Map();
+        for (const i of rows) {
+            const bucket = Math.floor(data.timestamp[i] / TREND_BUCKET_SECONDS) * TREND_BUCKET_SECONDS;
+            let bucketCounts = counts.get(bucket);
+            if (!bucketCounts) {
+                counts.set(bucket, bucketCounts = data.severities.map(() => 0));
+            }
+            bucketCounts[data.severity[i]] += 1;
+        }
+        const buckets = Array.from(counts.keys()).sort((a, b) => a - b);
+        const x = buckets.map(formatTime);
+
+        let traces;
+        let title;
+        if (severity === 'All') {
+            // Stacked bars for the "All" view
+            traces = data.severities.map((name, code) => ({
+                type: 'bar', name, x, y: buckets.map(bucket => counts.get(bucket)[code]),
+                marker: {color: SEVERITY_COLORS[name]}
+            }));
+            title = 'Logs Frequency by Severity';
+        } else {
+            const code = data.severities.indexOf(severity);
+            traces = [{
+                type: 'scatter', mode: 'lines', name: severity, x, y: buckets.map(bucket => counts.get(bucket)[code]),
+                line: {color: SEVERITY_COLORS[severity]}
+            }];
+            title = `${severity} Logs Frequency`;
+        }
+
+        // Flagged windows are shaded on the chart, as on the server
+        const shapes = spikes.map(spike => ({
+            type: 'rect', xref: 'x', yref: 'paper', y0: 0, y1: 1,
+            x0: formatTime(spike.window_start), x1: formatTime(spike.window_end),
+            line: {width: 0}, opacity: 0.2, fillcolor: SEVERITY_COLORS[spike.severity]
+        }));
+        return {
+            data: traces,
+            layout: {
+                title: {text: title},
+                barmode: 'stack',
+                plot_bgcolor: 'white',
+                paper_bgcolor: 'white',
+                margin: {l: 20, r: 20, t: 40, b: 20},
+                showlegend: severity === 'All',
+                height: 200,
+                shapes
+            }
+        };
+    }
+
+    function renderSpike(spike) {
+        const ratio = spike.baseline >= 1 ? `${Math.round(spike.count / spike.baseline)}x baseline` : 'new';
+        const minutes = Math.round((spike.window_end - spike.window_start) / 60);
+        const subject = spike.kind === 'severity' ? `${spike.key} logs` : spike.key;
+        return element('Div', {className: `log-entry severity-${spike.severity.toLowerCase()}`}, [
+            element('Div', {className: 'log-header'}, [
+                element('I', {className: SEVERITY_ICONS[spike.severity]}),
+                element('Span', {}, `Spike: ${spike.count} in ${minutes} min (${ratio})`),
+                element('Span', {className: `severity-badge badge-${spike.severity.toLowerCase()}`}, spike.severity)
+            ]),
+            element('Div', {className: 'log-content'}, subject),
+            element('Div', {className: 'log-timestamp'},
+                `${formatTime(spike.window_start).slice(0, 16)}–${formatTime(spike.window_end).slice(11, 16)}`)
+        ]);
+    }
+
+    function triggeredId() {
+        const triggered = window.dash_clientside.callback_context.triggered;
+        if (!triggered || !triggered.length) {
+            return null;
+        }
+        const propId = triggered[0].prop_id;
+        return {id: propId.slice(0, propId.lastIndexOf('.')), value: triggered[0].value};
+    }
+
+    function updateDashboard(severity, timeRange, query, snapshot, page, pageSize) {
+        const data = load(snapshot);
+        if (!data) {
+            return Array(5).fill(window.dash_clientside.no_update);
+        }
+        const since = timeRangeStart(data, timeRange);
+        const rows = filterRows(data, severity, since, (query || '').trim());
+        const totalPages = pageCount(rows.length, pageSize);
+        page = Math.min(page || 0, totalPages - 1);
+        const start = page * pageSize;
+        const pageRows = rows.slice(start, start + pageSize);
+        let pageInfo = `Page ${page + 1} of ${totalPages} · ` +
+            `rows ${Math.min(start + 1, rows.length)}–${start + pageRows.length} of ${rows.length}`;
+        if (data.total > data.id.length) {
+            pageInfo += ` · newest ${data.id.length} of ${data.total} logs loaded`;
+        }
+
+        const spikes = selectSpikes(data, severity, since);
+        return [
+            pageRows.map((i, n) => renderLogEntry(data, i, `Log Entry ${start + n + 1}`, severity)),
+            renderStats(data, rows),
+            renderFigure(data, rows, severity, spikes),
+            spikes.map(renderSpike),
+            pageInfo
+        ];
+    }
+
+    function changePage(prevClicks, nextClicks, severity, timeRange, query, pageSize, page, snapshot) {
+        // A new filter or page size starts again from the first page
+        const trigger = triggeredId();
+        page = page || 0;
+        if (trigger && trigger.id === 'prev-page') {
+            return Math.max(0, page - 1);
+        }
+        if (trigger && trigger.id === 'next-page') {
+            const data = load(snapshot);
+            const totalRows = data ? filterRows(data, severity, timeRangeStart(data, timeRange), (query || '').trim()).length : 0;
+            return Math.min(page + 1, pageCount(totalRows, pageSize) - 1);
+        }
+        return 0;
+    }
+
+    function manageModalDisplay(logClicks, closeClicks, snapshot) {
+        const hidden = [{display: 'none'}, '', '', ''];
+        // Freshly rendered entries fire with n_clicks=null whenever a new snapshot re-renders
+        // the list; only real clicks change the modal, so one already open stays open
+        const trigger = triggeredId();
+        if (!trigger || !trigger.value) {
+            return Array(4).fill(window.dash_clientside.no_update);
+        }
+        if (trigger.id === 'close-modal') {
+            return hidden;
+        }
+        const data = load(snapshot);
+        const i = data ? data.positions.get(JSON.parse(trigger.id).index) : undefined;
+        if (i === undefined) {
+            return hidden;
+        }
+        const section = (heading, text, last) => [
+            element('H4', {style: {marginBottom: '8px'}}, heading),
+            element('Div', last ? {} : {style: {marginBottom: '20px'}}, text)
+        ];
+        return [
+            {display: 'block'},
+            section('Log Message:', data.log[i]),
+            section('Suggested Solution:', dictionaryValue(data, 'suggestion', i)),
+            section('Explanation:', dictionaryValue(data, 'explanation', i), true)
+        ];
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        pinto: {
+            update_dashboard: updateDashboard,
+            change_page: changePage,
+            manage_modal_display: manageModalDisplay
+        }
+    });
+})();
@@ -0,0 +1,401 @@
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from classification_cache import ClassificationCache
+from generate_syslogs import generate_syslogs, log_patterns
+from local_classifier import LocalClassifier, load_cache_labels
+from log_repository import LogRepository, SEVERITIES
+from log_store import LogStore
+from risk_identification import (
+    ANALYSIS_OPTIONS, ANOMALY_PATTERNS, ROOT_CAUSES, ISO_TIMESTAMP_PATTERN, analyze_file_parallel,
+    analyze_logs, extract_timestamps, fallback_classification, get_logs_for_dashboard, read_logs
+)
+from stub_model import StubModel
+
+# Corpus sizes for the end-to-end suite
+SUITE_SIZES = [10000, 100000, 1000000]
+
+# Fixed generator settings so every run benchmarks the same corpora
+SUITE_SEED = 42
+SUITE_START = datetime(2024, 11, 1)
+SUITE_END = datetime(2024, 11, 8)
+
+# Severity a careful reviewer (standing in for Gemini) gives each generated log category
+ORACLE_SEVERITIES = {
+    "Critical": "Critical", "SystemFailure": "Critical", "PodDown": "Critical",
+    "Warning": "Warning", "NetworkIssue": "Warning", "AppError": "Warning", "ProgrammingError": "Warning",
+    "Info": "Info"
+}
+
+# Phrases that trigger several rules at once, to check rule-priority order
+MIXED_PHRASES = [
+    "high latency after port down",
+    "login success but packet loss detected",
+    "cpu overload and interface flapping",
+    "configuration update caused device unreachable",
+    "PORT DOWN then High Latency",
+    "disk space low on router-7",
+]
+
+def legacy_fallback_classification(log):
+    """Original uncompiled fallback_classification, kept as the benchmark baseline."""
+    for severity, patterns in ANOMALY_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, log, re.IGNORECASE):
+                # Find matching root cause if any
+                suggestion = "No specific suggestion available"
+                explanation = "Classification based on pattern matching"
+                for cause, data in ROOT_CAUSES.items():
+                    if re.search(cause, log, re.IGNORECASE):
+                        suggestion = data['suggestion']
+                        explanation = data['explanation']
+                        break
+                return {
+                    'severity': severity,
+                    'suggestion': suggestion,
+                    'explanation': explanation
+                }
+    return {
+        'severity': 'Info',
+        'suggestion': 'No specific action required',
+        'explanation': 'Default classification for unmatched log'
+    }
+
+def build_corpus(sample_path, num_logs, seed=0):
+    """Repeat sample log lines up to num_logs, mixing in lines that hit several rules."""
+    rng = random.Random(seed)
+    sample = read_logs(sample_path)
+    logs = []
+    for i in range(num_logs):
+        roll = rng.random()
+        if roll < 0.01:
+            logs.append(f"Log: {rng.choice(MIXED_PHRASES)} with no timestamp")
+        elif roll < 0.1:
+            logs.append(f"Log: {rng.choice(MIXED_PHRASES)} occurred at 2024-11-12 {i % 24:02d}:00:00")
+        else:
+            logs.append(rng.choice(sample))
+    return logs
+
+def time_call(func, logs):
+    """Run func over every log and return (results, elapsed seconds)."""
+    start = time.perf_counter()
+    results = [func(log) for log in logs]
+    return results, time.perf_counter() - start
+
+def benchmark_fallback(logs):
+    """Compare the compiled matcher with the original fallback_classification."""
+    legacy_results, legacy_seconds = time_call(legacy_fallback_classification, logs)
+    compiled_results, compiled_seconds = time_call(fallback_classification, logs)
+    mismatches = sum(1 for a, b in zip(legacy_results, compiled_results) if a != b)
+    return {
+        'lines': len(logs),
+        'legacy_seconds': legacy_seconds,
+        'compiled_seconds': compiled_seconds,
+        'speedup': legacy_seconds / compiled_seconds if compiled_seconds else float('inf'),
+        'mismatches': mismatches
+    }
+
+def per_row_timestamps(logs, fallback):
+    """Per-line regex and strptime extraction, the baseline for extract_timestamps."""
+    pattern = re.compile(ISO_TIMESTAMP_PATTERN)
+    timestamps = []
+    for log in logs:
+        match = pattern.search(log)
+        try:
+            # Date and time take the first 19 characters; any fraction is dropped, any offset applied
+            stamp = match.group(1)
+            offset = stamp[19:].lstrip(".0123456789")
+            time_format = "%Y-%m-%d %H:%M:%S%z" if offset else "%Y-%m-%d %H:%M:%S"
+            timestamp = datetime.strptime(stamp[:19].replace("T", " ") + offset, time_format)
+        except (AttributeError, ValueError):
+            timestamp = fallback
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        timestamps.append(timestamp)
+    return timestamps
+
+def benchmark_timestamps(logs):
+    """Compare vectorized timestamp extraction with a per-row Python loop."""
+    fallback = datetime.now()
+    start = time.perf_counter()
+    expected = per_row_timestamps(logs, fallback)
+    per_row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    timestamps = extract_timestamps(logs, fallback)
+    vectorized_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(expected, timestamps.tolist()) if a != b)
+    return {
+        'lines': len(logs),
+        'per_row_seconds': per_row_seconds,
+        'vectorized_seconds': vectorized_seconds,
+        'speedup': per_row_seconds / vectorized_seconds if vectorized_seconds else float('inf'),
+        'fallbacks': int((timestamps == fallback).sum()),
+        'mismatches': mismatches
+    }
+
+def benchmark_parallel(logs, worker_counts, chunk_bytes=1024 * 1024):
+    """Time rule-based analysis of a file serially and on process pools of several sizes."""
+    with tempfile.NamedTemporaryFile("w", suffix=".log", delete=False) as file:
+        file.write("\n".join(logs) + "\n")
+        path = file.name
+    try:
+        start = time.perf_counter()
+        expected = analyze_logs(read_logs(path), None)
+        serial_seconds = time.perf_counter() - start
+
+        runs = []
+        for workers in worker_counts:
+            start = time.perf_counter()
+            result = analyze_file_parallel(path, workers, chunk_bytes)
+            seconds = time.perf_counter() - start
+            runs.append({
+                'workers': workers,
+                'seconds': seconds,
+                'speedup': serial_seconds / seconds if seconds else float('inf'),
+                'identical': result == expected
+            })
+    finally:
+        os.remove(path)
+    return {'lines': len(logs), 'serial_seconds': serial_seconds, 'runs': runs}
+
+def oracle_classification(log):
+    """Label a generated line by the category its pattern came from, as Gemini ideally would."""
+    for category, patterns in log_patterns.items():
+        for pattern in patterns:
+            if pattern in log:
+                severity = ORACLE_SEVERITIES[category]
+                return {
+                    'severity': severity,
+                    'suggestion': f"Investigate {pattern}.",
+                    'explanation': f"{category} event: {pattern}."
+                }
+    return {'severity': 'Info', 'suggestion': "No action needed.", 'explanation': "Unrecognized event."}
+
+def accuracy(results, expected):
+    """Share of results whose severity matches the expected label, ignoring None results."""
+    pairs = [(r, e) for r, e in zip(results, expected) if r is not None]
+    return sum(r['severity'] == e['severity'] for r, e in pairs) / len(pairs) if pairs else 0.0
+
+def benchmark_tiers(num_logs, stub_latency=0.05):
+    """Per-line cost and accuracy of the rule, local model and Gemini tiers, and the escalation rate.
+
+    The local model is trained from a cache of stub Gemini answers on history that lacks one
+    pattern per category, so those patterns show up as unfamiliar lines in the test corpus.
+    """
+    held_out = [patterns[-1] for patterns in log_patterns.values()]
+    with tempfile.TemporaryDirectory() as workdir:
+        history_path = os.path.join(workdir, "history.txt")
+        test_path = os.path.join(workdir, "test.txt")
+        generate_syslogs(history_path, num_logs=num_logs, start_date=SUITE_START, end_date=SUITE_END, seed=1)
+        generate_syslogs(test_path, num_logs=num_logs, start_date=SUITE_START, end_date=SUITE_END, seed=2)
+        history = [log for log in read_logs(history_path) if not any(pattern in log for pattern in held_out)]
+        logs = read_logs(test_path)
+        expected = [oracle_classification(log) for log in logs]
+
+        # Earlier Gemini answers land in the cache, which is the local model's training data
+        cache_path = os.path.join(workdir, "cache.db")
+        cache = ClassificationCache(cache_path)
+        analyze_logs(history, StubModel(latency=0, classifier=oracle_classification), cache, **ANALYSIS_OPTIONS)
+        cache.close()
+        templates, labels = load_cache_labels(cache_path)
+        local_model, train_seconds = time_it(LocalClassifier.train, templates, labels)
+
+        rule_results, rule_seconds = time_it(classify_lines, logs)
+        local_results, local_seconds = time_it(local_model.classify, logs)
+        escalations = local_results.count(None)
+
+        # No cache here, so every line that reaches the stub pays for a request
+        model = StubModel(latency=stub_latency, classifier=oracle_classification)
+        (_, gemini_logs), gemini_seconds = time_it(analyze_logs, logs, model, **ANALYSIS_OPTIONS)
+        gemini_calls = model.calls
+
+        model = StubModel(latency=stub_latency, classifier=oracle_classification)
+        (_, tiered_logs), tiered_seconds = time_it(
+            analyze_logs, logs, model, local_model=local_model, **ANALYSIS_OPTIONS
+        )
+        tiered_calls = model.calls
+
+    return {
+        'lines': len(logs),
+        'training_templates': len(templates),
+        'train_seconds': train_seconds,
+        'escalation_rate': escalations / len(logs),
+        'rules': {'per_line_seconds': rule_seconds / len(logs), 'accuracy': accuracy(rule_results, expected)},
+        'local': {'per_line_seconds': local_seconds / len(logs), 'accuracy_when_confident': accuracy(local_results, expected)},
+        'gemini': {'per_line_seconds': gemini_seconds / len(logs), 'calls': gemini_calls,
+                   'accuracy': accuracy(gemini_logs, expected)},
+        'tiered': {'seconds': tiered_seconds, 'calls': tiered_calls, 'accuracy': accuracy(tiered_logs, expected)}
+    }
+
+def time_it(func, *args, **kwargs):
+    """Call func and return (result, elapsed seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def classify_lines(logs):
+    """Run every line through the rule-based fallback."""
+    return [fallback_classification(log) for log in logs]
+
+def benchmark_dashboard(app_module, repository):
+    """Time update_dashboard for each severity filter, cold and then memoized, per line and grouped."""
+    app_module.repository = repository
+    results = {}
+    for severity in ['All'] + SEVERITIES:
+        app_module.render_page.cache_clear()
+        app_module.render_group_page.cache_clear()
+        app_module.render_summary.cache_clear()
+        args = (severity, "all", None, "lines", [], None, 0, app_module.DEFAULT_PAGE_SIZE)
+        _, cold_seconds = time_it(app_module.update_dashboard, *args)
+        _, memoized_seconds = time_it(app_module.update_dashboard, *args)
+        grouped_args = (severity, "all", None, "groups", [], None, 0, app_module.DEFAULT_PAGE_SIZE)
+        _, grouped_seconds = time_it(app_module.update_dashboard, *grouped_args)
+        results[severity] = {
+            'cold_seconds': cold_seconds, 'memoized_seconds': memoized_seconds, 'grouped_seconds': grouped_seconds
+        }
+    return results
+
+def benchmark_suite(sizes, stub_latency=0.05):
+    """Time each pipeline stage on generated corpora of the given sizes."""
+    # Imported here so the classification benchmarks do not need Dash installed
+    import app as app_module
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            path = os.path.join(workdir, f"syslogs_{size}.txt")
+            generate_syslogs(path, num_logs=size, start_date=SUITE_START, end_date=SUITE_END, seed=SUITE_SEED)
+            entry = {'lines': size}
+
+            logs, entry['read_logs_seconds'] = time_it(read_logs, path)
+            _, entry['fallback_classification_seconds'] = time_it(classify_lines, logs)
+
+            model = StubModel(latency=stub_latency, seed=SUITE_SEED)
+            cache = ClassificationCache(os.path.join(workdir, f"cache_{size}.db"))
+            _, entry['analyze_logs_seconds'] = time_it(analyze_logs, logs, model, cache, **ANALYSIS_OPTIONS)
+            entry['analyze_logs_model_calls'] = model.calls
+            cache.close()
+            del logs
+
+            model = StubModel(latency=stub_latency, seed=SUITE_SEED)
+            rows, entry['get_logs_for_dashboard_seconds'] = time_it(
+                get_logs_for_dashboard, path, None, model, os.path.join(workdir, f"dashboard_cache_{size}.db")
+            )
+            entry['get_logs_for_dashboard_rows'] = len(rows)
+
+            memory = LogRepository()
+            _, entry['repository_append_seconds'] = time_it(memory.append, rows)
+            entry['repository_bytes_per_row'] = memory.memory_usage() / max(memory.count('All'), 1)
+            store = LogStore(os.path.join(workdir, f"logs_{size}.db"))
+            _, entry['store_append_seconds'] = time_it(store.append, rows)
+            del rows
+
+            entry['update_dashboard'] = {
+                'memory': benchmark_dashboard(app_module, memory),
+                'sqlite': benchmark_dashboard(app_module, store)
+            }
+            results.append(entry)
+    return results
+
+def environment_info():
+    """Describe the machine and commit a benchmark ran on."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'started_at': datetime.now().isoformat(timespec='seconds')
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark log classification and parsing.")
+    parser.add_argument("benchmarks", nargs="*", choices=["fallback", "timestamps", "parallel", "tiers", "suite"],
+                        default=["fallback", "timestamps", "parallel", "tiers", "suite"], help="benchmarks to run")
+    parser.add_argument("--lines", type=int, default=200000, help="number of log lines for the fallback benchmark")
+    parser.add_argument("--timestamp-lines", type=int, default=1000000,
+                        help="number of log lines for the timestamp benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1],
+                        help="process pool sizes for the parallel benchmark")
+    parser.add_argument("--tier-lines", type=int, default=20000,
+                        help="number of generated log lines for the classifier tier benchmark")
+    parser.add_argument("--sample", default="syslogs.txt", help="log file to draw sample lines from")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SUITE_SIZES,
+                        help="corpus sizes for the end-to-end suite")
+    parser.add_argument("--stub-latency", type=float, default=0.05,
+                        help="seconds of latency injected into each stub model request")
+    parser.add_argument("--output", default="benchmark_results.json", help="where to write JSON results")
+    args = parser.parse_args()
+    results = {'environment': environment_info(), 'benchmarks': {}}
+
+    if "fallback" in args.benchmarks:
+        result = benchmark_fallback(build_corpus(args.sample, args.lines))
+        results['benchmarks']['fallback'] = result
+        print(f"fallback_classification on {result['lines']} lines")
+        print(f"  legacy:   {result['legacy_seconds']:.3f}s")
+        print(f"  compiled: {result['compiled_seconds']:.3f}s ({result['speedup']:.1f}x)")
+        print(f"  mismatches: {result['mismatches']}")
+
+    if "timestamps" in args.benchmarks:
+        result = benchmark_timestamps(build_corpus(args.sample, args.timestamp_lines))
+        results['benchmarks']['timestamps'] = result
+        print(f"extract_timestamps on {result['lines']} lines")
+        print(f"  per-row:    {result['per_row_seconds']:.3f}s")
+        print(f"  vectorized: {result['vectorized_seconds']:.3f}s ({result['speedup']:.1f}x)")
+        print(f"  fallbacks: {result['fallbacks']}, mismatches: {result['mismatches']}")
+
+    if "parallel" in args.benchmarks:
+        result = benchmark_parallel(build_corpus(args.sample, args.lines), sorted(set(args.workers)))
+        results['benchmarks']['parallel'] = result
+        print(f"analyze_file_parallel on {result['lines']} lines")
+        print(f"  serial:     {result['serial_seconds']:.3f}s")
+        for run in result['runs']:
+            print(f"  {run['workers']:>2} workers: {run['seconds']:.3f}s ({run['speedup']:.1f}x)"
+                  f"{'' if run['identical'] else ' OUTPUT DIFFERS'}")
+
+    if "tiers" in args.benchmarks:
+        result = benchmark_tiers(args.tier_lines, args.stub_latency)
+        results['benchmarks']['tiers'] = result
+        print(f"classifier tiers on {result['lines']} generated lines "
+              f"(local model trained on {result['training_templates']} templates in {result['train_seconds']:.2f}s)")
+        for tier in ("rules", "local", "gemini"):
+            entry = result[tier]
+            score = entry.get('accuracy', entry.get('accuracy_when_confident'))
+            print(f"  {tier:<7} {entry['per_line_seconds'] * 1e6:9.1f} us/line, {score:.1%} accurate")
+        print(f"  escalation rate: {result['escalation_rate']:.1%}")
+        print(f"  tiered: {result['tiered']['seconds']:.2f}s, {result['tiered']['calls']} Gemini calls "
+              f"(vs {result['gemini']['calls']}), {result['tiered']['accuracy']:.1%} accurate")
+
+    if "suite" in args.benchmarks:
+        suite = benchmark_suite(args.sizes, args.stub_latency)
+        results['benchmarks']['suite'] = suite
+        for entry in suite:
+            print(f"pipeline on {entry['lines']} generated lines")
+            print(f"  read_logs:               {entry['read_logs_seconds']:.3f}s")
+            print(f"  fallback_classification: {entry['fallback_classification_seconds']:.3f}s")
+            print(f"  analyze_logs (stub):     {entry['analyze_logs_seconds']:.3f}s "
+                  f"({entry['analyze_logs_model_calls']} model calls)")
+            print(f"  get_logs_for_dashboard:  {entry['get_logs_for_dashboard_seconds']:.3f}s")
+            print(f"  repository frame:        {entry['repository_bytes_per_row']:.0f} bytes/row")
+            for backend, timings in entry['update_dashboard'].items():
+                cells = ", ".join(f"{severity} {t['cold_seconds'] * 1000:.0f}ms" for severity, t in timings.items())
+                print(f"  update_dashboard ({backend}): {cells}")
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
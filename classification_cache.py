@@ -0,0 +1,95 @@
+import json
+import sqlite3
+import threading
+import time
+import metrics
+
+# Seconds a connection waits for another process's write lock before raising "database is locked"
+BUSY_TIMEOUT_SECONDS = 30.0
+
+class ClassificationCache:
+    """On-disk, size-bounded LRU cache of classification results keyed by log template."""
+
+    def __init__(self, path="classification_cache.db", max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        # Hits only note their time here; writing it per lookup would hold the write lock between puts
+        self.recent = {}
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        # WAL lets other processes sharing the cache read while this one writes
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS templates ("
+            "template TEXT PRIMARY KEY, result TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_templates_last_used ON templates (last_used)")
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COUNT(*) FROM templates").fetchone()[0]
+
+    def get(self, template):
+        """Return the cached result for a template, or None on a miss."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT result FROM templates WHERE template = ?", (template,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                metrics.CACHE_LOOKUPS.inc(result="miss")
+                return None
+            self.hits += 1
+            metrics.CACHE_LOOKUPS.inc(result="hit")
+            self.recent[template] = time.time()
+            return json.loads(row[0])
+
+    def flush_recency(self):
+        """Write the last-used times of hits since the previous write; the caller holds the lock."""
+        if self.recent:
+            self.conn.executemany(
+                "UPDATE templates SET last_used = ? WHERE template = ?",
+                [(last_used, template) for template, last_used in self.recent.items()]
+            )
+            self.recent.clear()
+
+    def put(self, template, result):
+        """Store a result under a template, evicting least recently used entries if full."""
+        with self.lock:
+            # Eviction below orders by last_used, so pending hits must be written first
+            self.flush_recency()
+            exists = self.conn.execute(
+                "SELECT 1 FROM templates WHERE template = ?", (template,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO templates (template, result, last_used) VALUES (?, ?, ?)",
+                (template, json.dumps(result), time.time())
+            )
+            if not exists:
+                self.size += 1
+            if self.size > self.max_entries:
+                overflow = self.size - self.max_entries
+                self.conn.execute(
+                    "DELETE FROM templates WHERE template IN "
+                    "(SELECT template FROM templates ORDER BY last_used LIMIT ?)",
+                    (overflow,)
+                )
+                self.size -= overflow
+            self.conn.commit()
+
+    def stats(self):
+        """Return hit/miss counters for reporting."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': self.size,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        """Flush pending recency updates and close the database."""
+        with self.lock:
+            self.flush_recency()
+            self.conn.commit()
+            self.conn.close()
@@ -1,6 +1,8 @@
+import argparse
 import random
 import time
 from datetime import datetime, timedelta
+import numpy as np
 
 # Expanded list of log patterns for different categories
 log_patterns = {
@@ -30,6 +32,21 @@ log_patterns = {
     ]
 }
 
+# Message layout per category; "{pattern}" and "{timestamp}" are filled in for each line
+log_formats = {
+    "Critical": "Critical: {pattern} occurred at {timestamp}",
+    "Warning": "Warning: {pattern} occurred at {timestamp}",
+    "Info": "Info: {pattern} occurred at {timestamp}",
+    "AppError": "Application Error - {pattern} at {timestamp}",
+    "NetworkIssue": "Network Issue: {pattern}, Timestamp: {timestamp}",
+    "SystemFailure": "System Failure Detected: {pattern} as of {timestamp}",
+    "ProgrammingError": "Programming Error - {pattern} [timestamp: {timestamp}]",
+    "PodDown": "Pod Down: {pattern} [Time: {timestamp}]"
+}
+
+# Lines generated, formatted and written per batch
+GENERATE_CHUNK_SIZE = 100000
+
 def generate_random_timestamp(start_date, end_date):
     """Generates a random timestamp between start_date and end_date."""
     time_between_dates = end_date - start_date
@@ -41,41 +58,100 @@ def generate_log(timestamp):
     """Generates a log message with the provided timestamp and varied format."""
     severity = random.choice(list(log_patterns.keys()))
     pattern = random.choice(log_patterns[severity])
+    log_format = log_formats.get(severity, "Unknown Log Type: {pattern} at {timestamp}")
+    return log_format.format(pattern=pattern, timestamp=timestamp.strftime('%Y-%m-%d %H:%M:%S'))
+
+def message_templates(mix=None):
+    """Split every (category, pattern) message around its timestamp.
+
+    Returns prefix and suffix arrays plus the probability of each message, where a category's
+    weight from mix (default 1 each) is shared equally between its patterns.
+    """
+    mix = mix or dict.fromkeys(log_patterns, 1)
+    unknown = set(mix) - set(log_patterns)
+    if unknown:
+        raise ValueError(f"Unknown log categories: {', '.join(sorted(unknown))}")
+
+    prefixes, suffixes, weights = [], [], []
+    for category, weight in mix.items():
+        for pattern in log_patterns[category]:
+            prefix, suffix = log_formats[category].format(pattern=pattern, timestamp="\0").split("\0")
+            prefixes.append(prefix)
+            suffixes.append(suffix + "\n")
+            weights.append(weight / len(log_patterns[category]))
+    weights = np.array(weights, dtype=float)
+    if weights.sum() <= 0:
+        raise ValueError("Category mix must have a positive total weight")
+    return np.array(prefixes, dtype=object), np.array(suffixes, dtype=object), weights / weights.sum()
+
+def iter_log_chunks(num_logs, start_date, end_date, seed=None, mix=None, chunk_size=GENERATE_CHUNK_SIZE):
+    """Yield the text of num_logs time-sorted log lines, chunk_size lines at a time.
 
-    # Randomly choose a format based on the severity
-    if severity in ["Critical", "Warning", "Info"]:
-        log_message = f"{severity}: {pattern} occurred at {timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
-    elif severity == "AppError":
-        log_message = f"Application Error - {pattern} at {timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
-    elif severity == "NetworkIssue":
-        log_message = f"Network Issue: {pattern}, Timestamp: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
-    elif severity == "SystemFailure":
-        log_message = f"System Failure Detected: {pattern} as of {timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
-    elif severity == "ProgrammingError":
-        log_message = f"Programming Error - {pattern} [timestamp: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}]"
-    elif severity == "PodDown":
-        log_message = f"Pod Down: {pattern} [Time: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}]"
-    else:
-        log_message = f"Unknown Log Type: {pattern} at {timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
-
-    return log_message
-
-def generate_syslogs(filename, num_logs=50, start_date=None, end_date=None):
-    """Generates a file with a given number of syslogs with random timestamps, sorted by time."""
+    The range is cut into one slice per chunk and a multinomial draw decides how many lines fall
+    in each, so every slice can be sorted on its own and the output is still globally ordered.
+    """
+    rng = np.random.default_rng(seed)
+    prefixes, suffixes, probabilities = message_templates(mix)
+    start = np.datetime64(start_date, 's')
+    span = int((end_date - start_date).total_seconds())
+    if span <= 0:
+        raise ValueError("end_date must be after start_date")
+
+    slices = max(1, -(-num_logs // chunk_size))
+    edges = np.linspace(0, span, slices + 1)
+    for low, high, count in zip(edges[:-1], edges[1:], rng.multinomial(num_logs, [1 / slices] * slices)):
+        if count == 0:
+            continue
+        seconds = np.sort(rng.uniform(low, high, count).astype(np.int64))
+        timestamps = np.char.replace(np.datetime_as_string(start + seconds, unit='s'), "T", " ").astype(object)
+        messages = rng.choice(len(prefixes), size=count, p=probabilities)
+        # Object arrays add element-wise with str concatenation
+        yield "".join(prefixes[messages] + timestamps + suffixes[messages])
+
+def generate_syslogs(filename, num_logs=50, start_date=None, end_date=None, seed=None, mix=None,
+                     chunk_size=GENERATE_CHUNK_SIZE):
+    """Generates a file with a given number of syslogs with random timestamps, sorted by time.
+
+    Lines are built in vectorized batches and streamed to disk, so memory stays bounded by
+    chunk_size. The same seed always produces the same file.
+    """
     if not start_date:
         start_date = datetime.now() - timedelta(days=7)  # Default to the last 7 days
     if not end_date:
         end_date = datetime.now()  # Default to now
 
-    # Generate sorted timestamps
-    timestamps = [generate_random_timestamp(start_date, end_date) for _ in range(num_logs)]
-    timestamps.sort()  # Sort timestamps in ascending order
-
-    # Write logs to the file, one for each timestamp
     with open(filename, 'w') as f:
-        for timestamp in timestamps:
-            log_message = generate_log(timestamp)
-            f.write(f"{log_message}\n")
+        for chunk in iter_log_chunks(num_logs, start_date, end_date, seed, mix, chunk_size):
+            f.write(chunk)
+
+def parse_mix(text):
+    """Parse "Critical=2,Warning=1" into {'Critical': 2.0, 'Warning': 1.0}."""
+    mix = {}
+    for item in text.split(","):
+        category, _, weight = item.partition("=")
+        mix[category.strip()] = float(weight) if weight else 1.0
+    return mix
+
+def parse_date(text):
+    """Parse an ISO date or date-time for the command line."""
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {text!r}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic syslogs sorted by time.")
+    parser.add_argument("-n", "--count", type=int, default=50, help="number of log lines")
+    parser.add_argument("-o", "--output", default="syslogs.txt", help="file to write")
+    parser.add_argument("--start", type=parse_date, help="earliest timestamp (default: 7 days ago)")
+    parser.add_argument("--end", type=parse_date, help="latest timestamp (default: now)")
+    parser.add_argument("--seed", type=int, help="random seed for reproducible output")
+    parser.add_argument("--mix", type=parse_mix,
+                        help=f"category weights, e.g. Critical=2,Info=1 (categories: {', '.join(log_patterns)})")
+    parser.add_argument("--chunk-size", type=int, default=GENERATE_CHUNK_SIZE, help="lines per write")
+    args = parser.parse_args()
 
-# Generate 50 random logs and save to syslogs.txt with sorted timestamps
-generate_syslogs("syslogs.txt", num_logs=50)
+    started = time.perf_counter()
+    generate_syslogs(args.output, num_logs=args.count, start_date=args.start, end_date=args.end,
+                     seed=args.seed, mix=args.mix, chunk_size=args.chunk_size)
+    print(f"Wrote {args.count} logs to {args.output} in {time.perf_counter() - started:.2f}s")
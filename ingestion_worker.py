@@ -0,0 +1,155 @@
+import argparse
+import os
+import threading
+import time
+import metrics
+from risk_identification import (
+    GEMINI_BREAKER, RECLASSIFY_BATCH_SIZE, iter_dashboard_logs, load_gemini, load_local_model, reclassify_templates,
+    sample_dashboard_logs
+)
+
+# Lines classified per published chunk; smaller chunks show partial results sooner
+WORKER_CHUNK_SIZE = 200
+
+# Seconds between checks for lines appended after the initial load
+TAIL_POLL_SECONDS = 5.0
+
+# Wait before sending a template Gemini did not answer back again; doubles per miss up to the maximum
+RECLASSIFY_RETRY_SECONDS = 60.0
+RECLASSIFY_MAX_RETRY_SECONDS = 3600.0
+
+class IngestionWorker(threading.Thread):
+    """Background thread that classifies a followed log file and publishes rows as they arrive.
+
+    Between passes it also sends rows the rule-based fallback classified during a Gemini
+    outage back to Gemini, once the circuit breaker lets requests through again. Gemini is set
+    up once when the worker starts, unless a model is passed in; without an API key every line
+    is classified by the cache, local model and rules instead.
+    """
+
+    def __init__(self, repository, tailer, chunk_size=WORKER_CHUNK_SIZE, poll_seconds=TAIL_POLL_SECONDS, model=None):
+        super().__init__(name="ingestion-worker", daemon=True)
+        self.repository = repository
+        self.tailer = tailer
+        self.model = model
+        self.local_model = None
+        self.chunk_size = chunk_size
+        self.poll_seconds = poll_seconds
+        self.stop_event = threading.Event()
+        self.state = "starting"
+        self.initial_load_done = False
+        # {template: (passes it was left out of, monotonic time it may be sent again)}
+        self.reclassify_backoff = {}
+
+    def run(self):
+        if self.model is None:
+            self.model = load_gemini()
+        self.local_model = load_local_model()
+
+        # A persistent repository remembers how far the file was read before a restart
+        checkpoint = self.repository.load_checkpoint(self.tailer.file_path)
+        if checkpoint is not None:
+            self.tailer.restore(*checkpoint)
+
+        while not self.stop_event.is_set():
+            try:
+                self.ingest_new_lines()
+            except Exception as e:
+                print(f"Error in ingestion worker: {e}")
+                self.state = "error"
+                # Keep the previous behavior of showing sample data if nothing could be loaded,
+                # but never write the placeholder into a store that outlives this process
+                if not self.initial_load_done and not self.repository.persistent and self.repository.version == 0:
+                    self.repository.append(sample_dashboard_logs())
+            self.initial_load_done = True
+            self.reclassify_fallbacks()
+            self.stop_event.wait(self.poll_seconds)
+
+    def ingest_new_lines(self):
+        """Classify everything appended since the last pass, publishing each chunk."""
+        self.state = "loading" if not self.initial_load_done else "following"
+        for dashboard_logs in iter_dashboard_logs(
+            self.tailer.iter_new_chunks(self.chunk_size), self.model, local_model=self.local_model
+        ):
+            # Rows and the file position they were read up to are published together
+            self.repository.append(dashboard_logs, checkpoint=self.tailer.checkpoint())
+        self.state = "following"
+
+    def reclassify_fallbacks(self):
+        """Replace fallback results with Gemini's for up to RECLASSIFY_BATCH_SIZE templates.
+
+        Templates Gemini leaves unanswered are held back with exponential backoff, so a few it
+        keeps failing on are not resent every poll ahead of the rest.
+        """
+        if self.model is None or not GEMINI_BREAKER.available():
+            return
+        now = time.monotonic()
+        # Entries idle past the longest backoff belong to templates no longer waiting
+        self.reclassify_backoff = {
+            template: (misses, retry_at) for template, (misses, retry_at) in self.reclassify_backoff.items()
+            if retry_at > now - RECLASSIFY_MAX_RETRY_SECONDS
+        }
+        waiting = {template for template, (_, retry_at) in self.reclassify_backoff.items() if retry_at > now}
+        try:
+            samples = self.repository.fallback_templates(RECLASSIFY_BATCH_SIZE, exclude=waiting)
+            if not samples:
+                return
+            results = reclassify_templates(samples, self.model)
+            updated = self.repository.reclassify(results) if results else 0
+        except Exception as e:
+            print(f"Error reclassifying fallback rows: {e}")
+            return
+        now = time.monotonic()
+        for template in samples:
+            if template in results:
+                self.reclassify_backoff.pop(template, None)
+                continue
+            misses = self.reclassify_backoff.get(template, (0, 0.0))[0] + 1
+            delay = min(RECLASSIFY_RETRY_SECONDS * 2 ** (misses - 1), RECLASSIFY_MAX_RETRY_SECONDS)
+            self.reclassify_backoff[template] = (misses, now + delay)
+        if updated:
+            metrics.RECLASSIFIED_LINES.inc(updated)
+            print(f"Reclassified {updated} fallback rows across {len(results)} templates")
+
+    def progress(self):
+        """Return (state, bytes processed, file size in bytes) for a progress indicator."""
+        try:
+            total = os.path.getsize(self.tailer.file_path)
+        except OSError:
+            total = 0
+        return self.state, min(self.tailer.offset, total), total
+
+    def stop(self):
+        """Ask the worker to exit after the current pass."""
+        self.stop_event.set()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Classify a log file (and optionally syslog traffic) into a shared store. Run one of these "
+                    "and set INGEST_IN_PROCESS = False in app.py, so every Dash worker reads its results."
+    )
+    parser.add_argument("--log", default="syslogs.txt", help="log file to follow")
+    parser.add_argument("--store", default="analyzed_logs.db", help="SQLite store the Dash workers attach to")
+    parser.add_argument("--syslog-udp-port", type=int, help="also receive syslog over UDP on this port")
+    parser.add_argument("--syslog-tcp-port", type=int, help="also receive syslog over TCP on this port")
+    parser.add_argument("--stub-latency", type=float,
+                        help="classify with a StubModel of this latency instead of Gemini")
+    args = parser.parse_args()
+
+    from log_store import LogStore
+    from log_tailer import LogTailer
+    from stub_model import StubModel
+    from syslog_receiver import SyslogReceiver
+
+    model = StubModel(latency=args.stub_latency) if args.stub_latency is not None else None
+    store = LogStore(args.store)
+    worker = IngestionWorker(store, LogTailer(args.log), model=model)
+    worker.start()
+    if args.syslog_udp_port is not None or args.syslog_tcp_port is not None:
+        SyslogReceiver(store, udp_port=args.syslog_udp_port, tcp_port=args.syslog_tcp_port, model=model).start()
+    print(f"Ingesting {args.log} into {args.store}; press Ctrl+C to stop")
+    try:
+        while worker.is_alive():
+            worker.join(1.0)
+    except KeyboardInterrupt:
+        worker.stop()
@@ -0,0 +1,185 @@
+import argparse
+import json
+import re
+import sqlite3
+import zlib
+from collections import Counter
+import numpy as np
+
+# Hash buckets for word unigrams and bigrams; collisions are rare at log vocabulary sizes
+NUM_FEATURES = 2 ** 18
+
+# Feature strings whose buckets are memoized; live lines carry hostnames and ids, so the memo
+# is cleared when it fills rather than growing with every distinct token seen
+BUCKET_CACHE_SIZE = 100000
+
+# Predictions below this probability are escalated to the next tier
+CONFIDENCE_THRESHOLD = 0.9
+
+# Template placeholders (<TS>, <NUM>, ...) and digits carry no signal about severity
+PLACEHOLDER_PATTERN = re.compile(r"<[A-Z]+>")
+WORD_PATTERN = re.compile(r"[a-z]+")
+
+class LocalClassifier:
+    """Multinomial logistic regression over hashed word n-grams, trained on earlier Gemini labels.
+
+    Each line becomes a bias feature plus one bucket per distinct unigram and bigram, so a batch
+    is just a flat array of bucket ids and scoring it is a gather and a segmented sum. Lines the
+    model is unsure about come back as None so the caller can escalate them.
+    """
+
+    def __init__(self, classes, weights=None, suggestions=None, num_features=NUM_FEATURES,
+                 threshold=CONFIDENCE_THRESHOLD):
+        self.classes = list(classes)
+        self.num_features = num_features
+        self.weights = weights if weights is not None else np.zeros((num_features, len(self.classes)))
+        # Suggestion returned with each predicted severity
+        self.suggestions = suggestions or dict.fromkeys(self.classes, "No specific suggestion available")
+        self.threshold = threshold
+        self.buckets = {}
+
+    def bucket(self, feature):
+        """Stable hash bucket for a feature; Python's hash() changes between processes."""
+        index = self.buckets.get(feature)
+        if index is None:
+            index = 1 + zlib.crc32(feature.encode()) % (self.num_features - 1)
+            if len(self.buckets) >= BUCKET_CACHE_SIZE:
+                self.buckets.clear()
+            self.buckets[feature] = index
+        return index
+
+    def featurize(self, logs):
+        """Return (bucket ids, start offset of each line) for a batch of lines."""
+        columns = []
+        starts = []
+        for log in logs:
+            words = WORD_PATTERN.findall(PLACEHOLDER_PATTERN.sub(" ", log).lower())
+            features = set(words)
+            features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+            starts.append(len(columns))
+            # Bucket 0 is the bias, so every line has at least one feature
+            columns.append(0)
+            columns.extend(self.bucket(feature) for feature in features)
+        return np.array(columns, dtype=np.int64), np.array(starts, dtype=np.int64)
+
+    def predict_proba(self, logs):
+        """Class probabilities for each line, one row per line."""
+        if not len(logs):
+            return np.empty((0, len(self.classes)))
+        columns, starts = self.featurize(logs)
+        return softmax(np.add.reduceat(self.weights[columns], starts, axis=0))
+
+    def classify(self, logs):
+        """Results for lines the model is confident about, None for the rest."""
+        # A model that knows a single severity cannot tell lines apart, so it escalates everything
+        if len(self.classes) < 2:
+            return [None] * len(logs)
+        probabilities = self.predict_proba(logs)
+        best = probabilities.argmax(axis=1)
+        confidence = probabilities[np.arange(len(best)), best]
+        results = []
+        for label, score in zip(best.tolist(), confidence.tolist()):
+            if score < self.threshold:
+                results.append(None)
+                continue
+            severity = self.classes[label]
+            results.append({
+                'severity': severity,
+                'suggestion': self.suggestions[severity],
+                'explanation': f"Classified by the local model trained on earlier Gemini results ({score:.0%} confidence)"
+            })
+        return results
+
+    @classmethod
+    def train(cls, logs, labels, epochs=50, learning_rate=0.5, l2=1e-6, num_features=NUM_FEATURES,
+              threshold=CONFIDENCE_THRESHOLD):
+        """Fit on lines and their classification results ({'severity', 'suggestion', ...}).
+
+        Raises ValueError unless the labels cover at least two severities: with one, every
+        prediction would have full confidence and nothing would be escalated.
+        """
+        severities = [label['severity'] for label in labels]
+        classes = sorted(set(severities))
+        if len(classes) < 2:
+            raise ValueError(f"Training needs labels of at least two severities, got {classes}")
+        model = cls(classes, num_features=num_features, threshold=threshold)
+
+        # The most common suggestion seen for each severity is reused for its predictions
+        for severity in classes:
+            model.suggestions[severity] = Counter(
+                label.get('suggestion', "") for label in labels if label['severity'] == severity
+            ).most_common(1)[0][0]
+
+        columns, starts = model.featurize(logs)
+        rows = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(columns))))
+        targets = np.zeros((len(starts), len(classes)))
+        targets[np.arange(len(starts)), [classes.index(s) for s in severities]] = 1.0
+
+        # Full-batch AdaGrad, so rare n-grams learn as fast as common ones; each bucket's
+        # gradient is a weighted bincount over the flat feature array
+        squared = np.zeros_like(model.weights)
+        for _ in range(epochs):
+            probabilities = softmax(np.add.reduceat(model.weights[columns], starts, axis=0))
+            error = (probabilities - targets) / len(starts)
+            gradient = np.column_stack([
+                np.bincount(columns, weights=error[rows, k], minlength=num_features)
+                for k in range(len(classes))
+            ]) + l2 * model.weights
+            squared += gradient ** 2
+            model.weights -= learning_rate * gradient / (np.sqrt(squared) + 1e-8)
+        return model
+
+    def save(self, path):
+        """Write the model to an .npz file."""
+        np.savez_compressed(
+            path, weights=self.weights.astype(np.float32), classes=np.array(self.classes),
+            suggestions=np.array(json.dumps(self.suggestions)), threshold=self.threshold
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read a model written by save()."""
+        with np.load(path) as data:
+            weights = data['weights'].astype(np.float64)
+            return cls(
+                data['classes'].tolist(), weights, json.loads(str(data['suggestions'])),
+                num_features=weights.shape[0], threshold=float(data['threshold'])
+            )
+
+def softmax(scores):
+    """Row-wise softmax."""
+    scores = scores - scores.max(axis=1, keepdims=True)
+    exp = np.exp(scores)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+def load_cache_labels(cache_path):
+    """(templates, results) stored by ClassificationCache; only Gemini answers are cached."""
+    conn = sqlite3.connect(cache_path)
+    try:
+        rows = conn.execute("SELECT template, result FROM templates").fetchall()
+    finally:
+        conn.close()
+    return [template for template, _ in rows], [json.loads(result) for _, result in rows]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the local classifier on cached Gemini labels.")
+    parser.add_argument("--cache", default="classification_cache.db", help="classification cache to train on")
+    parser.add_argument("--output", default="local_model.npz", help="where to write the model")
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD,
+                        help="minimum confidence before a line is escalated to Gemini")
+    args = parser.parse_args()
+
+    templates, labels = load_cache_labels(args.cache)
+    if not templates:
+        raise SystemExit(f"No cached Gemini labels in {args.cache}")
+    try:
+        model = LocalClassifier.train(templates, labels, epochs=args.epochs, threshold=args.threshold)
+    except ValueError as e:
+        raise SystemExit(f"Cannot train on {args.cache}: {e}")
+    predictions = model.classify(templates)
+    confident = [(p, l) for p, l in zip(predictions, labels) if p is not None]
+    accuracy = sum(p['severity'] == l['severity'] for p, l in confident) / len(confident) if confident else 0.0
+    model.save(args.output)
+    print(f"Trained on {len(templates)} templates: {len(confident) / len(templates):.1%} confident, "
+          f"{accuracy:.1%} of those correct. Saved to {args.output}")
@@ -0,0 +1,621 @@
+import threading
+from collections import Counter, defaultdict
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from search_index import TokenIndex, parse_query
+from spike_detector import SpikeDetector
+
+LOG_COLUMNS = ['id', 'log', 'severity', 'suggestion', 'explanation', 'timestamp', 'template', 'tier']
+SEVERITIES = ['Critical', 'Warning', 'Info']
+
+# Severity is stored as a categorical in SEVERITIES order, so its codes are also its rank
+SEVERITY_DTYPE = pd.CategoricalDtype(SEVERITIES)
+
+# Columns repeating a small set of strings (suggestions and explanations come from ROOT_CAUSES,
+# the cache or the local model; tier names the one that classified the row), stored
+# dictionary-encoded as pandas categoricals
+DICTIONARY_COLUMNS = ['suggestion', 'explanation', 'template', 'tier']
+
+# Columns a reclassification replaces
+RESULT_COLUMNS = ['severity', 'suggestion', 'explanation', 'tier']
+
+# One row per masked template in the grouped view; severity is the most severe seen
+GROUP_COLUMNS = ['template', 'count', 'first_seen', 'last_seen', 'severity']
+
+# Width of the trend chart buckets (a pandas frequency string)
+TREND_BUCKET = 'h'
+
+# Recent search results kept, since one dashboard update asks for the same query several times
+SEARCH_CACHE_SIZE = 32
+
+# One row per flagged window; kind is 'severity' or 'template' and key the severity or template
+SPIKE_COLUMNS = ['kind', 'key', 'severity', 'window_start', 'window_end', 'count', 'baseline']
+
+# Flagged windows kept in memory, oldest dropped first
+MAX_SPIKES = 500
+
+# Rows per storage block; appends only copy the newest block, and eviction drops whole blocks
+BLOCK_ROWS = 16384
+
+def bucket_counts(frame, bucket=TREND_BUCKET):
+    """Count rows per severity and time bucket as {severity: {bucket: count}}."""
+    counts = defaultdict(Counter)
+    if frame.empty:
+        return counts
+    buckets = frame['timestamp'].dt.floor(bucket)
+    for (severity, bucket_start), count in frame.groupby([frame['severity'], buckets], observed=True).size().items():
+        counts[severity][bucket_start] += count
+        counts['All'][bucket_start] += count
+    return counts
+
+def log_frame(logs):
+    """Dashboard rows as a compact frame; rows without a template are their own template.
+
+    Ids are left to the repository. Severity and DICTIONARY_COLUMNS become categoricals, so each
+    row holds small integer codes instead of a reference to its own copy of the text.
+    """
+    frame = pd.DataFrame(logs, columns=LOG_COLUMNS)
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'])
+    frame['template'] = frame['template'].fillna(frame['log'])
+    frame['severity'] = frame['severity'].astype(SEVERITY_DTYPE)
+    for column in DICTIONARY_COLUMNS:
+        frame[column] = frame[column].astype('category')
+    return frame
+
+def concat_logs(previous, frame):
+    """Append log_frame rows to a frame, merging categories so the columns stay encoded.
+
+    pd.concat would turn categoricals with different categories back into strings. Both
+    frames have consecutive RangeIndexes of row ids, and the result continues them.
+    """
+    data = {}
+    for column in LOG_COLUMNS:
+        if isinstance(frame[column].dtype, pd.CategoricalDtype):
+            # Existing categories keep their codes; new values are added after them
+            data[column] = union_categoricals([previous[column], frame[column]])
+        else:
+            data[column] = np.concatenate([previous[column].to_numpy(), frame[column].to_numpy()])
+    return pd.DataFrame(data, index=pd.RangeIndex(previous.index.start, frame.index.stop))
+
+def block_frame(frame, start, stop):
+    """Rows start:stop of a log_frame as a block of its own, keeping only the values they use."""
+    block = frame.iloc[start:stop]
+    if len(block) == len(frame):
+        return block
+    return block.assign(**{column: block[column].cat.remove_unused_categories() for column in DICTIONARY_COLUMNS})
+
+class LogBlocks:
+    """Snapshot of the rows held, as log_frame blocks of consecutive ids read like one table.
+
+    Each block is indexed by id and keeps its own dictionaries, so dropping a block drops the
+    values only its rows used. start is the first id still held; after an eviction it may fall
+    inside the first block, whose earlier rows are no longer visible.
+    """
+
+    def __init__(self, frames=(), start=0):
+        self.frames = tuple(frames)
+        self.start = start
+        self.stop = self.frames[-1].index.stop if self.frames else start
+        self.starts = np.array([frame.index.start for frame in self.frames], dtype=np.int64)
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def held(self):
+        """Each block from start onwards."""
+        for frame in self.frames:
+            yield frame.iloc[max(self.start - frame.index.start, 0):]
+
+    def pieces(self, ids):
+        """(block, positions in it) for each block some of the sorted held ids fall in."""
+        bounds = np.searchsorted(ids, self.starts[1:])
+        return [
+            (frame, part - frame.index.start)
+            for frame, part in zip(self.frames, np.split(ids, bounds)) if len(part)
+        ]
+
+    def take(self, ids, columns=LOG_COLUMNS):
+        """Rows for sorted held ids as one frame indexed by id, merging the blocks' dictionaries."""
+        pieces = self.pieces(np.asarray(ids, dtype=np.int64))
+        if not pieces:
+            return log_frame([])[columns]
+        if len(pieces) == 1:
+            frame, positions = pieces[0]
+            return frame.iloc[positions, [frame.columns.get_loc(column) for column in columns]]
+        data = {}
+        for column in columns:
+            parts = [frame[column].iloc[positions] for frame, positions in pieces]
+            if isinstance(parts[0].dtype, pd.CategoricalDtype):
+                data[column] = union_categoricals(parts)
+            else:
+                data[column] = np.concatenate([part.to_numpy() for part in parts])
+        return pd.DataFrame(data, index=np.concatenate([frame.index[positions] for frame, positions in pieces]))
+
+    def matches(self, column, value, ids):
+        """Those of sorted held ids whose dictionary column holds value."""
+        found = [np.empty(0, dtype=np.int64)]
+        for frame, positions in self.pieces(ids):
+            values = frame[column].cat
+            if value in values.categories:
+                keep = values.codes.to_numpy()[positions] == values.categories.get_loc(value)
+                found.append(positions[keep] + frame.index.start)
+        return np.concatenate(found)
+
+def subtract_counts(counter, counts):
+    """Subtract {key: count} from a Counter, dropping keys that reach zero."""
+    for key, count in counts.items():
+        left = counter[key] - count
+        if left > 0:
+            counter[key] = left
+        else:
+            counter.pop(key, None)
+
+def group_frame(frame):
+    """Collapse log rows into GROUP_COLUMNS, one row per template."""
+    if frame.empty:
+        return sort_groups(pd.DataFrame(columns=GROUP_COLUMNS))
+    ranks = pd.Categorical(frame['severity'], dtype=SEVERITY_DTYPE).codes
+    groups = frame.assign(rank=ranks).groupby('template', sort=False, observed=True).agg(
+        count=('log', 'size'), first_seen=('timestamp', 'min'), last_seen=('timestamp', 'max'), rank=('rank', 'min')
+    )
+    groups['severity'] = [SEVERITIES[int(rank)] for rank in groups['rank']]
+    groups = groups.reset_index()[GROUP_COLUMNS]
+    # Plain strings, so ties sort by template text rather than category order
+    groups['template'] = groups['template'].astype(object)
+    return sort_groups(groups)
+
+def sort_groups(groups):
+    """Most repeated templates first, then the most recently seen."""
+    return groups.sort_values(['count', 'last_seen', 'template'], ascending=[False, False, True], ignore_index=True)
+
+def spike_frame(spikes, severity, since=None):
+    """Spike records as SPIKE_COLUMNS for a filter, most recent first."""
+    frame = pd.DataFrame(spikes, columns=SPIKE_COLUMNS)
+    if severity != 'All':
+        frame = frame[frame['severity'] == severity]
+    if since is not None:
+        frame = frame[frame['window_end'] >= since]
+    return frame.sort_values(['window_start', 'count'], ascending=False, ignore_index=True)
+
+def series_frame(counts, severity):
+    """Shape {severity: {bucket: count}} as trend chart data: one column per severity for 'All', else 'count'."""
+    if severity == 'All':
+        frame = pd.DataFrame(
+            {s: pd.Series(counts.get(s, {}), dtype='int64') for s in SEVERITIES}
+        ).fillna(0).astype('int64')
+    else:
+        frame = pd.Series(counts.get(severity, {}), dtype='int64').to_frame('count')
+    frame.index = pd.DatetimeIndex(frame.index)
+    return frame.sort_index().rename_axis('timestamp').reset_index()
+
+class SeverityAggregates:
+    """Per-severity counts, template counts, latest time and bucketed counts, updated incrementally."""
+
+    def __init__(self, bucket=TREND_BUCKET):
+        self.bucket = bucket
+        self.counts = Counter()
+        self.template_counts = defaultdict(Counter)
+        self.latest = {}
+        self.buckets = defaultdict(Counter)
+
+    def add(self, frame):
+        """Fold newly appended rows into the aggregates for their severity and for 'All'."""
+        if frame.empty:
+            return
+        buckets = frame['timestamp'].dt.floor(self.bucket)
+        for severity, group in frame.groupby('severity', observed=True):
+            latest = group['timestamp'].max()
+            group_buckets = buckets.loc[group.index].value_counts()
+            for key in (severity, 'All'):
+                self.counts[key] += len(group)
+                self.template_counts[key].update(group['template'])
+                if key not in self.latest or latest > self.latest[key]:
+                    self.latest[key] = latest
+                self.buckets[key].update(group_buckets.to_dict())
+
+    def remove(self, evicted, latest_held):
+        """Take evicted rows back out of the aggregates; latest_held(key) is the latest time still held."""
+        if evicted.empty:
+            return
+        buckets = evicted['timestamp'].dt.floor(self.bucket)
+        for severity, group in evicted.groupby('severity', observed=True):
+            latest = group['timestamp'].max()
+            group_buckets = buckets.loc[group.index].value_counts().to_dict()
+            templates = Counter(group['template'])
+            for key in (severity, 'All'):
+                self.counts[key] -= len(group)
+                subtract_counts(self.template_counts[key], templates)
+                subtract_counts(self.buckets[key], group_buckets)
+                # Rows are evicted oldest first, so the latest time only moves if it was among them
+                if latest >= self.latest.get(key, latest):
+                    held = latest_held(key)
+                    if held is not None:
+                        self.latest[key] = held
+                    else:
+                        self.latest.pop(key, None)
+
+    def stats(self, severity):
+        """Return (total, unique events, latest timestamp or None) for a filter."""
+        return self.counts[severity], len(self.template_counts[severity]), self.latest.get(severity)
+
+    def series(self, severity):
+        """Bucketed counts for the trend chart."""
+        return series_frame(self.buckets, severity)
+
+def severity_template_groups(frame):
+    """(severity, template, count, first seen, last seen) for each pair in a frame."""
+    grouped = frame.groupby(['severity', 'template'], observed=True).agg(
+        count=('log', 'size'), first_seen=('timestamp', 'min'), last_seen=('timestamp', 'max')
+    )
+    return [(severity, template, *values) for (severity, template), *values in grouped.itertuples(name=None)]
+
+class TemplateAggregates:
+    """Count, first and last time and worst severity per template, for each severity filter.
+
+    Each storage block's totals per severity and template are kept too, so evicting rows only
+    refolds the templates they touched from the blocks instead of rescanning every held row.
+    """
+
+    def __init__(self):
+        self.groups = defaultdict(dict)
+        # {(severity, template): {block start id: [count, first_seen, last_seen]}}
+        self.block_totals = defaultdict(dict)
+
+    def add(self, frame, block):
+        """Fold newly appended rows, all stored in the block starting at id block, into the aggregates."""
+        if frame.empty:
+            return
+        for severity, template, count, first_seen, last_seen in severity_template_groups(frame):
+            block_totals = self.block_totals[(severity, template)]
+            totals = block_totals.get(block)
+            if totals is None:
+                block_totals[block] = [count, first_seen, last_seen]
+            else:
+                totals[0] += count
+                totals[1] = min(totals[1], first_seen)
+                totals[2] = max(totals[2], last_seen)
+            for key in (severity, 'All'):
+                group = self.groups[key].get(template)
+                if group is None:
+                    self.groups[key][template] = [count, first_seen, last_seen, severity]
+                    continue
+                group[0] += count
+                group[1] = min(group[1], first_seen)
+                group[2] = max(group[2], last_seen)
+                if SEVERITIES.index(severity) < SEVERITIES.index(group[3]):
+                    group[3] = severity
+
+    def remove(self, evicted, dropped, front=None):
+        """Take evicted rows out of the aggregates.
+
+        dropped are the start ids of blocks evicted whole; front is (start id, rows still held)
+        of a block evicted in part, whose totals are recounted for the templates evicted rows
+        touched. Those templates' groups are then refolded from the blocks' totals.
+        """
+        if evicted.empty:
+            return
+        pairs = set(zip(evicted['severity'], evicted['template']))
+        # Every pair with rows in a dropped or partly evicted block is among the evicted ones
+        stale = list(dropped) + ([front[0]] if front is not None else [])
+        for pair in pairs:
+            for block in stale:
+                self.block_totals[pair].pop(block, None)
+        if front is not None:
+            block, held = front
+            touched = held[held['template'].isin({template for _, template in pairs})]
+            for severity, template, count, first_seen, last_seen in severity_template_groups(touched):
+                if (severity, template) in pairs:
+                    self.block_totals[(severity, template)][block] = [count, first_seen, last_seen]
+
+        for severity, template in pairs:
+            totals = list(self.block_totals[(severity, template)].values())
+            if totals:
+                self.groups[severity][template] = [
+                    sum(count for count, _, _ in totals), min(first for _, first, _ in totals),
+                    max(last for _, _, last in totals), severity
+                ]
+            else:
+                del self.block_totals[(severity, template)]
+                self.groups[severity].pop(template, None)
+        for template in {template for _, template in pairs}:
+            groups = [self.groups[severity][template] for severity in SEVERITIES if template in self.groups[severity]]
+            if groups:
+                # SEVERITIES runs from most to least severe, so the first group present is the worst
+                self.groups['All'][template] = [
+                    sum(group[0] for group in groups), min(group[1] for group in groups),
+                    max(group[2] for group in groups), groups[0][3]
+                ]
+            else:
+                self.groups['All'].pop(template, None)
+
+    def latest(self, severity):
+        """Latest last-seen time over a filter's templates, or None."""
+        return max((group[2] for group in self.groups.get(severity, {}).values()), default=None)
+
+    def count(self, severity):
+        """Number of distinct templates for a filter."""
+        return len(self.groups.get(severity, ()))
+
+    def frame(self, severity):
+        """All groups for a filter as GROUP_COLUMNS, sorted for display."""
+        groups = self.groups.get(severity, {})
+        return sort_groups(pd.DataFrame(
+            [[template] + values for template, values in groups.items()], columns=GROUP_COLUMNS
+        ))
+
+class LogRepository:
+    """In-memory analyzed logs plus the indexes and aggregates the dashboard reads.
+
+    Rows are stored in LogBlocks of BLOCK_ROWS rows. Appends replace the newest block and the
+    position arrays rather than mutating them, so readers can use a snapshot taken under the
+    lock without holding it while they render.
+
+    Rows get consecutive integer ids, which are also the blocks' index. With max_rows set the
+    repository is a ring buffer: appends evict the oldest rows beyond the limit from every
+    index and aggregate, so a long-running process stays bounded. A block is dropped once all
+    of its rows have been evicted.
+    """
+
+    # Rows are lost when the process exits
+    persistent = False
+
+    def __init__(self, max_rows=None):
+        self.lock = threading.Lock()
+        self.max_rows = max_rows
+        self.blocks = LogBlocks()
+        self.next_id = 0
+        # Row ids per filter, sorted; the blocks hold the rows from blocks.start onwards
+        self.positions = {key: np.empty(0, dtype=np.int64) for key in ['All'] + SEVERITIES}
+        self.aggregates = SeverityAggregates()
+        self.templates = TemplateAggregates()
+        self.search_index = TokenIndex()
+        self.search_cache = {}
+        self.detector = SpikeDetector(SEVERITIES)
+        self.spike_log = {}
+        self.version = 0
+
+    def append(self, logs, checkpoint=None):
+        """Add dashboard rows and bump the data version; the checkpoint only matters to LogStore."""
+        if not logs:
+            return
+        frame = log_frame(logs)
+        with self.lock:
+            offset = self.next_id
+            frame.index = pd.RangeIndex(offset, offset + len(frame))
+            frame['id'] = frame.index.to_numpy()
+            self.next_id += len(frame)
+
+            # The newest block is filled up first and the rest of the rows start new blocks
+            frames = list(self.blocks.frames)
+            pieces = []
+            position = 0
+            if frames and len(frames[-1]) < BLOCK_ROWS:
+                position = BLOCK_ROWS - len(frames[-1])
+                pieces.append(block_frame(frame, 0, position))
+                frames[-1] = concat_logs(frames[-1], pieces[-1])
+            while position < len(frame):
+                pieces.append(block_frame(frame, position, position + BLOCK_ROWS))
+                frames.append(pieces[-1])
+                position += BLOCK_ROWS
+            self.blocks = LogBlocks(frames, self.blocks.start)
+
+            # Row ids per filter, so a page is a slice rather than a full-frame mask
+            new_positions = {'All': frame.index.to_numpy()}
+            for severity, group in frame.groupby('severity', observed=True):
+                new_positions[severity] = group.index.to_numpy()
+            for key, rows in new_positions.items():
+                self.positions[key] = np.concatenate([self.positions.get(key, np.empty(0, dtype=np.int64)), rows])
+
+            self.aggregates.add(frame)
+            for piece, block in zip(pieces, frames[len(frames) - len(pieces):]):
+                self.templates.add(piece, block.index.start)
+            self.search_index.add(frame.index.to_numpy(), frame['log'].to_numpy())
+            for spike in self.detector.observe(frame['timestamp'], frame['severity'], frame['template']):
+                # Copied, so readers never see the detector raise a record's count mid-read
+                self.spike_log[(spike['kind'], spike['key'], spike['window_start'])] = dict(spike)
+            while len(self.spike_log) > MAX_SPIKES:
+                self.spike_log.pop(next(iter(self.spike_log)))
+            if self.max_rows is not None and len(self.blocks) > self.max_rows:
+                self.evict(len(self.blocks) - self.max_rows)
+            self.version += 1
+
+    def evict(self, count):
+        """Drop the oldest count rows from the blocks, the indexes and the aggregates; needs the lock."""
+        blocks = self.blocks
+        first = blocks.start + count
+        evicted = blocks.take(np.arange(blocks.start, first))
+        kept = [frame for frame in blocks.frames if frame.index.stop > first]
+        dropped = [frame.index.start for frame in blocks.frames if frame.index.stop <= first]
+        self.blocks = LogBlocks(kept, first)
+        for key, rows in self.positions.items():
+            self.positions[key] = rows[np.searchsorted(rows, first):]
+        front = None
+        if kept and kept[0].index.start < first:
+            front = kept[0].index.start, kept[0].iloc[first - kept[0].index.start:]
+        self.templates.remove(evicted, dropped, front)
+        self.aggregates.remove(evicted, self.templates.latest)
+        # Searches skip evicted ids anyway, so postings are only trimmed when a block goes
+        if dropped:
+            self.search_index.discard_before(first)
+
+    def fallback_templates(self, limit, exclude=()):
+        """{template: first line} for up to limit templates, not in exclude, with rows classified by the rule-based fallback."""
+        with self.lock:
+            blocks = self.blocks
+        samples = {}
+        for frame in blocks.held():
+            tiers = frame['tier'].cat
+            if 'fallback' not in tiers.categories:
+                continue
+            rows = np.flatnonzero(tiers.codes.to_numpy() == tiers.categories.get_loc('fallback'))
+            firsts = frame[['template', 'log']].iloc[rows].drop_duplicates('template')
+            for template, log in zip(firsts['template'].tolist(), firsts['log'].tolist()):
+                if template not in exclude and template not in samples:
+                    samples[template] = log
+                    if len(samples) >= limit:
+                        return samples
+        return samples
+
+    def reclassify(self, results):
+        """Give fallback rows of each template in {template: result} that result; returns the rows updated.
+
+        Like append, this swaps in new blocks rather than editing the ones readers may hold.
+        Rows can change severity, so the positions and aggregates are rebuilt from the new
+        blocks; reclassification only follows an outage, so one full pass is cheap enough.
+        """
+        with self.lock:
+            blocks = self.blocks
+            frames = list(blocks.frames)
+            updated_rows = 0
+            for index, frame in enumerate(frames):
+                tiers = frame['tier'].cat
+                if 'fallback' not in tiers.categories:
+                    continue
+                fallback = tiers.codes.to_numpy() == tiers.categories.get_loc('fallback')
+                held = frame.index.to_numpy() >= blocks.start
+                rows = np.flatnonzero(fallback & held & frame['template'].isin(list(results)).to_numpy())
+                if not len(rows):
+                    continue
+
+                templates = frame['template'].iloc[rows].tolist()
+                columns = {}
+                for column in RESULT_COLUMNS:
+                    values = [results[template][column] for template in templates]
+                    updated = frame[column].copy()
+                    if column != 'severity':
+                        updated = updated.cat.add_categories(sorted(set(values) - set(updated.cat.categories)))
+                    updated.iloc[rows] = values
+                    columns[column] = updated
+                frames[index] = frame.assign(**columns)
+                updated_rows += len(rows)
+            if not updated_rows:
+                return 0
+            self.blocks = LogBlocks(frames, blocks.start)
+
+            positions = {key: [] for key in ['All'] + SEVERITIES}
+            self.aggregates = SeverityAggregates()
+            self.templates = TemplateAggregates()
+            for block, frame in zip(self.blocks.frames, self.blocks.held()):
+                ids = frame.index.to_numpy()
+                codes = frame['severity'].cat.codes.to_numpy()
+                positions['All'].append(ids)
+                for code, severity in enumerate(SEVERITIES):
+                    positions[severity].append(ids[codes == code])
+                self.aggregates.add(frame)
+                self.templates.add(frame, block.index.start)
+            self.positions = {
+                key: np.concatenate(rows) if rows else np.empty(0, dtype=np.int64) for key, rows in positions.items()
+            }
+            self.version += 1
+        return updated_rows
+
+    def load_checkpoint(self, source):
+        """In-memory data does not survive restarts, so there is never a checkpoint."""
+        return None
+
+    def rows(self, severity, since=None, query=None):
+        """Snapshot of the blocks and the sorted row ids matching a filter and search query."""
+        with self.lock:
+            blocks = self.blocks
+            rows = self.positions.get(severity, np.empty(0, dtype=np.int64))
+            version = self.version
+        phrases = parse_query(query)
+        if phrases and len(rows):
+            rows = self.search(severity, tuple(phrases), blocks, rows, version)
+        if since is not None and len(rows):
+            rows = rows[blocks.take(rows, ['timestamp'])['timestamp'].to_numpy() >= np.datetime64(since)]
+        return blocks, rows
+
+    def search(self, severity, phrases, blocks, rows, version):
+        """Ids among rows matching a parsed query, memoized per snapshot version."""
+        key = (severity, phrases, version)
+        matches = self.search_cache.get(key)
+        if matches is None:
+            candidates = rows if severity != 'All' else None
+            matches = self.search_index.search(
+                phrases, (blocks.start, blocks.stop), lambda ids: blocks.take(ids, ['log'])['log'], candidates
+            )
+            with self.lock:
+                if len(self.search_cache) >= SEARCH_CACHE_SIZE:
+                    self.search_cache.pop(next(iter(self.search_cache)))
+                self.search_cache[key] = matches
+        return matches
+
+    def count(self, severity, since=None, query=None):
+        """Number of rows matching a filter."""
+        if since is None and not query:
+            return len(self.positions.get(severity, ()))
+        return len(self.rows(severity, since, query)[1])
+
+    def page(self, severity, start, stop, since=None, query=None):
+        """Rows start:stop of a filter, in ingestion order."""
+        blocks, rows = self.rows(severity, since, query)
+        return blocks.take(rows[start:stop])
+
+    def tail(self, limit):
+        """The newest limit rows, in ingestion order."""
+        with self.lock:
+            blocks = self.blocks
+        return blocks.take(np.arange(max(blocks.stop - limit, blocks.start), blocks.stop))
+
+    def get(self, log_id):
+        """Look up a single log by id; evicted rows are gone."""
+        with self.lock:
+            blocks = self.blocks
+        if not blocks.start <= log_id < blocks.stop:
+            return None
+        return blocks.take([log_id]).iloc[0].to_dict()
+
+    def memory_usage(self):
+        """Bytes held by the stored rows, strings included."""
+        with self.lock:
+            blocks = self.blocks
+        return int(sum(frame.memory_usage(deep=True).sum() for frame in blocks.frames))
+
+    def stats(self, severity, since=None, query=None):
+        """Snapshot of (total, unique events, latest timestamp) for a filter."""
+        if since is None and not query:
+            with self.lock:
+                return self.aggregates.stats(severity)
+        blocks, rows = self.rows(severity, since, query)
+        frame = blocks.take(rows, ['timestamp', 'template'])
+        latest = frame['timestamp'].max() if len(frame) else None
+        return len(frame), frame['template'].nunique(), latest
+
+    def series(self, severity, since=None, query=None):
+        """Snapshot of the trend chart data for a filter."""
+        if since is None and not query:
+            with self.lock:
+                return self.aggregates.series(severity)
+        blocks, rows = self.rows(severity, since, query)
+        return series_frame(bucket_counts(blocks.take(rows, ['timestamp', 'severity'])), severity)
+
+    def group_count(self, severity, since=None, query=None):
+        """Number of distinct templates matching a filter."""
+        if since is None and not query:
+            with self.lock:
+                return self.templates.count(severity)
+        blocks, rows = self.rows(severity, since, query)
+        return len(pd.unique(blocks.take(rows, ['template'])['template'].cat.codes.to_numpy()))
+
+    def groups(self, severity, start, stop, since=None, query=None):
+        """Template groups start:stop of a filter, most repeated first."""
+        if since is None and not query:
+            with self.lock:
+                groups = self.templates.frame(severity)
+        else:
+            blocks, rows = self.rows(severity, since, query)
+            groups = group_frame(blocks.take(rows, ['log', 'severity', 'timestamp', 'template']))
+        return groups.iloc[start:stop]
+
+    def members(self, template, severity, limit, since=None, query=None):
+        """The first limit rows of a template group, in ingestion order."""
+        blocks, rows = self.rows(severity, since, query)
+        return blocks.take(blocks.matches('template', template, rows)[:limit])
+
+    def spikes(self, severity, limit, since=None):
+        """The limit most recent flagged windows for a filter."""
+        with self.lock:
+            spikes = list(self.spike_log.values())
+        return spike_frame(spikes, severity, since).head(limit)
@@ -0,0 +1,462 @@
+import os
+import pathlib
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from itertools import islice
+import pandas as pd
+from log_repository import (
+    GROUP_COLUMNS, LOG_COLUMNS, SEVERITIES, SPIKE_COLUMNS, TREND_BUCKET, log_frame, series_frame
+)
+from search_index import parse_query
+from spike_detector import SpikeDetector
+
+# Timestamps are stored as fixed-width text so string order is time order
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Bytes of the database each read connection memory-maps; mapped pages live in the OS page
+# cache, so processes reading the same store share them instead of caching private copies
+READER_MMAP_BYTES = 256 * 1024 * 1024
+
+# SQL expression ranking a row's severity, lower is more severe (SEVERITIES order)
+SEVERITY_RANK = "CASE severity " + " ".join(
+    f"WHEN '{severity}' THEN {rank}" for rank, severity in enumerate(SEVERITIES)
+) + f" ELSE {len(SEVERITIES)} END"
+
+# Rows are identified by seq; the id column of older databases holds UUID strings instead
+SELECT_COLUMNS = ", ".join("seq AS id" if column == 'id' else column for column in LOG_COLUMNS)
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS logs (
+        seq INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        log TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        suggestion TEXT,
+        explanation TEXT,
+        timestamp TEXT NOT NULL,
+        template TEXT,
+        tier TEXT
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_logs_severity_timestamp ON logs (severity, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_logs_timestamp ON logs (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_logs_template ON logs (template, seq)",
+    # Only rows the rule-based fallback classified, which wait to be reclassified by Gemini
+    "CREATE INDEX IF NOT EXISTS idx_logs_fallback ON logs (template) WHERE tier = 'fallback'",
+    # Per-template aggregates for the grouped view, maintained on insert like the buckets
+    """CREATE TABLE IF NOT EXISTS template_stats (
+        template TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        first_seen TEXT NOT NULL,
+        last_seen TEXT NOT NULL,
+        PRIMARY KEY (template, severity)
+    )""",
+    # Per-severity hourly counts, maintained on insert for the trend chart
+    """CREATE TABLE IF NOT EXISTS severity_buckets (
+        severity TEXT NOT NULL,
+        bucket TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (severity, bucket)
+    )""",
+    # Full-text index over the log text, kept in step with logs by append
+    """CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5 (
+        log, content='logs', content_rowid='seq', tokenize='unicode61'
+    )""",
+    # Windows flagged by the spike detector; a spike's count follows its peak
+    """CREATE TABLE IF NOT EXISTS spikes (
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        window_start TEXT NOT NULL,
+        window_end TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        baseline REAL NOT NULL,
+        PRIMARY KEY (kind, key, window_start)
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_spikes_window ON spikes (window_start)",
+    # One row per reclassification pass, so the data version moves when rows change in place
+    """CREATE TABLE IF NOT EXISTS reclassifications (
+        run INTEGER PRIMARY KEY,
+        finished TEXT NOT NULL,
+        templates INTEGER NOT NULL,
+        rows INTEGER NOT NULL
+    )""",
+    # Tailer position per source file, committed together with the rows read before it
+    """CREATE TABLE IF NOT EXISTS checkpoints (
+        source TEXT PRIMARY KEY,
+        identity TEXT NOT NULL,
+        offset INTEGER NOT NULL
+    )""",
+]
+
+def migrate_templates(conn):
+    """Add the template column to an older logs table and build the per-template aggregates."""
+    # Imported here because risk_identification pulls in the Gemini client
+    from risk_identification import normalize_template
+    conn.create_function("normalize_template", 1, normalize_template, deterministic=True)
+    with conn:
+        conn.execute("ALTER TABLE logs ADD COLUMN template TEXT")
+        conn.execute("UPDATE logs SET template = normalize_template(log)")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.execute(
+            "INSERT INTO template_stats (template, severity, count, first_seen, last_seen) "
+            "SELECT template, severity, COUNT(*), MIN(timestamp), MAX(timestamp) FROM logs GROUP BY template, severity"
+        )
+
+class LogStore:
+    """SQLite store of analyzed logs with the same read interface as LogRepository.
+
+    Severity and time filters are pushed down as indexed SQL predicates instead of filtering
+    a loaded DataFrame. The database is opened lazily, so constructing a store does no I/O.
+
+    With read_only=True the store attaches to a database another process writes, such as a
+    standalone ingestion_worker.py shared by several Dash workers: it never creates, migrates
+    or appends, and reads as empty until the writer has created the file.
+    """
+
+    # Rows survive restarts and are shared with other processes
+    persistent = True
+
+    def __init__(self, path="analyzed_logs.db", read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.conn = None
+        # Baselines are rebuilt from live traffic after a restart; flagged windows are kept
+        self.detector = SpikeDetector(SEVERITIES)
+
+    def writer(self):
+        """Open the write connection and create the schema on first use."""
+        if self.read_only:
+            raise ValueError(f"Log store {self.path} is attached read-only")
+        with self.lock:
+            if self.conn is None:
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                # WAL lets dashboard threads read while the ingestion worker writes
+                conn.execute("PRAGMA journal_mode=WAL")
+                # Databases written before templates were stored get the column and its aggregates
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(logs)")]
+                # Rows written before tiers were stored have none, so they are never reclassified
+                if columns and 'tier' not in columns:
+                    conn.execute("ALTER TABLE logs ADD COLUMN tier TEXT")
+                if columns and 'template' not in columns:
+                    migrate_templates(conn)
+                for statement in SCHEMA:
+                    conn.execute(statement)
+                # Databases written before the full-text index existed get it built once
+                indexed = conn.execute("SELECT COUNT(*) FROM logs_fts_docsize").fetchone()[0]
+                if indexed == 0 and conn.execute("SELECT EXISTS (SELECT 1 FROM logs)").fetchone()[0]:
+                    conn.execute("INSERT INTO logs_fts (logs_fts) VALUES ('rebuild')")
+                conn.commit()
+                self.conn = conn
+            return self.conn
+
+    def reader(self):
+        """Per-thread read connection."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            if not self.read_only:
+                self.writer()
+                conn = sqlite3.connect(self.path)
+            elif os.path.exists(self.path):
+                conn = sqlite3.connect(pathlib.Path(self.path).absolute().as_uri() + "?mode=ro", uri=True)
+            else:
+                # Nothing published yet: answer from an empty schema and look for the file again next time
+                conn = sqlite3.connect(":memory:")
+                for statement in SCHEMA:
+                    conn.execute(statement)
+                return conn
+            conn.execute(f"PRAGMA mmap_size={READER_MMAP_BYTES}")
+            self.local.conn = conn
+        return conn
+
+    def append(self, logs, checkpoint=None):
+        """Insert dashboard rows, update bucket counts and save the checkpoint in one transaction."""
+        if not logs and checkpoint is None:
+            return
+        frame = log_frame(logs)
+        timestamps = frame['timestamp']
+        frame['timestamp'] = timestamps.dt.strftime(TIME_FORMAT)
+        buckets = timestamps.dt.floor(TREND_BUCKET).dt.strftime(TIME_FORMAT)
+        bucket_rows = [
+            (severity, bucket, int(count))
+            for (severity, bucket), count in frame.groupby([frame['severity'], buckets], observed=True).size().items()
+        ]
+        template_rows = [
+            (template, severity, int(count), first_seen, last_seen)
+            for (template, severity), count, first_seen, last_seen in frame.groupby(['template', 'severity'], observed=True).agg(
+                count=('log', 'size'), first_seen=('timestamp', 'min'), last_seen=('timestamp', 'max')
+            ).itertuples(name=None)
+        ]
+
+        conn = self.writer()
+        with self.lock, conn:
+            spike_rows = [
+                (spike['kind'], spike['key'], spike['severity'], spike['window_start'].strftime(TIME_FORMAT),
+                 spike['window_end'].strftime(TIME_FORMAT), spike['count'], spike['baseline'])
+                for spike in self.detector.observe(timestamps, frame['severity'], frame['template'])
+            ]
+            last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM logs").fetchone()[0]
+            frame['id'] = range(last_seq + 1, last_seq + 1 + len(frame))
+            conn.executemany(
+                f"INSERT INTO logs (seq, {', '.join(LOG_COLUMNS)}) VALUES (?, {', '.join('?' * len(LOG_COLUMNS))})",
+                ((row[0],) + row for row in frame[LOG_COLUMNS].itertuples(index=False, name=None))
+            )
+            conn.execute("INSERT INTO logs_fts (rowid, log) SELECT seq, log FROM logs WHERE seq > ?", (last_seq,))
+            conn.executemany(
+                "INSERT INTO severity_buckets (severity, bucket, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (severity, bucket) DO UPDATE SET count = count + excluded.count",
+                bucket_rows
+            )
+            conn.executemany(
+                "INSERT INTO template_stats (template, severity, count, first_seen, last_seen) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (template, severity) DO UPDATE SET count = count + excluded.count, "
+                "first_seen = MIN(first_seen, excluded.first_seen), last_seen = MAX(last_seen, excluded.last_seen)",
+                template_rows
+            )
+            conn.executemany(
+                "INSERT INTO spikes (kind, key, severity, window_start, window_end, count, baseline) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, key, window_start) DO UPDATE SET count = MAX(count, excluded.count)",
+                spike_rows
+            )
+            if checkpoint is not None:
+                source, identity, offset = checkpoint
+                conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints (source, identity, offset) VALUES (?, ?, ?)",
+                    (source, ":".join(str(part) for part in identity), offset)
+                )
+
+    def load_checkpoint(self, source):
+        """Return (identity, offset) saved for a source file, or None."""
+        row = self.reader().execute(
+            "SELECT identity, offset FROM checkpoints WHERE source = ?", (source,)
+        ).fetchone()
+        if row is None:
+            return None
+        return tuple(int(part) for part in row[0].split(":")), row[1]
+
+    def fallback_templates(self, limit, exclude=()):
+        """{template: first line} for up to limit templates, not in exclude, with rows classified by the rule-based fallback."""
+        # With MIN(seq), SQLite takes the bare log column from the template's earliest row
+        rows = self.reader().execute(
+            "SELECT template, log, MIN(seq) FROM logs WHERE tier = 'fallback' GROUP BY template"
+        )
+        # Grouping follows the template index, so the cursor stops after the first limit usable templates
+        return dict(islice(((template, log) for template, log, _ in rows if template not in exclude), limit))
+
+    def reclassify(self, results):
+        """Give fallback rows of each template in {template: result} that result; returns the rows updated.
+
+        Bucket counts move to the new severities and the templates' aggregates are rebuilt from
+        their rows, in the same transaction as the update.
+        """
+        if not results:
+            return 0
+        conn = self.writer()
+        updated = 0
+        templates = 0
+        with self.lock, conn:
+            for template, result in results.items():
+                moved = conn.execute(
+                    "SELECT severity, substr(timestamp, 1, 13) || ':00:00', COUNT(*) FROM logs "
+                    "WHERE tier = 'fallback' AND template = ? GROUP BY 1, 2", (template,)
+                ).fetchall()
+                if not moved:
+                    continue
+                conn.executemany(
+                    "UPDATE severity_buckets SET count = count - ? WHERE severity = ? AND bucket = ?",
+                    [(count, severity, bucket) for severity, bucket, count in moved]
+                )
+                conn.executemany(
+                    "INSERT INTO severity_buckets (severity, bucket, count) VALUES (?, ?, ?) "
+                    "ON CONFLICT (severity, bucket) DO UPDATE SET count = count + excluded.count",
+                    [(result['severity'], bucket, count) for _, bucket, count in moved]
+                )
+                conn.execute(
+                    "UPDATE logs SET severity = ?, suggestion = ?, explanation = ?, tier = ? "
+                    "WHERE tier = 'fallback' AND template = ?",
+                    (result['severity'], result['suggestion'], result['explanation'], result['tier'], template)
+                )
+                conn.execute("DELETE FROM template_stats WHERE template = ?", (template,))
+                conn.execute(
+                    "INSERT INTO template_stats (template, severity, count, first_seen, last_seen) "
+                    "SELECT template, severity, COUNT(*), MIN(timestamp), MAX(timestamp) FROM logs "
+                    "WHERE template = ? GROUP BY template, severity", (template,)
+                )
+                updated += sum(count for _, _, count in moved)
+                templates += 1
+            if updated:
+                conn.execute("DELETE FROM severity_buckets WHERE count <= 0")
+                conn.execute(
+                    "INSERT INTO reclassifications (finished, templates, rows) VALUES (?, ?, ?)",
+                    (pd.Timestamp.now().strftime(TIME_FORMAT), templates, updated)
+                )
+        return updated
+
+    @property
+    def version(self):
+        """Highest row sequence number plus reclassification passes; changes whenever any process writes."""
+        return self.reader().execute(
+            "SELECT (SELECT COALESCE(MAX(seq), 0) FROM logs) + (SELECT COALESCE(MAX(run), 0) FROM reclassifications)"
+        ).fetchone()[0]
+
+    def where(self, severity, since=None, query=None):
+        """SQL WHERE clause and parameters for a severity, time and search filter."""
+        clauses = []
+        params = []
+        if severity != "All":
+            clauses.append("severity = ?")
+            params.append(severity)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since.strftime(TIME_FORMAT))
+        phrases = parse_query(query)
+        if phrases:
+            # Each phrase becomes a quoted FTS5 phrase; listing them side by side requires all of them
+            clauses.append("seq IN (SELECT rowid FROM logs_fts WHERE logs_fts MATCH ?)")
+            params.append(" ".join('"' + " ".join(phrase) + '"' for phrase in phrases))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, severity, since=None, query=None):
+        """Number of rows matching a filter."""
+        where, params = self.where(severity, since, query)
+        return self.reader().execute(f"SELECT COUNT(*) FROM logs{where}", params).fetchone()[0]
+
+    def page(self, severity, start, stop, since=None, query=None):
+        """Rows start:stop of a filter, in ingestion order."""
+        where, params = self.where(severity, since, query)
+        rows = self.reader().execute(
+            f"SELECT {SELECT_COLUMNS} FROM logs{where} ORDER BY seq LIMIT ? OFFSET ?",
+            params + [max(stop - start, 0), start]
+        ).fetchall()
+        frame = pd.DataFrame(rows, columns=LOG_COLUMNS)
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], format=TIME_FORMAT)
+        return frame
+
+    def tail(self, limit):
+        """The newest limit rows, in ingestion order."""
+        rows = self.reader().execute(
+            f"SELECT {SELECT_COLUMNS} FROM logs ORDER BY seq DESC LIMIT ?", (limit,)
+        ).fetchall()
+        frame = pd.DataFrame(rows[::-1], columns=LOG_COLUMNS)
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], format=TIME_FORMAT)
+        return frame
+
+    def get(self, log_id):
+        """Look up a single log by id."""
+        row = self.reader().execute(
+            f"SELECT {SELECT_COLUMNS} FROM logs WHERE seq = ?", (log_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        log = dict(zip(LOG_COLUMNS, row))
+        log['timestamp'] = pd.Timestamp(log['timestamp'])
+        return log
+
+    def stats(self, severity, since=None, query=None):
+        """(total, unique events, latest timestamp) for a filter; precomputed unless a time or search filter needs the rows."""
+        if since is None and not parse_query(query):
+            where, params = self.where(severity)
+            total, unique, latest = self.reader().execute(
+                f"SELECT (SELECT COALESCE(SUM(count), 0) FROM severity_buckets{where}), "
+                f"COUNT(DISTINCT template), MAX(last_seen) FROM template_stats{where}", params + params
+            ).fetchone()
+            return total, unique, pd.Timestamp(latest) if latest else None
+        where, params = self.where(severity, since, query)
+        total, unique, latest = self.reader().execute(
+            f"SELECT COUNT(*), COUNT(DISTINCT template), MAX(timestamp) FROM logs{where}", params
+        ).fetchone()
+        return total, unique, pd.Timestamp(latest) if latest else None
+
+    def series(self, severity, since=None, query=None):
+        """Trend chart data; precomputed buckets unless a time or search filter needs the rows."""
+        if since is None and not parse_query(query):
+            where, params = self.where(severity)
+            rows = self.reader().execute(
+                f"SELECT severity, bucket, count FROM severity_buckets{where}", params
+            ).fetchall()
+        else:
+            # The first 13 characters are the hour, matching the hourly TREND_BUCKET
+            where, params = self.where(severity, since, query)
+            rows = self.reader().execute(
+                f"SELECT severity, substr(timestamp, 1, 13) || ':00:00', COUNT(*) FROM logs{where} "
+                "GROUP BY severity, substr(timestamp, 1, 13)", params
+            ).fetchall()
+
+        counts = defaultdict(Counter)
+        for row_severity, bucket, count in rows:
+            bucket = pd.Timestamp(bucket)
+            counts[row_severity][bucket] += count
+            counts['All'][bucket] += count
+        return series_frame(counts, severity)
+
+    def group_count(self, severity, since=None, query=None):
+        """Number of distinct templates matching a filter."""
+        if since is None and not parse_query(query):
+            where, params = self.where(severity)
+            return self.reader().execute(
+                f"SELECT COUNT(DISTINCT template) FROM template_stats{where}", params
+            ).fetchone()[0]
+        where, params = self.where(severity, since, query)
+        return self.reader().execute(f"SELECT COUNT(DISTINCT template) FROM logs{where}", params).fetchone()[0]
+
+    def groups(self, severity, start, stop, since=None, query=None):
+        """Template groups start:stop of a filter, most repeated first."""
+        if since is None and not parse_query(query):
+            # Precomputed per (template, severity); 'All' folds the severities together
+            where, params = self.where(severity)
+            source = f"template_stats{where}"
+            count = "SUM(count)"
+            first_seen, last_seen = "MIN(first_seen)", "MAX(last_seen)"
+        else:
+            where, params = self.where(severity, since, query)
+            source = f"logs{where}"
+            count = "COUNT(*)"
+            first_seen, last_seen = "MIN(timestamp)", "MAX(timestamp)"
+        rows = self.reader().execute(
+            f"SELECT template, {count} AS total, {first_seen}, {last_seen} AS latest, MIN({SEVERITY_RANK}) "
+            f"FROM {source} GROUP BY template ORDER BY total DESC, latest DESC, template LIMIT ? OFFSET ?",
+            params + [max(stop - start, 0), start]
+        ).fetchall()
+        groups = pd.DataFrame(
+            [(template, count, first, last, SEVERITIES[rank]) for template, count, first, last, rank in rows],
+            columns=GROUP_COLUMNS
+        )
+        groups['first_seen'] = pd.to_datetime(groups['first_seen'], format=TIME_FORMAT)
+        groups['last_seen'] = pd.to_datetime(groups['last_seen'], format=TIME_FORMAT)
+        return groups
+
+    def members(self, template, severity, limit, since=None, query=None):
+        """The first limit rows of a template group, in ingestion order."""
+        where, params = self.where(severity, since, query)
+        where = f"{where} AND template = ?" if where else " WHERE template = ?"
+        rows = self.reader().execute(
+            f"SELECT {SELECT_COLUMNS} FROM logs{where} ORDER BY seq LIMIT ?", params + [template, limit]
+        ).fetchall()
+        frame = pd.DataFrame(rows, columns=LOG_COLUMNS)
+        frame['timestamp'] = pd.to_datetime(frame['timestamp'], format=TIME_FORMAT)
+        return frame
+
+    def spikes(self, severity, limit, since=None):
+        """The limit most recent flagged windows for a filter."""
+        clauses = []
+        params = []
+        if severity != "All":
+            clauses.append("severity = ?")
+            params.append(severity)
+        if since is not None:
+            clauses.append("window_end >= ?")
+            params.append(since.strftime(TIME_FORMAT))
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        rows = self.reader().execute(
+            f"SELECT {', '.join(SPIKE_COLUMNS)} FROM spikes{where} ORDER BY window_start DESC, count DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        frame = pd.DataFrame(rows, columns=SPIKE_COLUMNS)
+        frame['window_start'] = pd.to_datetime(frame['window_start'], format=TIME_FORMAT)
+        frame['window_end'] = pd.to_datetime(frame['window_end'], format=TIME_FORMAT)
+        return frame
@@ -0,0 +1,153 @@
+import json
+import os
+import zlib
+
+# Leading bytes fingerprinted to notice a file truncated and rewritten past the old offset
+HEAD_FINGERPRINT_BYTES = 1024
+
+class LogTailer:
+    """Follow a growing log file by byte offset, surviving rotation and truncation.
+
+    Only complete lines are returned; a trailing line still being written is picked up on a
+    later read. The offset advances only after the caller has consumed a chunk, and is
+    optionally checkpointed to disk together with the file's identity.
+
+    A shrinking file is treated as truncated. So is one whose first bytes no longer match
+    those already read, which catches a copytruncate followed by enough new writes to pass
+    the old offset before the next poll.
+    """
+
+    def __init__(self, file_path, checkpoint_path=None):
+        self.file_path = file_path
+        self.checkpoint_path = checkpoint_path
+        self.file = None
+        self.identity = None
+        self.offset = 0
+        self.chunk_end = 0
+        # (length, crc32) of the first bytes already read, or None until something is read
+        self.head = None
+        self.load_checkpoint()
+
+    def load_checkpoint(self):
+        """Restore the last saved file identity and offset, if any."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return
+        try:
+            with open(self.checkpoint_path, "r") as file:
+                checkpoint = json.load(file)
+            self.identity = tuple(checkpoint['identity'])
+            self.offset = checkpoint['offset']
+            head = checkpoint.get('head')
+            self.head = tuple(head) if head else None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable tail checkpoint {self.checkpoint_path}: {e}")
+
+    def restore(self, identity, offset):
+        """Resume from a checkpoint kept elsewhere, such as alongside stored rows."""
+        self.identity = tuple(identity)
+        self.offset = offset
+        # The head is fingerprinted again from the file once it is opened
+        self.head = None
+
+    def checkpoint(self):
+        """Return (source, identity, offset) covering every chunk yielded so far."""
+        return self.file_path, self.identity, self.chunk_end
+
+    def save_checkpoint(self):
+        """Persist the current file identity and offset atomically."""
+        if not self.checkpoint_path:
+            return
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump({'identity': list(self.identity), 'offset': self.offset,
+                       'head': list(self.head) if self.head else None}, file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def open_current(self, stat):
+        """Open the file now at file_path, resuming from the offset if it is the same file."""
+        identity = (stat.st_dev, stat.st_ino)
+        if identity != self.identity:
+            self.offset = 0
+            self.head = None
+        self.file = open(self.file_path, "rb")
+        self.identity = identity
+        if self.truncated(stat):
+            self.offset = 0
+            self.head = None
+
+    def fingerprint(self, length):
+        """(length, crc32) of the first length bytes of the open file."""
+        self.file.seek(0)
+        data = self.file.read(length)
+        return len(data), zlib.crc32(data)
+
+    def truncated(self, stat):
+        """Whether the open file was truncated since its first bytes were read."""
+        if stat.st_size < self.offset:
+            return True
+        return self.head is not None and self.fingerprint(self.head[0]) != self.head
+
+    def update_head(self):
+        """Fingerprint the leading bytes read so far, until HEAD_FINGERPRINT_BYTES are covered."""
+        length = min(self.offset, HEAD_FINGERPRINT_BYTES)
+        if length and (self.head is None or self.head[0] < length):
+            self.head = self.fingerprint(length)
+
+    def read_chunks(self, chunk_size):
+        """Yield complete lines from the open handle, advancing the offset as chunks are consumed."""
+        self.file.seek(self.offset)
+        chunk = []
+        chunk_bytes = 0
+        while True:
+            line = self.file.readline()
+            if not line.endswith(b"\n"):
+                break
+            chunk.append(line.decode("utf-8", errors="replace").strip())
+            chunk_bytes += len(line)
+            if len(chunk) >= chunk_size:
+                self.chunk_end = self.offset + chunk_bytes
+                yield chunk
+                self.offset += chunk_bytes
+                self.save_checkpoint()
+                chunk = []
+                chunk_bytes = 0
+        if chunk:
+            self.chunk_end = self.offset + chunk_bytes
+            yield chunk
+            self.offset += chunk_bytes
+            self.save_checkpoint()
+
+    def iter_new_chunks(self, chunk_size=5000):
+        """Yield lists of lines appended since the last read."""
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            stat = None
+
+        if self.file is None:
+            if stat is None:
+                return
+            self.open_current(stat)
+        elif stat is not None and (stat.st_dev, stat.st_ino) != self.identity:
+            # Rotated: drain what was appended to the old file, then switch to the new one
+            yield from self.read_chunks(chunk_size)
+            self.file.close()
+            self.identity = None
+            self.open_current(stat)
+        elif stat is not None and self.truncated(stat):
+            # Truncated in place: start again from the beginning
+            self.offset = 0
+            self.head = None
+
+        yield from self.read_chunks(chunk_size)
+        self.update_head()
+
+    def read_new_lines(self):
+        """Return all complete lines appended since the last read."""
+        return [line for chunk in self.iter_new_chunks() for line in chunk]
+
+    def close(self):
+        """Close the underlying file handle."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,192 @@
+import bisect
+import contextlib
+import threading
+import time
+
+# Upper bounds in seconds for latency histograms (the Prometheus client defaults)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def format_labels(names, values, extra=()):
+    """Render label pairs as {name="value",...}, or an empty string when there are none."""
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+class Metric:
+    """A named metric whose samples are keyed by label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+        if not self.labelnames and self.kind in ("counter", "gauge"):
+            self.values[()] = 0
+
+    def key(self, labels):
+        """Label values in declaration order; every label must be given."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """(suffix, label text, value) for every sample, for exposition."""
+        with self.lock:
+            items = sorted(self.values.items())
+        return [("", format_labels(self.labelnames, key), value) for key, value in items]
+
+    def render(self):
+        """This metric in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{suffix}{labels} {value!r}" for suffix, labels, value in self.samples())
+        return "\n".join(lines)
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+class Histogram(Metric):
+    """Distribution of observed values over fixed buckets, with a running sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            # Stored per bucket; exposition turns them into cumulative counts
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value)
+
+    def time(self, **labels):
+        """Context manager and decorator that observes elapsed wall time in seconds."""
+        return Timer(self, labels)
+
+    def samples(self):
+        with self.lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self.values.items())
+        samples = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                samples.append(("_bucket", format_labels(self.labelnames, key, [("le", le)]), cumulative))
+            samples.append(("_sum", format_labels(self.labelnames, key), total))
+            samples.append(("_count", format_labels(self.labelnames, key), cumulative))
+        return samples
+
+class Timer(contextlib.ContextDecorator):
+    """Observe the duration of a block or function call on a histogram."""
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self.local = threading.local()
+
+    def __enter__(self):
+        # Thread-local so one decorator instance can time concurrent calls
+        self.local.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.local.start, **self.labels)
+        return False
+
+REGISTRY = []
+
+def register(metric):
+    """Add a metric to the set exposed by render()."""
+    REGISTRY.append(metric)
+    return metric
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+STAGE_SECONDS = register(Histogram(
+    "pinto_stage_seconds", "Time spent in each pipeline stage (read, classify, local, fallback, render, snapshot).", ["stage"]
+))
+LLM_REQUEST_SECONDS = register(Histogram(
+    "pinto_llm_request_seconds", "Gemini request latency including retries, by prompt kind and outcome.",
+    ["kind", "outcome"]
+))
+LLM_ERRORS = register(Counter(
+    "pinto_llm_errors_total", "Gemini requests that failed, by prompt kind and exception type.", ["kind", "error"]
+))
+LLM_RETRIES = register(Counter(
+    "pinto_llm_retries_total", "Gemini requests retried after a transient error."
+))
+LLM_SKIPPED = register(Counter(
+    "pinto_llm_skipped_total", "Gemini requests not sent, by reason (circuit_open or deadline).", ["reason"]
+))
+LLM_CIRCUIT_STATE = register(Gauge(
+    "pinto_llm_circuit_state", "Gemini circuit breaker state: 0 closed, 1 open, 2 half-open."
+))
+LLM_MALFORMED_ITEMS = register(Counter(
+    "pinto_llm_malformed_items_total", "Batch response items that were missing or failed validation."
+))
+FALLBACK_CLASSIFICATIONS = register(Counter(
+    "pinto_fallback_classifications_total", "Log lines classified by the rule-based fallback."
+))
+TIER_LINES = register(Counter(
+    "pinto_tier_lines_total", "Log lines by the tier that classified them (cache, local, gemini, fallback).", ["tier"]
+))
+RECLASSIFIED_LINES = register(Counter(
+    "pinto_reclassified_lines_total", "Fallback-classified log lines given a Gemini result once it answered again."
+))
+LOCAL_ESCALATIONS = register(Counter(
+    "pinto_local_escalations_total", "Log lines the local model was not confident about and passed on."
+))
+CACHE_LOOKUPS = register(Counter(
+    "pinto_cache_lookups_total", "Classification cache lookups by result (hit or miss).", ["result"]
+))
+LINES_CLASSIFIED = register(Counter(
+    "pinto_lines_classified_total", "Log lines run through analyze_logs."
+))
+SYSLOG_RECEIVED = register(Counter(
+    "pinto_syslog_received_total", "Syslog frames accepted by the network receiver.", ["transport"]
+))
+SYSLOG_DROPPED = register(Counter(
+    "pinto_syslog_dropped_total", "Syslog frames dropped because the receive queue was full.", ["transport"]
+))
+SYSLOG_FAILED = register(Counter(
+    "pinto_syslog_failed_total", "Syslog frames discarded because their batch could not be classified."
+))
+SYSLOG_QUEUE_DEPTH = register(Gauge(
+    "pinto_syslog_queue_depth", "Frames waiting in the syslog receive queue."
+))
+SPIKES_DETECTED = register(Counter(
+    "pinto_spikes_detected_total", "Event count spikes flagged by the spike detector, by key kind.", ["kind"]
+))
+CALLBACK_SECONDS = register(Histogram(
+    "pinto_callback_seconds", "Dash callback duration.", ["callback"]
+))
@@ -1,11 +1,74 @@
 import datetime
 from datetime import datetime
 import re
-from collections import defaultdict
-import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
 import google.generativeai as genai
+import pandas as pd
+from google.api_core import exceptions as google_exceptions
 import json
+import mmap
 import os
+import random
+import threading
+import time
+from classification_cache import ClassificationCache
+from local_classifier import LocalClassifier
+import metrics
+
+# Location and size of the persistent template cache
+CACHE_PATH = "classification_cache.db"
+CACHE_MAX_ENTRIES = 10000
+
+# Local classifier trained on cached Gemini labels (see local_classifier.py); used when present
+LOCAL_MODEL_PATH = "local_model.npz"
+
+# Concurrency, rate limit and retry settings for Gemini requests
+GEMINI_CONCURRENCY = 8
+GEMINI_REQUESTS_PER_MINUTE = 60
+GEMINI_MAX_RETRIES = 3
+GEMINI_BATCH_SIZE = 20
+GEMINI_BATCH_CHARS = 4000
+
+# Seconds one Gemini request may take, and one pass over a file may spend on Gemini in total;
+# lines still unanswered when the budget runs out take the rule-based path
+GEMINI_TIMEOUT_SECONDS = 30
+GEMINI_DEADLINE_SECONDS = 120
+
+# Consecutive failed Gemini requests that open the circuit, and how long it stays open before
+# a single probe request is let through
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 60
+
+# Fallback-classified templates sent back to Gemini per pass once it answers again
+RECLASSIFY_BATCH_SIZE = 200
+
+# Number of lines read and classified at a time when streaming a log file
+LOG_CHUNK_SIZE = 5000
+
+# Target size of the byte ranges handed to each process in analyze_file_parallel
+PARALLEL_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Options used whenever logs are classified for the dashboard
+ANALYSIS_OPTIONS = {
+    'concurrency': GEMINI_CONCURRENCY,
+    'max_retries': GEMINI_MAX_RETRIES,
+    'batch_size': GEMINI_BATCH_SIZE,
+    'batch_chars': GEMINI_BATCH_CHARS,
+    'timeout': GEMINI_TIMEOUT_SECONDS
+}
+RETRY_BASE_DELAY = 1.0
+
+# Errors worth retrying; anything else (bad JSON, missing fields) fails immediately
+TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.TooManyRequests,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError
+)
 
 # Keep existing patterns as fallback
 ANOMALY_PATTERNS = {
@@ -38,6 +101,57 @@ ROOT_CAUSES = {
     }
 }
 
+# Variable parts of a log line, masked in order to build its template
+TEMPLATE_MASKS = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?"), "<TS>"),
+    (re.compile(r"\b[A-Z][a-z]{2} +\d{1,2} \d{2}:\d{2}:\d{2}\b"), "<TS>"),
+    (re.compile(r"\b(?:\d{1,3}\.){3}\d{1,3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b(?:[a-z0-9](?:[a-z0-9-]*[a-z0-9])?\.)+[a-z]{2,}\b", re.IGNORECASE), "<HOST>"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.IGNORECASE), "<HEX>"),
+    (re.compile(r"\d+"), "<NUM>"),
+]
+
+def normalize_template(log):
+    """Mask timestamps, IPs, hostnames and numbers so repeated events share one template."""
+    for pattern, placeholder in TEMPLATE_MASKS:
+        log = pattern.sub(placeholder, log)
+    return " ".join(log.split())
+
+# Event time as written by generate_log ("2024-11-12 04:18:22", optionally ISO "T"-separated),
+# with the fraction and UTC offset RFC 5424 senders add ("2024-11-12T04:18:22.123+02:00")
+ISO_TIMESTAMP_PATTERN = r"(\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2}\b)?)"
+# Classic syslog header time ("Nov 12 04:18:22"), which carries no year
+SYSLOG_TIMESTAMP_PATTERN = r"(?P<stamp>\b[A-Z][a-z]{2} +\d{1,2} \d{2}:\d{2}:\d{2})\b"
+
+def extract_timestamps(logs, fallback=None):
+    """Extract event times from log lines in bulk, using fallback (default: now) when none parse.
+
+    Times written with a UTC offset come back in UTC; times without one are kept as written.
+    """
+    lines = pd.Series(logs, dtype=object)
+    if fallback is None:
+        fallback = datetime.now()
+
+    stamps = lines.str.extract(ISO_TIMESTAMP_PATTERN, expand=False)
+    # Parsed as UTC, times with an offset are shifted to UTC and times without one are left as
+    # written; the offset is then dropped, and fractions too, to keep whole seconds
+    timestamps = pd.to_datetime(stamps, format="ISO8601", errors="coerce", utc=True)
+    timestamps = timestamps.dt.tz_convert(None).dt.floor("s")
+
+    # Only lines without an ISO time pay for the syslog-style pass; the year is assumed current
+    missing = timestamps.isna()
+    if missing.any():
+        stamps = lines[missing].str.extract(SYSLOG_TIMESTAMP_PATTERN)['stamp'].str.replace(r" +", " ", regex=True)
+        syslog_times = pd.to_datetime(
+            str(fallback.year) + " " + stamps, format="%Y %b %d %H:%M:%S", errors="coerce"
+        )
+        # A date ahead of the fallback belongs to last year (e.g. December lines read in January)
+        future = syslog_times > pd.Timestamp(fallback) + pd.Timedelta(days=1)
+        syslog_times[future] = syslog_times[future] - pd.DateOffset(years=1)
+        timestamps[missing] = syslog_times
+
+    return timestamps.fillna(pd.Timestamp(fallback))
+
 def setup_gemini():
     """Initialize the Gemini API."""
     API_KEY = os.getenv('GOOGLE_API_KEY')
@@ -46,7 +160,200 @@ def setup_gemini():
     genai.configure(api_key=API_KEY)
     return genai.GenerativeModel('gemini-pro')
 
-def classify_with_gemini(model, log_message):
+def load_gemini():
+    """Set up Gemini if an API key is configured, else None so lines stay on the cache, local and rule tiers."""
+    try:
+        return setup_gemini()
+    except ValueError as e:
+        print(f"{e} Classifying without Gemini.")
+        return None
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls evenly to stay under a requests-per-minute budget."""
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def acquire(self, deadline=None):
+        """Block until the caller may send its next request; False, without waiting, if that is past deadline."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            if deadline is not None and slot > deadline:
+                return False
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+        return True
+
+# Shared by every analysis in the process, so the budget holds across runs and threads
+GEMINI_RATE_LIMITER = RateLimiter(GEMINI_REQUESTS_PER_MINUTE)
+
+# Circuit breaker states, in the order the state gauge reports them
+CIRCUIT_STATES = ["closed", "open", "half-open"]
+
+class CircuitBreaker:
+    """Thread-safe breaker that stops calls to a failing service and probes it again later.
+
+    After failure_threshold consecutive failures the circuit opens and every call is refused
+    for reset_seconds. It then lets a single probe through: a success closes the circuit, a
+    failure opens it for another reset period. Calls made while the probe is in flight wait
+    for its outcome instead of being refused.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.lock = threading.Lock()
+        self.settled = threading.Condition(self.lock)
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def available(self):
+        """Whether a call would currently be let through, without claiming the probe."""
+        with self.lock:
+            return self.state != "open" or time.monotonic() - self.opened_at >= self.reset_seconds
+
+    def allow(self, deadline=None):
+        """Whether the caller may send a request now; after the reset period the first caller is the probe.
+
+        Others arriving during the probe wait, until deadline at most, and go ahead if it succeeded.
+        """
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.set_state("half-open")
+                return True
+            if self.state == "half-open":
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                self.settled.wait_for(lambda: self.state != "half-open", timeout)
+                return self.state == "closed"
+            return False
+
+    def record_success(self):
+        """A request was answered; close the circuit."""
+        with self.lock:
+            self.failures = 0
+            if self.state != "closed":
+                print("Gemini is answering again; circuit closed")
+                self.set_state("closed")
+
+    def record_failure(self):
+        """A request failed; open the circuit after too many in a row or a failed probe."""
+        with self.lock:
+            self.failures += 1
+            if self.state == "half-open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                if self.state == "closed":
+                    print(f"Gemini circuit open after {self.failures} consecutive failures; "
+                          f"using rule-based classification, probing every {self.reset_seconds}s")
+                self.opened_at = time.monotonic()
+                self.set_state("open")
+
+    def set_state(self, state):
+        """Change state, publish it and wake callers waiting on a probe; needs the lock."""
+        self.state = state
+        metrics.LLM_CIRCUIT_STATE.set(CIRCUIT_STATES.index(state))
+        self.settled.notify_all()
+
+# Shared by every dashboard analysis in the process, so one outage is detected once
+GEMINI_BREAKER = CircuitBreaker()
+
+class GeminiUnavailable(Exception):
+    """Raised instead of sending a request when the circuit is open or the deadline has passed."""
+
+    def __init__(self, reason):
+        super().__init__(f"Gemini request skipped ({reason})")
+        self.reason = reason
+
+def strip_code_fence(response_text):
+    """Remove a Markdown code fence Gemini sometimes wraps around JSON."""
+    response_text = response_text.strip()
+    if response_text.startswith("```json"):
+        response_text = response_text.replace("```json", "").replace("```", "")
+    return response_text.strip()
+
+def validate_classification(result):
+    """Check a single classification object, normalizing unknown severities to Info."""
+    if not isinstance(result, dict):
+        raise ValueError("Classification is not a JSON object")
+
+    if not all(key in result for key in ['severity', 'suggestion', 'explanation']):
+        raise ValueError("Missing required fields in response")
+
+    if result['severity'] not in ['Critical', 'Warning', 'Info']:
+        result['severity'] = 'Info'
+
+    return {key: result[key] for key in ['severity', 'suggestion', 'explanation']}
+
+def parse_gemini_response(response_text):
+    """Parse and validate the JSON classification returned by Gemini."""
+    return validate_classification(json.loads(strip_code_fence(response_text)))
+
+def parse_gemini_batch_response(response_text, count):
+    """Parse a batched JSON array into a list aligned with the prompt, using None for bad items."""
+    results = [None] * count
+    items = json.loads(strip_code_fence(response_text))
+    if not isinstance(items, list):
+        raise ValueError("Batch response is not a JSON array")
+
+    # Each element is validated on its own so one bad item does not sink the batch
+    for item in items:
+        try:
+            index = item['index']
+            if isinstance(index, int) and 0 <= index < count and results[index] is None:
+                results[index] = validate_classification(item)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return results
+
+def generate_with_retries(model, prompt, rate_limiter=None, max_retries=0, timeout=None, deadline=None, breaker=None):
+    """Send a prompt to Gemini, retrying transient errors with jittered exponential backoff.
+
+    Each attempt waits at most timeout seconds, and never past deadline (a time.monotonic()
+    value). Once the deadline has passed or the breaker refuses, GeminiUnavailable is raised
+    without sending anything; every failed attempt counts against the breaker.
+    """
+    for attempt in range(max_retries + 1):
+        # Checked before queueing for a rate limit slot, so refused requests return at once
+        if breaker is not None and not breaker.available():
+            raise GeminiUnavailable("circuit_open")
+        if rate_limiter is not None and not rate_limiter.acquire(deadline):
+            raise GeminiUnavailable("deadline")
+        request_timeout = timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise GeminiUnavailable("deadline")
+            request_timeout = min(timeout, remaining) if timeout else remaining
+        if breaker is not None and not breaker.allow(deadline):
+            raise GeminiUnavailable("circuit_open")
+        try:
+            if request_timeout:
+                response = model.generate_content(prompt, request_options={'timeout': request_timeout})
+            else:
+                response = model.generate_content(prompt)
+        except Exception as e:
+            if breaker is not None:
+                breaker.record_failure()
+            if not isinstance(e, TRANSIENT_ERRORS) or attempt == max_retries:
+                raise
+            # Full jitter keeps concurrent workers from retrying in lockstep
+            delay = random.uniform(0, RETRY_BASE_DELAY * 2 ** attempt)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise
+            metrics.LLM_RETRIES.inc()
+            time.sleep(delay)
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return response.text
+
+def classify_with_gemini(model, log_message, rate_limiter=None, max_retries=0, timeout=None, deadline=None,
+                         breaker=None):
     """Classify a log message using Gemini AI."""
     prompt = """
     You are a system log analyzer. Analyze this log message and classify it into Critical, Warning, or Info:
@@ -59,73 +366,292 @@ def classify_with_gemini(model, log_message):
     Keep suggestions and explanations brief and technical. Respond only with the JSON.
     """
     
+    start = time.perf_counter()
     try:
-        response = model.generate_content(prompt.format(log_message=log_message))
-        response_text = response.text.strip()
-        
-        # Clean up response text
-        if response_text.startswith("```json"):
-            response_text = response_text.replace("```json", "").replace("```", "")
-        response_text = response_text.strip()
-        
-        # Parse and validate response
-        result = json.loads(response_text)
-        
-        if not all(key in result for key in ['severity', 'suggestion', 'explanation']):
-            raise ValueError("Missing required fields in response")
-            
-        if result['severity'] not in ['Critical', 'Warning', 'Info']:
-            result['severity'] = 'Info'
-            
+        response_text = generate_with_retries(
+            model, prompt.format(log_message=log_message), rate_limiter, max_retries, timeout, deadline, breaker
+        )
+        result = parse_gemini_response(response_text)
+        metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, kind="single", outcome="success")
         return result
+
+    except GeminiUnavailable as e:
+        metrics.LLM_SKIPPED.inc(reason=e.reason)
+        return None
         
     except Exception as e:
+        metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, kind="single", outcome="error")
+        metrics.LLM_ERRORS.inc(kind="single", error=type(e).__name__)
         print(f"Gemini classification error for log: {log_message}")
         print(f"Error: {e}")
         return None
 
+def classify_batch_with_gemini(model, log_messages, rate_limiter=None, max_retries=0, timeout=None, deadline=None,
+                               breaker=None):
+    """Classify several log messages with one Gemini prompt, returning results in input order."""
+    prompt = """
+    You are a system log analyzer. Analyze each numbered log message below and classify it into Critical, Warning, or Info:
+    
+    Log messages:
+    {numbered_logs}
+    
+    Format your response exactly like this JSON array, with one object per log message:
+    [{{"index": LOG_NUMBER, "severity": "SEVERITY_LEVEL", "suggestion": "SUGGESTED_ACTION", "explanation": "REASON_FOR_CLASSIFICATION"}}]
+    
+    Keep suggestions and explanations brief and technical. Respond only with the JSON.
+    """
+    numbered_logs = "\n    ".join(f"{i}: {log}" for i, log in enumerate(log_messages))
+
+    start = time.perf_counter()
+    try:
+        response_text = generate_with_retries(
+            model, prompt.format(numbered_logs=numbered_logs), rate_limiter, max_retries, timeout, deadline, breaker
+        )
+        results = parse_gemini_batch_response(response_text, len(log_messages))
+        metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, kind="batch", outcome="success")
+        missing = results.count(None)
+        if missing:
+            metrics.LLM_MALFORMED_ITEMS.inc(missing)
+            print(f"Gemini batch classification returned {missing} of {len(log_messages)} items missing or malformed")
+        return results
+
+    except GeminiUnavailable as e:
+        metrics.LLM_SKIPPED.inc(reason=e.reason)
+        return [None] * len(log_messages)
+
+    except Exception as e:
+        metrics.LLM_REQUEST_SECONDS.observe(time.perf_counter() - start, kind="batch", outcome="error")
+        metrics.LLM_ERRORS.inc(kind="batch", error=type(e).__name__)
+        print(f"Gemini batch classification error for {len(log_messages)} logs")
+        print(f"Error: {e}")
+        return [None] * len(log_messages)
+
+def make_batches(logs, max_lines, max_chars=None):
+    """Group logs into batches bounded by line count and total characters."""
+    batch = []
+    batch_chars = 0
+    for log in logs:
+        if batch and (len(batch) >= max_lines or (max_chars and batch_chars + len(log) > max_chars)):
+            yield batch
+            batch = []
+            batch_chars = 0
+        batch.append(log)
+        batch_chars += len(log)
+    if batch:
+        yield batch
+
+def request_classifications(model, logs, concurrency=1, rate_limiter=None, max_retries=0,
+                            batch_size=1, batch_chars=None, timeout=None, deadline=None, breaker=None):
+    """Send logs to Gemini singly or in batches, optionally on a thread pool, keeping input order.
+
+    Requests skipped because of the deadline or the breaker come back as None, like failed ones.
+    """
+    if batch_size > 1:
+        batches = list(make_batches(logs, batch_size, batch_chars))
+        def task(batch):
+            return classify_batch_with_gemini(model, batch, rate_limiter, max_retries, timeout, deadline, breaker)
+    else:
+        batches = [[log] for log in logs]
+        def task(batch):
+            return [classify_with_gemini(model, batch[0], rate_limiter, max_retries, timeout, deadline, breaker)]
+
+    if concurrency > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            batch_results = list(executor.map(task, batches))
+    else:
+        batch_results = [task(batch) for batch in batches]
+    return [result for results in batch_results for result in results]
+
+def iter_logs(file_path):
+    """Yield syslog lines one at a time, memory-mapping the file where possible."""
+    with open(file_path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files and pipes cannot be mapped; fall back to buffered reads
+            for line in file:
+                yield line.decode("utf-8", errors="replace").strip()
+            return
+        with mapped:
+            for line in iter(mapped.readline, b""):
+                yield line.decode("utf-8", errors="replace").strip()
+
+def iter_log_chunks(file_path, chunk_size=LOG_CHUNK_SIZE):
+    """Yield lists of at most chunk_size syslog lines."""
+    chunk = []
+    for line in iter_logs(file_path):
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
 def read_logs(file_path):
     """Read syslogs from file."""
-    with open(file_path, "r") as file:
-        return [line.strip() for line in file.readlines()]
+    return list(iter_logs(file_path))
+
+def required_literals(pattern):
+    """Return lowercase literals a pattern needs, or None if it is not a plain 'a.*b' rule."""
+    parts = pattern.split(".*")
+    if not all(re.fullmatch(r"[\w \-]+", part, re.ASCII) for part in parts):
+        return None
+    return [part.lower() for part in parts]
+
+class RuleMatcher:
+    """Rule-based classifier compiled once from the anomaly and root cause tables.
+
+    Each rule keeps its literal keywords so an ASCII line only runs the regexes whose
+    keywords all appear in it. Root causes that repeat a severity rule reuse the outcome
+    already known from the severity scan, so each line is matched in a single pass while
+    rules keep the priority order of the original nested loops.
+    """
+
+    def __init__(self, anomaly_patterns, root_causes):
+        self.severity_rules = [
+            (severity, re.compile(pattern, re.IGNORECASE), required_literals(pattern))
+            for severity, patterns in anomaly_patterns.items()
+            for pattern in patterns
+        ]
+        rule_positions = {}
+        for position, (_, regex, _) in enumerate(self.severity_rules):
+            rule_positions.setdefault(regex.pattern, position)
+        self.root_cause_rules = [
+            (re.compile(cause, re.IGNORECASE), required_literals(cause), rule_positions.get(cause), data)
+            for cause, data in root_causes.items()
+        ]
+
+    def classify(self, log):
+        """Return severity, suggestion and explanation for a log line."""
+        # Lowercasing is only an exact match for re.IGNORECASE on ASCII text
+        lowered = log.lower() if log.isascii() else None
+
+        for position, (severity, regex, literals) in enumerate(self.severity_rules):
+            if lowered is not None and literals is not None and not all(literal in lowered for literal in literals):
+                continue
+            if not regex.search(log):
+                continue
+
+            # Find matching root cause if any; rules before this one are known not to match
+            suggestion = "No specific suggestion available"
+            explanation = "Classification based on pattern matching"
+            for cause_regex, cause_literals, rule_position, data in self.root_cause_rules:
+                if rule_position is not None and rule_position <= position:
+                    matched = rule_position == position
+                elif lowered is not None and cause_literals is not None and not all(literal in lowered for literal in cause_literals):
+                    matched = False
+                else:
+                    matched = cause_regex.search(log) is not None
+                if matched:
+                    suggestion = data['suggestion']
+                    explanation = data['explanation']
+                    break
+            return {
+                'severity': severity,
+                'suggestion': suggestion,
+                'explanation': explanation
+            }
+        return {
+            'severity': 'Info',
+            'suggestion': 'No specific action required',
+            'explanation': 'Default classification for unmatched log'
+        }
+
+FALLBACK_MATCHER = RuleMatcher(ANOMALY_PATTERNS, ROOT_CAUSES)
 
 def fallback_classification(log):
     """Use pattern matching as fallback classification method."""
-    for severity, patterns in ANOMALY_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, log, re.IGNORECASE):
-                # Find matching root cause if any
-                suggestion = "No specific suggestion available"
-                explanation = "Classification based on pattern matching"
-                for cause, data in ROOT_CAUSES.items():
-                    if re.search(cause, log, re.IGNORECASE):
-                        suggestion = data['suggestion']
-                        explanation = data['explanation']
-                        break
-                return {
-                    'severity': severity,
-                    'suggestion': suggestion,
-                    'explanation': explanation
-                }
-    return {
-        'severity': 'Info',
-        'suggestion': 'No specific action required',
-        'explanation': 'Default classification for unmatched log'
-    }
+    return FALLBACK_MATCHER.classify(log)
+
+def analyze_logs(logs, model, cache=None, concurrency=1, rate_limiter=None, max_retries=0,
+                 batch_size=1, batch_chars=None, local_model=None, timeout=None, deadline=None,
+                 breaker=None):
+    """Classify logs using Gemini AI with pattern matching as fallback.
+
+    Lines go through the cache, then the local model if one is given, and only lines it is not
+    confident about are escalated to Gemini. With concurrency above 1, Gemini requests run on a
+    thread pool; with batch_size above 1, several lines share one prompt. Results always keep
+    the input order and record which tier produced them. With model=None no line reaches
+    Gemini and the rule-based path handles whatever is left.
 
-def analyze_logs(logs, model):
-    """Classify logs using Gemini AI with pattern matching as fallback."""
+    timeout bounds each Gemini request and deadline (a time.monotonic() value) all of them, and a
+    CircuitBreaker stops requests while Gemini keeps failing, so an outage costs about one
+    timeout rather than one per line. Lines left unanswered get tier 'fallback', which marks
+    them for reclassify_templates once Gemini is back.
+    """
+    started = time.perf_counter()
     classified = defaultdict(list)
     analyzed_logs = []
 
+    # Resolve cached templates and send each new template to Gemini only once
+    entries = []
+    requests = []
+    slots = {}
     for log in logs:
-        # Try Gemini classification first
-        gemini_result = classify_with_gemini(model, log)
-        
-        # If Gemini fails, use fallback classification
-        if not gemini_result:
-            gemini_result = fallback_classification(log)
-        
+        template = normalize_template(log) if cache is not None else None
+        if template is not None and template in slots:
+            entries.append((log, slots[template]))
+            continue
+
+        cached = cache.get(template) if cache is not None else None
+        if cached:
+            entries.append((log, cached))
+            continue
+
+        if template is not None:
+            slots[template] = len(requests)
+        entries.append((log, len(requests)))
+        requests.append((log, template))
+
+    # The local model answers what it is confident about; only the rest reach Gemini
+    results = [None] * len(requests)
+    tiers = ["gemini"] * len(requests)
+    pending = list(range(len(requests)))
+    if local_model is not None and requests:
+        with metrics.STAGE_SECONDS.time(stage="local"):
+            local_results = local_model.classify([log for log, _ in requests])
+        pending = []
+        for slot, result in enumerate(local_results):
+            if result:
+                results[slot] = result
+                tiers[slot] = "local"
+            else:
+                pending.append(slot)
+
+    if model is not None and pending:
+        gemini_results = request_classifications(
+            model, [requests[slot][0] for slot in pending], concurrency, rate_limiter, max_retries,
+            batch_size, batch_chars, timeout, deadline, breaker
+        )
+        for slot, result in zip(pending, gemini_results):
+            results[slot] = result
+            # Only Gemini answers are cached, since the cache is also the local model's training data
+            if result and cache is not None:
+                cache.put(requests[slot][1], result)
+
+    resolved = []
+    line_tiers = []
+    escalated_slots = set(pending) if local_model is not None else set()
+    escalated = 0
+    for _, slot in entries:
+        if isinstance(slot, int):
+            resolved.append(results[slot])
+            line_tiers.append(tiers[slot])
+            escalated += slot in escalated_slots
+        else:
+            resolved.append(slot)
+            line_tiers.append("cache")
+
+    # If Gemini fails, use fallback classification
+    missing = [i for i, result in enumerate(resolved) if not result]
+    if missing:
+        with metrics.STAGE_SECONDS.time(stage="fallback"):
+            for i in missing:
+                resolved[i] = fallback_classification(entries[i][0])
+                line_tiers[i] = "fallback"
+        metrics.FALLBACK_CLASSIFICATIONS.inc(len(missing))
+
+    for (log, _), gemini_result, tier in zip(entries, resolved, line_tiers):
         severity = gemini_result['severity']
         classified[severity].append(log)
         
@@ -133,43 +659,210 @@ def analyze_logs(logs, model):
             'log': log,
             'severity': severity,
             'suggestion': gemini_result['suggestion'],
-            'explanation': gemini_result['explanation']
+            'explanation': gemini_result['explanation'],
+            'tier': tier
         })
 
+    metrics.LINES_CLASSIFIED.inc(len(analyzed_logs))
+    for tier, count in Counter(line_tiers).items():
+        metrics.TIER_LINES.inc(count, tier=tier)
+    if escalated:
+        metrics.LOCAL_ESCALATIONS.inc(escalated)
+
+    metrics.STAGE_SECONDS.observe(time.perf_counter() - started, stage="classify")
     return classified, analyzed_logs
 
-def get_logs_for_dashboard(file_path):
-    """Process logs and prepare them for dashboard display."""
+def run_deadline(deadline_seconds):
+    """The time.monotonic() value a run given deadline_seconds of Gemini time must finish by, or None."""
+    return time.monotonic() + deadline_seconds if deadline_seconds else None
+
+def analyze_log_file(file_path, model, cache=None, chunk_size=LOG_CHUNK_SIZE, deadline_seconds=None, **options):
+    """Stream a log file through analyze_logs, yielding analyzed logs one chunk at a time.
+
+    deadline_seconds bounds the Gemini time of the whole file, not of each chunk.
+    """
+    deadline = run_deadline(deadline_seconds)
+    for logs in iter_log_chunks(file_path, chunk_size):
+        _, analyzed_logs = analyze_logs(logs, model, cache, deadline=deadline, **options)
+        yield analyzed_logs
+
+def split_file_ranges(file_path, chunk_bytes=PARALLEL_CHUNK_BYTES):
+    """Split a file into (start, end) byte ranges that begin and end on line boundaries."""
+    size = os.path.getsize(file_path)
+    boundaries = [0]
+    with open(file_path, "rb") as file:
+        target = chunk_bytes
+        while target < size:
+            # Finish the line that contains the target byte
+            file.seek(target - 1)
+            file.readline()
+            position = file.tell()
+            if position >= size:
+                break
+            boundaries.append(position)
+            target = position + chunk_bytes
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+def classify_file_range(file_path, start, end):
+    """Read one byte range of a log file and classify its lines with the rule-based path."""
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    # Ranges end on newlines, so decoding the whole range never splits a character
+    lines = data.decode("utf-8", errors="replace").split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return analyze_logs([line.strip() for line in lines], None)[1]
+
+def analyze_file_parallel(file_path, workers=None, chunk_bytes=PARALLEL_CHUNK_BYTES):
+    """Classify a whole log file with the rule-based path on a process pool.
+
+    Results match analyze_logs(read_logs(file_path), None) line for line and keep file order.
+    """
+    classified = defaultdict(list)
+    analyzed_logs = []
+    ranges = split_file_ranges(file_path, chunk_bytes)
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for range_logs in executor.map(classify_file_range, repeat(file_path), starts, ends):
+            for log_data in range_logs:
+                classified[log_data['severity']].append(log_data['log'])
+                analyzed_logs.append(log_data)
+
+    return classified, analyzed_logs
+
+def load_local_model(path=LOCAL_MODEL_PATH):
+    """Load the local classifier if one has been trained, else None."""
+    if not path or not os.path.exists(path):
+        return None
     try:
-        # Initialize Gemini
-        model = setup_gemini()
-        
-        # Read and analyze logs
-        logs = read_logs(file_path)
-        _, analyzed_logs = analyze_logs(logs, model)
-        
-        # Prepare logs for dashboard
-        dashboard_logs = []
-        for log_data in analyzed_logs:
-            dashboard_logs.append({
-                'id': str(uuid.uuid4()),
-                'log': log_data['log'],
-                'severity': log_data['severity'],
-                'suggestion': log_data['suggestion'],
-                'explanation': log_data['explanation'],
-                'timestamp': datetime.now()  # You can adjust this for actual timestamps
-            })
-        
-        return dashboard_logs
+        return LocalClassifier.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Ignoring unreadable local model {path}: {e}")
+        return None
+
+def iter_dashboard_logs(chunks, model, cache_path=CACHE_PATH, local_model=None,
+                        deadline_seconds=GEMINI_DEADLINE_SECONDS):
+    """Classify chunks of log lines, yielding dashboard rows one chunk at a time.
+
+    model is Gemini (or a StubModel), or None to classify with the cache, local model and rules
+    alone. deadline_seconds bounds the Gemini time of the whole run; None leaves it unbounded.
+    """
+    deadline = run_deadline(deadline_seconds)
+
+    # Analyze logs, reusing results for templates seen before
+    cache = ClassificationCache(cache_path, CACHE_MAX_ENTRIES)
+    tier_counts = Counter()
+    chunks = iter(chunks)
+    try:
+        while True:
+            # Reading is timed separately from classification; chunks may come from disk or a tailer
+            with metrics.STAGE_SECONDS.time(stage="read"):
+                logs = next(chunks, None)
+            if logs is None:
+                break
+            _, analyzed_logs = analyze_logs(
+                logs, model, cache, rate_limiter=GEMINI_RATE_LIMITER, local_model=local_model, deadline=deadline,
+                breaker=GEMINI_BREAKER, **ANALYSIS_OPTIONS
+            )
+            timestamps = extract_timestamps(logs).tolist()
+
+            # Prepare logs for dashboard
+            dashboard_logs = []
+            for log_data, timestamp in zip(analyzed_logs, timestamps):
+                tier_counts[log_data['tier']] += 1
+                dashboard_logs.append({
+                    'log': log_data['log'],
+                    'severity': log_data['severity'],
+                    'suggestion': log_data['suggestion'],
+                    'explanation': log_data['explanation'],
+                    'timestamp': timestamp,
+                    'template': normalize_template(log_data['log']),
+                    'tier': log_data['tier']
+                })
+            yield dashboard_logs
+        stats = cache.stats()
+        if stats['hits'] or stats['misses']:
+            print(f"Classification cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.1%} hit rate, {stats['size']} templates stored)")
+        if tier_counts:
+            print("Classified by tier: " + ", ".join(f"{tier} {count}" for tier, count in sorted(tier_counts.items())))
+    finally:
+        cache.close()
+
+def classify_chunks_for_dashboard(chunks, model=None, cache_path=CACHE_PATH):
+    """Classify chunks of log lines and return them as dashboard rows.
+
+    Gemini is set up from the environment unless a model (such as a StubModel) is passed in.
+    """
+    if model is None:
+        model = load_gemini()
+    local_model = load_local_model()
+    return [
+        row for dashboard_logs in iter_dashboard_logs(chunks, model, cache_path, local_model)
+        for row in dashboard_logs
+    ]
+
+def reclassify_templates(samples, model, cache_path=CACHE_PATH):
+    """Classify {template: sample line} again, returning {template: result} for those Gemini answered.
+
+    Used to replace rule-based results once Gemini is reachable again. Results carry the
+    tier that produced them; templates that still fell back are left out, so they stay
+    marked for a later pass.
+    """
+    templates = list(samples)
+    cache = ClassificationCache(cache_path, CACHE_MAX_ENTRIES)
+    try:
+        _, analyzed_logs = analyze_logs(
+            [samples[template] for template in templates], model, cache, rate_limiter=GEMINI_RATE_LIMITER,
+            deadline=run_deadline(GEMINI_DEADLINE_SECONDS), breaker=GEMINI_BREAKER, **ANALYSIS_OPTIONS
+        )
+    finally:
+        cache.close()
+    return {
+        template: {key: log_data[key] for key in ['severity', 'suggestion', 'explanation', 'tier']}
+        for template, log_data in zip(templates, analyzed_logs)
+        if log_data['tier'] in ("cache", "gemini")
+    }
+
+def sample_dashboard_logs():
+    """Placeholder rows shown when the log file cannot be analyzed."""
+    return [{
+        'log': 'System started successfully',
+        'severity': 'Info',
+        'suggestion': 'No action needed',
+        'explanation': 'Normal startup message',
+        'timestamp': datetime.now(),
+        'template': 'System started successfully',
+        'tier': 'sample'
+    }]
+
+def get_logs_for_dashboard(file_path, tailer=None, model=None, cache_path=CACHE_PATH):
+    """Process logs and prepare them for dashboard display.
+
+    When a LogTailer is given, the file is read through it so later polls resume where this
+    read stopped.
+    """
+    try:
+        if tailer is not None:
+            chunks = tailer.iter_new_chunks(LOG_CHUNK_SIZE)
+        else:
+            chunks = iter_log_chunks(file_path)
+        return classify_chunks_for_dashboard(chunks, model, cache_path)
         
     except Exception as e:
         print(f"Error in get_logs_for_dashboard: {e}")
         # Return sample data as fallback
-        return [{
-            'id': str(uuid.uuid4()),
-            'log': 'System started successfully',
-            'severity': 'Info',
-            'suggestion': 'No action needed',
-            'explanation': 'Normal startup message',
-            'timestamp': datetime.now()
-        }]
\ No newline at end of file
+        return sample_dashboard_logs()
+
+def get_new_logs_for_dashboard(tailer):
+    """Classify only the lines appended since the tailer's last read."""
+    try:
+        return classify_chunks_for_dashboard(tailer.iter_new_chunks(LOG_CHUNK_SIZE))
+    except Exception as e:
+        print(f"Error in get_new_logs_for_dashboard: {e}")
+        return []
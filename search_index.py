@@ -0,0 +1,114 @@
+import re
+import threading
+import numpy as np
+
+# Tokens are runs of letters and digits, lowercased; SQLite's FTS5 unicode61 tokenizer agrees
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# ASCII separators mapped to spaces, so ASCII lines tokenize with str.split instead of the regex
+ASCII_SEPARATORS = str.maketrans({c: " " for c in map(chr, range(128)) if not c.isalnum()})
+
+def tokenize(text):
+    """Lowercased tokens of a log line or query."""
+    text = text.lower()
+    if text.isascii():
+        return text.translate(ASCII_SEPARATORS).split()
+    return TOKEN_PATTERN.findall(text)
+
+def parse_query(text):
+    """Split a search box query into phrases, each a tuple of tokens.
+
+    Double-quoted text is one phrase; every other word is a single-token phrase. All phrases
+    must match, so 'dns failed' and '"dns resolution failed"' both find "DNS resolution failed".
+    """
+    phrases = []
+    for quoted, bare in re.findall(r'"([^"]*)"?|(\S+)', text or ""):
+        if quoted:
+            tokens = tuple(tokenize(quoted))
+            if tokens:
+                phrases.append(tokens)
+        else:
+            phrases.extend((token,) for token in tokenize(bare))
+    return phrases
+
+def phrase_pattern(phrase):
+    """Regex matching a phrase's tokens consecutively, with only separators between them."""
+    return r"(?<![^\W_])" + r"[\W_]+".join(re.escape(token) for token in phrase) + r"(?![^\W_])"
+
+class TokenIndex:
+    """Inverted index from token to the sorted row ids containing it, built incrementally.
+
+    Each append adds one posting array per token; arrays for a token are merged the first
+    time a query touches it, so ingestion never rewrites existing postings.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings = {}
+
+    def add(self, ids, logs):
+        """Index lines under the given row ids; ids must exceed all indexed ones."""
+        postings = {}
+        for position, log in zip(ids.tolist(), logs):
+            for token in set(tokenize(log)):
+                rows = postings.get(token)
+                if rows is None:
+                    postings[token] = [position]
+                else:
+                    rows.append(position)
+        with self.lock:
+            for token, rows in postings.items():
+                self.postings.setdefault(token, []).append(np.array(rows, dtype=np.int64))
+
+    def discard_before(self, first):
+        """Forget ids below first, once their rows have been evicted."""
+        with self.lock:
+            for token in list(self.postings):
+                arrays = self.postings[token]
+                # Arrays are in id order, so whole ones drop off the front
+                while arrays and arrays[0][-1] < first:
+                    arrays.pop(0)
+                if not arrays:
+                    del self.postings[token]
+                elif arrays[0][0] < first:
+                    arrays[0] = arrays[0][np.searchsorted(arrays[0], first):]
+
+    def posting(self, token):
+        """Sorted row ids containing a token."""
+        with self.lock:
+            arrays = self.postings.get(token)
+            if not arrays:
+                return np.empty(0, dtype=np.int64)
+            if len(arrays) > 1:
+                arrays[:] = [np.concatenate(arrays)]
+            return arrays[0]
+
+    def search(self, phrases, id_range, lines, candidates=None):
+        """Sorted row ids matching every phrase, optionally restricted to candidates.
+
+        id_range is the (first, stop) range of ids still held, and lines(ids) returns those
+        rows' text as a Series, for checking phrase order.
+        """
+        rows = candidates
+        # Rarest tokens first keeps the intermediate intersections small
+        tokens = sorted({token for phrase in phrases for token in phrase}, key=lambda t: len(self.posting(t)))
+        for token in tokens:
+            posting = self.posting(token)
+            rows = posting if rows is None else np.intersect1d(rows, posting, assume_unique=True)
+            if not len(rows):
+                return rows
+        first, stop = id_range
+        if rows is None or stop <= first:
+            return np.empty(0, dtype=np.int64)
+        # The index may be ahead of (or, after evictions, behind) the rows held
+        rows = rows[(rows >= first) & (rows < stop)]
+
+        # Postings only prove the tokens are present; multi-token phrases also need their order checked
+        multi = [phrase for phrase in phrases if len(phrase) > 1]
+        if multi and len(rows):
+            candidate_lines = lines(rows)
+            keep = np.ones(len(rows), dtype=bool)
+            for phrase in multi:
+                keep &= candidate_lines.str.contains(phrase_pattern(phrase), case=False, regex=True).to_numpy()
+            rows = rows[keep]
+        return rows
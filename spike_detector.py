@@ -0,0 +1,161 @@
+from collections import Counter
+import numpy as np
+import pandas as pd
+import metrics
+
+# Events are counted in bins of this many seconds; a window is the last SPIKE_WINDOW_BINS bins
+SPIKE_BIN_SECONDS = 30
+SPIKE_WINDOW_BINS = 10
+
+# Bins over which the baseline rate is averaged (an EWMA span of about an hour)
+BASELINE_SPAN_BINS = 120
+
+# A window is a spike when it holds at least MIN_SPIKE_COUNT events and SPIKE_RATIO times its baseline
+SPIKE_RATIO = 10.0
+MIN_SPIKE_COUNT = 20
+
+# Baseline assumed for keys with little or no history, so a new event type needs a real burst
+MIN_BASELINE = 1.0
+
+# An open spike closes once its window drops below this fraction of the threshold, so a burst
+# hovering around the threshold is reported once rather than flapping
+SPIKE_CLEAR_FRACTION = 0.5
+
+class WindowCounter:
+    """Event counts of one key over the last window of bins, plus an EWMA of the bins before it."""
+
+    __slots__ = ('counts', 'total', 'bin', 'ewma', 'weight', 'spike')
+
+    def __init__(self, window_bins, bin_index):
+        # Ring of per-bin counts indexed by bin % window_bins, and their sum
+        self.counts = [0] * window_bins
+        self.total = 0
+        self.bin = bin_index
+        self.ewma = 0.0
+        # Total EWMA weight so far; dividing by it removes the bias of starting from zero
+        self.weight = 0.0
+        # Spike record while the window stays above the threshold, else None
+        self.spike = None
+
+    def baseline(self, window_bins):
+        """Expected window total from the bins before the window, or None without history."""
+        return window_bins * self.ewma / self.weight if self.weight else None
+
+class SpikeDetector:
+    """Flags sudden jumps in event counts per severity and per template, incrementally.
+
+    Each key keeps a ring of per-bin counts and their sum, so counting events is O(1) and no
+    history is rescanned; bins are only closed for keys that receive events. Bins leaving the
+    window feed an exponentially weighted baseline, so a burst inside the window cannot raise
+    its own bar. A window well above its baseline opens a spike, whose count follows the peak
+    until the window falls well back below the threshold.
+    """
+
+    def __init__(self, severities, bin_seconds=SPIKE_BIN_SECONDS, window_bins=SPIKE_WINDOW_BINS,
+                 baseline_span=BASELINE_SPAN_BINS, ratio=SPIKE_RATIO, min_count=MIN_SPIKE_COUNT,
+                 min_baseline=MIN_BASELINE):
+        # Most severe first; a template spike is labelled with the worst severity it was seen with
+        self.rank = {severity: rank for rank, severity in enumerate(severities)}
+        self.bin_seconds = bin_seconds
+        self.window_bins = window_bins
+        self.alpha = 2.0 / (baseline_span + 1)
+        # A baseline must rest on at least a window's worth of observed bins before it can alert
+        self.min_weight = 1 - (1 - self.alpha) ** window_bins
+        self.ratio = ratio
+        self.min_count = min_count
+        self.min_baseline = min_baseline
+        self.counters = {}
+        # Bins before the first event seen are unobserved, so they never train a baseline
+        self.first_bin = None
+
+    def observe(self, timestamps, severities, templates):
+        """Count a batch of classified rows; return the spike records it opened or raised."""
+        valid = timestamps.notna().to_numpy()
+        bins = (timestamps.to_numpy()[valid].astype('datetime64[s]').astype(np.int64) // self.bin_seconds).tolist()
+        if not bins:
+            return []
+        if self.first_bin is None:
+            self.first_bin = min(bins)
+
+        # Rows are folded into (bin, key) counts first, so per-key work scales with keys, not rows
+        keyed = Counter()
+        worst = {}
+        rows = zip(bins, severities.to_numpy()[valid].tolist(), templates.to_numpy()[valid].tolist())
+        for (bin_index, severity, template), count in Counter(rows).items():
+            keyed[(bin_index, 'severity', severity)] += count
+            keyed[(bin_index, 'template', template)] += count
+            current = worst.get(template)
+            if current is None or self.rank.get(severity, len(self.rank)) < self.rank.get(current, len(self.rank)):
+                worst[template] = severity
+
+        changed = {}
+        for (bin_index, kind, key), count in sorted(keyed.items()):
+            spike = self.add((kind, key), bin_index, count, key if kind == 'severity' else worst[key])
+            if spike is not None:
+                changed[id(spike)] = spike
+        return list(changed.values())
+
+    def add(self, key, bin_index, count, severity):
+        """Count events for a key in a bin; return its spike record if this opened or raised it."""
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.counters[key] = WindowCounter(self.window_bins, bin_index)
+            # Every observed bin before a key's first event held none of it
+            counter.weight = 1 - (1 - self.alpha) ** max(0, bin_index - self.first_bin)
+        elif bin_index > counter.bin:
+            self.advance(counter, bin_index)
+        elif bin_index <= counter.bin - self.window_bins:
+            # Too late to fall inside the current window
+            return None
+        counter.counts[bin_index % self.window_bins] += count
+        counter.total += count
+
+        if counter.spike is not None:
+            if counter.total <= counter.spike['count']:
+                return None
+            counter.spike['count'] = counter.total
+            return counter.spike
+        if counter.weight < self.min_weight or counter.total < self.threshold(counter):
+            return None
+        window_start = (counter.bin - self.window_bins + 1) * self.bin_seconds
+        counter.spike = {
+            'kind': key[0],
+            'key': key[1],
+            'severity': severity,
+            'window_start': pd.Timestamp(window_start, unit='s'),
+            'window_end': pd.Timestamp(window_start + self.window_bins * self.bin_seconds, unit='s'),
+            'count': counter.total,
+            'baseline': counter.baseline(self.window_bins) or 0.0
+        }
+        metrics.SPIKES_DETECTED.inc(kind=key[0])
+        return counter.spike
+
+    def threshold(self, counter):
+        """Window total at which a key counts as spiking."""
+        return max(self.min_count, self.ratio * max(counter.baseline(self.window_bins) or 0.0, self.min_baseline))
+
+    def advance(self, counter, bin_index):
+        """Move a key's window forward to end at bin_index, training its baseline on the bins that leave."""
+        steps = bin_index - counter.bin
+        for _ in range(min(steps, self.window_bins)):
+            self.close_bin(counter)
+        if counter.bin < bin_index:
+            # The window is empty from here on, so the bins still to leave are observed zeros
+            trained = max(0, bin_index - max(counter.bin, self.first_bin + self.window_bins - 1))
+            decay = (1 - self.alpha) ** trained
+            counter.ewma *= decay
+            counter.weight = 1 - (1 - counter.weight) * decay
+            counter.bin = bin_index
+        if counter.spike is not None and counter.total < SPIKE_CLEAR_FRACTION * self.threshold(counter):
+            counter.spike = None
+
+    def close_bin(self, counter):
+        """Start the next bin, folding the bin that leaves the window into the baseline."""
+        counter.bin += 1
+        slot = counter.bin % self.window_bins
+        leaving = counter.counts[slot]
+        if counter.bin - self.window_bins >= self.first_bin:
+            counter.ewma += self.alpha * (leaving - counter.ewma)
+            counter.weight += self.alpha * (1 - counter.weight)
+        counter.total -= leaving
+        counter.counts[slot] = 0
@@ -0,0 +1,65 @@
+import json
+import random
+import re
+import threading
+import time
+from risk_identification import fallback_classification
+
+class StubResponse:
+    """Minimal stand-in for a Gemini response object."""
+
+    def __init__(self, text):
+        self.text = text
+
+class StubModel:
+    """Local stand-in for the Gemini model that injects latency and transient failures.
+
+    Answers are produced by classifier (the rule-based one by default), so runs are
+    reproducible offline.
+    """
+
+    def __init__(self, latency=0.05, jitter=0.0, failure_rate=0.0, malformed_rate=0.0, seed=None,
+                 classifier=fallback_classification):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.malformed_rate = malformed_rate
+        self.classifier = classifier
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+
+    def generate_content(self, prompt, **kwargs):
+        """Sleep for the configured latency, then fail or answer like Gemini would."""
+        with self.lock:
+            self.calls += 1
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            fail = self.random.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        # Like the real client, give up once the request timeout passes
+        timeout = (kwargs.get('request_options') or {}).get('timeout')
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("Injected request timeout")
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError("Injected transient failure")
+
+        # Batched prompts list numbered lines and expect a JSON array back
+        numbered = re.findall(r"^\s*(\d+): (.*)$", prompt, re.MULTILINE)
+        if "Log messages:" in prompt:
+            items = []
+            for index, log_message in numbered:
+                with self.lock:
+                    malformed = self.random.random() < self.malformed_rate
+                if malformed:
+                    items.append({'index': int(index), 'severity': 'Critical'})
+                else:
+                    items.append({'index': int(index), **self.classifier(log_message)})
+            return StubResponse(json.dumps(items))
+
+        match = re.search(r"Log message: (.*)", prompt)
+        log_message = match.group(1).strip() if match else ""
+        return StubResponse(json.dumps(self.classifier(log_message)))
@@ -0,0 +1,331 @@
+import argparse
+import asyncio
+import queue
+import random
+import re
+import socket
+import threading
+import time
+from datetime import datetime
+import metrics
+from risk_identification import iter_dashboard_logs, load_gemini, load_local_model
+
+# Frames buffered between the network and the batcher; UDP drops and TCP waits once it is full
+FRAME_QUEUE_SIZE = 100000
+
+# Batches handed to classification at once, and how long a partial batch may wait
+RECEIVER_BATCH_SIZE = 2000
+RECEIVER_BATCH_SECONDS = 0.5
+
+# Batches waiting for classification; a slow classifier stops the batcher rather than piling up
+BATCH_QUEUE_SIZE = 4
+
+# How often the batcher retries a full batch queue; it waits on the loop so stopping never hangs on it
+BATCH_QUEUE_POLL_SECONDS = 0.05
+
+# Kernel receive buffer requested for the UDP socket, to ride out bursts between loop iterations
+UDP_RECEIVE_BUFFER = 8 * 1024 * 1024
+
+# <PRI>1 TIMESTAMP HOSTNAME APP-NAME PROCID MSGID STRUCTURED-DATA MSG
+RFC5424_PATTERN = re.compile(
+    r"<(?P<pri>\d{1,3})>1 (?P<timestamp>\S+) (?P<host>\S+) (?P<app>\S+) (?P<procid>\S+) (?P<msgid>\S+) "
+    r"(?P<sd>-|(?:\[(?:[^\]\\]|\\.)*\])+)(?: (?P<msg>.*))?$",
+    re.DOTALL
+)
+# <PRI>Mmm dd hh:mm:ss HOSTNAME TAG[PID]: MSG
+RFC3164_PATTERN = re.compile(
+    r"<(?P<pri>\d{1,3})>(?P<timestamp>[A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2}) (?P<host>\S+) "
+    r"(?:(?P<app>[^\s:\[]+)(?:\[(?P<procid>[^\]]*)\])?: ?)?(?P<msg>.*)$",
+    re.DOTALL
+)
+PRI_PATTERN = re.compile(r"<(?P<pri>\d{1,3})>(?P<msg>.*)$", re.DOTALL)
+
+def parse_syslog(frame):
+    """Parse an RFC 5424 or RFC 3164 frame into its fields; anything else is kept as the message."""
+    frame = frame.rstrip("\r\n\x00")
+    for pattern in (RFC5424_PATTERN, RFC3164_PATTERN, PRI_PATTERN):
+        match = pattern.match(frame)
+        if match:
+            fields = match.groupdict()
+            pri = int(fields.pop('pri'))
+            fields['facility'], fields['priority'] = divmod(pri, 8)
+            fields['msg'] = fields.get('msg') or ""
+            return fields
+    return {'msg': frame}
+
+def syslog_line(fields):
+    """Render parsed fields as the single log line the classification pipeline reads.
+
+    The sender's timestamp leads the line so extract_timestamps finds it; RFC 5424's "-"
+    (no timestamp) leaves the ingestion time to be used instead.
+    """
+    parts = []
+    timestamp = fields.get('timestamp')
+    if timestamp and timestamp != "-":
+        parts.append(timestamp)
+    host = fields.get('host')
+    if host and host != "-":
+        parts.append(host)
+    app = fields.get('app')
+    if app and app != "-":
+        parts.append(f"{app}:")
+    parts.append(fields['msg'].strip())
+    return " ".join(parts)
+
+class SyslogUDPProtocol(asyncio.DatagramProtocol):
+    """One syslog frame per datagram; UDP cannot push back, so a full queue drops the frame."""
+
+    def __init__(self, receiver):
+        self.receiver = receiver
+
+    def connection_made(self, transport):
+        sock = transport.get_extra_info("socket")
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, UDP_RECEIVE_BUFFER)
+        except OSError as e:
+            print(f"Could not enlarge the syslog UDP receive buffer: {e}")
+
+    def datagram_received(self, data, addr):
+        self.receiver.offer(data, "udp")
+
+class SyslogReceiver(threading.Thread):
+    """Background thread listening for syslog over UDP and TCP and publishing classified rows.
+
+    Frames are read on an asyncio loop into a bounded queue. A batcher groups them and hands the
+    batches to a classification thread, which parses them and runs them through
+    iter_dashboard_logs before appending the rows to the repository; keeping parsing off the loop
+    lets it drain sockets quickly. When classification falls behind, TCP senders are slowed by
+    flow control and UDP frames are dropped and counted.
+    """
+
+    def __init__(self, repository, host="0.0.0.0", udp_port=514, tcp_port=514, model=None,
+                 queue_size=FRAME_QUEUE_SIZE, batch_size=RECEIVER_BATCH_SIZE, batch_seconds=RECEIVER_BATCH_SECONDS):
+        super().__init__(name="syslog-receiver", daemon=True)
+        self.repository = repository
+        self.host = host
+        self.udp_port = udp_port
+        self.tcp_port = tcp_port
+        self.model = model
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.frames = None
+        self.loop = None
+        self.batches = queue.Queue(maxsize=BATCH_QUEUE_SIZE)
+        self.ready = threading.Event()
+        self.stopping = None
+        self.received = 0
+        self.dropped = 0
+        self.published = 0
+        self.failed = 0
+
+    def offer(self, frame, transport):
+        """Queue a raw frame without waiting; returns False if it had to be dropped."""
+        try:
+            self.frames.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            metrics.SYSLOG_DROPPED.inc(transport=transport)
+            return False
+        self.received += 1
+        metrics.SYSLOG_RECEIVED.inc(transport=transport)
+        return True
+
+    async def handle_tcp(self, reader, writer):
+        """Read frames from one TCP connection, with octet-counting or newline framing (RFC 6587)."""
+        try:
+            while True:
+                first = await reader.read(1)
+                if not first:
+                    break
+                if first.isdigit():
+                    # Octet counting: "LEN SP FRAME"
+                    length = int(first + await reader.readuntil(b" "))
+                    frame = await reader.readexactly(length)
+                else:
+                    frame = first + await reader.readline()
+                # Waiting here when the queue is full stops reading, so TCP flow control slows the sender
+                await self.frames.put(frame)
+                self.received += 1
+                metrics.SYSLOG_RECEIVED.inc(transport="tcp")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, ConnectionError) as e:
+            print(f"Closing syslog TCP connection: {e}")
+        finally:
+            writer.close()
+
+    async def batch_frames(self):
+        """Group queued frames into batches by size or age and pass them to the classifier thread."""
+        while True:
+            batch = [await self.frames.get()]
+            deadline = self.loop.time() + self.batch_seconds
+            while len(batch) < self.batch_size:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.frames.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            metrics.SYSLOG_QUEUE_DEPTH.set(self.frames.qsize())
+            # Waits while the classifier is behind; polling keeps the wait cancellable, unlike a
+            # blocking put on an executor thread that would hold up shutdown
+            while True:
+                try:
+                    self.batches.put_nowait(batch)
+                    break
+                except queue.Full:
+                    await asyncio.sleep(BATCH_QUEUE_POLL_SECONDS)
+
+    def classify_batches(self):
+        """Classification thread: parse batches, run them through the dashboard pipeline and publish the rows.
+
+        Without an API key the rows come from the cache, local model and rules, as in the file worker.
+        The stream has no end to budget Gemini time against, so requests are bounded by their timeout
+        and the circuit breaker alone. A batch that fails to classify is counted and discarded, and the
+        pipeline is started again for the next one, so one bad batch does not stop the receiver publishing.
+        """
+        model = self.model if self.model is not None else load_gemini()
+        local_model = load_local_model()
+        batches = iter(self.batches.get, None)
+        current = []
+
+        def chunks():
+            for batch in batches:
+                current[:] = batch
+                yield [syslog_line(parse_syslog(frame.decode("utf-8", errors="replace"))) for frame in batch]
+
+        while True:
+            try:
+                rows = iter_dashboard_logs(chunks(), model, local_model=local_model, deadline_seconds=None)
+                for dashboard_logs in rows:
+                    self.repository.append(dashboard_logs)
+                    self.published += len(dashboard_logs)
+                    current.clear()
+                return
+            except Exception as e:
+                print(f"Error classifying syslog batch: {e}")
+                # A failure before any batch was read still discards one, so the queue keeps draining
+                failed = current or next(batches, None)
+                if failed is None:
+                    return
+                self.failed += len(failed)
+                metrics.SYSLOG_FAILED.inc(len(failed))
+                current.clear()
+
+    async def serve(self):
+        self.loop = asyncio.get_running_loop()
+        self.frames = asyncio.Queue(maxsize=self.queue_size)
+        self.stopping = asyncio.Event()
+        transports = []
+        if self.udp_port is not None:
+            transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: SyslogUDPProtocol(self), local_addr=(self.host, self.udp_port)
+            )
+            transports.append(transport)
+        server = None
+        if self.tcp_port is not None:
+            server = await asyncio.start_server(self.handle_tcp, self.host, self.tcp_port)
+        batcher = asyncio.create_task(self.batch_frames())
+        self.ready.set()
+        try:
+            await self.stopping.wait()
+        finally:
+            batcher.cancel()
+            for transport in transports:
+                transport.close()
+            if server is not None:
+                server.close()
+                await server.wait_closed()
+
+    def run(self):
+        classifier = threading.Thread(target=self.classify_batches, name="syslog-classifier", daemon=True)
+        classifier.start()
+        try:
+            asyncio.run(self.serve())
+        except Exception as e:
+            print(f"Error in syslog receiver: {e}")
+        finally:
+            self.ready.set()
+            self.batches.put(None)
+
+    def stop(self):
+        """Close the listeners; lines already queued for classification are still published."""
+        if self.loop is not None and self.stopping is not None:
+            self.loop.call_soon_threadsafe(self.stopping.set)
+
+def format_frame(log, rfc=5424, host="loadtest", app="pinto"):
+    """Wrap a log line as a syslog frame (facility user, severity info), for load testing."""
+    now = datetime.now()
+    if rfc == 3164:
+        return f"<14>{now:%b} {now.day:2d} {now:%H:%M:%S} {host} {app}: {log}"
+    return f"<14>1 {now.isoformat(timespec='milliseconds')} {host} {app} - - - {log}"
+
+def send_load(host, port, lines, rate, seconds, transport="udp", rfc=5424):
+    """Send frames built from lines at about rate messages per second; returns the number sent."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM if transport == "udp" else socket.SOCK_STREAM)
+    if transport == "tcp":
+        sock.connect((host, port))
+    sent = 0
+    start = time.perf_counter()
+    try:
+        while time.perf_counter() - start < seconds:
+            # Send in small bursts and sleep off any lead over the target rate
+            for _ in range(100):
+                frame = format_frame(random.choice(lines), rfc).encode()
+                if transport == "udp":
+                    sock.sendto(frame, (host, port))
+                else:
+                    sock.sendall(f"{len(frame)} ".encode() + frame)
+                sent += 1
+            lead = sent / rate - (time.perf_counter() - start)
+            if lead > 0:
+                time.sleep(lead)
+    finally:
+        sock.close()
+    return sent
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Receive syslog over UDP/TCP, or load test a receiver.")
+    parser.add_argument("mode", choices=["serve", "send", "loadtest"],
+                        help="serve: listen and classify; send: send frames; loadtest: both on localhost")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--udp-port", type=int, default=5514)
+    parser.add_argument("--tcp-port", type=int, default=5514)
+    parser.add_argument("--transport", choices=["udp", "tcp"], default="udp", help="transport used when sending")
+    parser.add_argument("--rfc", type=int, choices=[3164, 5424], default=5424, help="frame format when sending")
+    parser.add_argument("--rate", type=float, default=20000, help="messages per second when sending")
+    parser.add_argument("--seconds", type=float, default=10, help="how long to send or serve")
+    parser.add_argument("--sample", default="syslogs.txt", help="log lines to send")
+    parser.add_argument("--stub-latency", type=float,
+                        help="classify with a StubModel of this latency instead of Gemini")
+    args = parser.parse_args()
+
+    if args.mode in ("serve", "loadtest"):
+        from log_repository import LogRepository
+        from stub_model import StubModel
+        model = StubModel(latency=args.stub_latency) if args.stub_latency is not None else None
+        repository = LogRepository()
+        receiver = SyslogReceiver(repository, args.host, args.udp_port, args.tcp_port, model=model)
+        receiver.start()
+        receiver.ready.wait()
+
+    if args.mode == "serve":
+        time.sleep(args.seconds)
+    elif args.mode in ("send", "loadtest"):
+        with open(args.sample) as file:
+            sample = [line.strip() for line in file if line.strip()]
+        port = args.udp_port if args.transport == "udp" else args.tcp_port
+        started = time.perf_counter()
+        sent = send_load(args.host, port, sample, args.rate, args.seconds, args.transport, args.rfc)
+        elapsed = time.perf_counter() - started
+        print(f"Sent {sent} {args.transport} frames in {elapsed:.1f}s ({sent / elapsed:.0f}/s)")
+
+    if args.mode in ("serve", "loadtest"):
+        # Give queued lines a moment to be classified before reporting
+        deadline = time.time() + 30
+        while receiver.published < receiver.received and time.time() < deadline:
+            time.sleep(0.2)
+        receiver.stop()
+        print(f"Received {receiver.received}, dropped {receiver.dropped}, failed {receiver.failed}, "
+              f"published {receiver.published} "
+              f"({repository.count('All')} rows in the repository)")
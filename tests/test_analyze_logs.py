@@ -0,0 +1,70 @@
+import time
+import pytest
+import risk_identification
+from risk_identification import RateLimiter, analyze_log_file, analyze_logs, fallback_classification
+from local_classifier import LocalClassifier
+from stub_model import StubModel
+
+LOGS = [f"router-{i} port {i % 7} down after high latency on link {i}" if i % 3 else f"user {i} login success"
+        for i in range(60)]
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(risk_identification, "RETRY_BASE_DELAY", 0.0)
+
+@pytest.mark.parametrize("concurrency, batch_size", [(1, 1), (8, 1), (4, 7)])
+def test_results_keep_input_order(concurrency, batch_size):
+    model = StubModel(latency=0.01, jitter=0.02, seed=1)
+    _, analyzed = analyze_logs(LOGS, model, concurrency=concurrency, batch_size=batch_size)
+    assert [row['log'] for row in analyzed] == LOGS
+    assert model.calls == -(-len(LOGS) // batch_size)
+    for row in analyzed:
+        assert row['tier'] == 'gemini'
+        assert row['severity'] == fallback_classification(row['log'])['severity']
+
+@pytest.mark.parametrize("threshold, tier", [(0.0, 'local'), (1.1, 'gemini')])
+def test_only_unsure_lines_reach_gemini(threshold, tier):
+    local_model = LocalClassifier.train(LOGS, [fallback_classification(log) for log in LOGS], threshold=threshold)
+    model = StubModel(latency=0)
+    _, analyzed = analyze_logs(LOGS, model, local_model=local_model)
+    assert model.calls == (len(LOGS) if tier == 'gemini' else 0)
+    assert [row['tier'] for row in analyzed] == [tier] * len(LOGS)
+
+def test_transient_failures_are_retried():
+    model = StubModel(latency=0, failure_rate=0.3, seed=5)
+    _, analyzed = analyze_logs(LOGS, model, concurrency=4, max_retries=8)
+    assert model.failures > 0
+    # Every failed attempt was followed by another until the line was answered
+    assert model.calls == len(LOGS) + model.failures
+    assert [row['tier'] for row in analyzed] == ['gemini'] * len(LOGS)
+
+def test_rate_limit_holds_across_calls():
+    limiter = RateLimiter(requests_per_minute=1200)
+    model = StubModel(latency=0)
+    started = time.monotonic()
+    for chunk in (LOGS[:4], LOGS[4:8]):
+        analyze_logs(chunk, model, concurrency=4, rate_limiter=limiter)
+    # Eight requests spaced 50ms apart; a limiter per call would let each chunk's first one through at once
+    assert model.calls == 8
+    assert time.monotonic() - started >= 7 * 0.05
+
+def test_failures_past_the_retries_fall_back():
+    model = StubModel(latency=0, failure_rate=1.0, seed=5)
+    _, analyzed = analyze_logs(LOGS, model, concurrency=4, max_retries=1)
+    assert model.calls == 2 * len(LOGS)
+    assert [row['tier'] for row in analyzed] == ['fallback'] * len(LOGS)
+    assert [row['severity'] for row in analyzed] == [fallback_classification(log)['severity'] for log in LOGS]
+
+def test_timeout_falls_back_within_the_deadline():
+    model = StubModel(latency=5)
+    _, analyzed = analyze_logs(LOGS[:3], model, timeout=0.05, deadline=time.monotonic() + 1)
+    assert [row['tier'] for row in analyzed] == ['fallback'] * 3
+
+def test_deadline_covers_the_whole_file(tmp_path):
+    path = tmp_path / "syslogs.txt"
+    path.write_text("".join(log + "\n" for log in LOGS[:10]))
+    started = time.monotonic()
+    chunks = list(analyze_log_file(str(path), StubModel(latency=5), chunk_size=1, deadline_seconds=0.3, timeout=0.2))
+    # Ten chunks with a deadline each would take about two seconds
+    assert time.monotonic() - started < 1
+    assert [row['tier'] for rows in chunks for row in rows] == ['fallback'] * 10
@@ -0,0 +1,73 @@
+import threading
+import time
+from risk_identification import CircuitBreaker, analyze_logs
+from stub_model import StubModel
+
+def open_breaker(reset_seconds):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=reset_seconds)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.available() and not breaker.allow()
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+def test_probe_success_closes():
+    breaker = open_breaker(reset_seconds=0)
+    assert breaker.available()
+    assert breaker.allow()
+    assert breaker.state == "half-open"
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_probe_failure_reopens():
+    breaker = open_breaker(reset_seconds=0.2)
+    time.sleep(0.2)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+def test_callers_during_the_probe_wait_for_its_outcome():
+    breaker = open_breaker(reset_seconds=0)
+    assert breaker.allow()
+    answers = []
+    waiters = [
+        threading.Thread(target=lambda: answers.append(breaker.allow(time.monotonic() + 5))) for _ in range(3)
+    ]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.1)
+    assert not answers
+    breaker.record_success()
+    for waiter in waiters:
+        waiter.join(5)
+    assert answers == [True, True, True]
+
+def test_waiting_for_the_probe_stops_at_the_deadline():
+    breaker = open_breaker(reset_seconds=0)
+    assert breaker.allow()
+    started = time.monotonic()
+    assert not breaker.allow(started + 0.1)
+    assert time.monotonic() - started < 1
+
+def test_outage_costs_threshold_requests_not_one_per_line():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+    model = StubModel(latency=0, failure_rate=1.0)
+    logs = [f"device {i} unreachable from core {i}" for i in range(100)]
+    _, analyzed = analyze_logs(logs, model, breaker=breaker)
+    assert model.calls == 3
+    assert breaker.state == "open"
+    assert {row['tier'] for row in analyzed} == {'fallback'}
@@ -0,0 +1,41 @@
+import sqlite3
+import time
+from classification_cache import ClassificationCache
+
+RESULT = {'severity': 'Warning', 'suggestion': 'check the link', 'explanation': 'port down'}
+
+def test_hits_do_not_hold_the_write_lock(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first = ClassificationCache(path)
+    first.put("port <NUM> down", RESULT)
+    assert first.get("port <NUM> down") == RESULT
+    # A second process sharing the cache can write right after the hit
+    second = sqlite3.connect(path, timeout=0.1)
+    second.execute("INSERT INTO templates VALUES ('disk <NUM> full', '{}', 0)")
+    second.commit()
+    second.close()
+    first.close()
+
+def test_recency_of_hits_survives_eviction(tmp_path):
+    cache = ClassificationCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put("old", RESULT)
+    time.sleep(0.01)
+    cache.put("newer", RESULT)
+    time.sleep(0.01)
+    cache.get("old")
+    cache.put("newest", RESULT)
+    assert cache.get("old") == RESULT
+    assert cache.get("newer") is None
+    cache.close()
+
+def test_recency_is_written_on_close(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ClassificationCache(path)
+    cache.put("port <NUM> down", RESULT)
+    stored = cache.conn.execute("SELECT last_used FROM templates").fetchone()[0]
+    time.sleep(0.01)
+    cache.get("port <NUM> down")
+    cache.close()
+    reopened = ClassificationCache(path)
+    assert reopened.conn.execute("SELECT last_used FROM templates").fetchone()[0] > stored
+    reopened.close()
@@ -0,0 +1,32 @@
+import random
+import pytest
+from benchmark import MIXED_PHRASES, legacy_fallback_classification
+from generate_syslogs import generate_syslogs
+from risk_identification import ANOMALY_PATTERNS, ROOT_CAUSES, fallback_classification, read_logs
+
+def rule_phrases():
+    """Every rule's two halves joined, so each pattern (and each root cause) is hit on its own."""
+    for pattern in list(ROOT_CAUSES) + [p for patterns in ANOMALY_PATTERNS.values() for p in patterns]:
+        yield pattern.replace(".*", " then ")
+
+def test_matches_legacy_on_generated_logs(tmp_path):
+    path = tmp_path / "syslogs.txt"
+    generate_syslogs(str(path), num_logs=2000, seed=3)
+    for log in read_logs(str(path)):
+        assert fallback_classification(log) == legacy_fallback_classification(log), log
+
+@pytest.mark.parametrize("log", MIXED_PHRASES + list(rule_phrases()))
+def test_matches_legacy_when_several_rules_apply(log):
+    assert fallback_classification(log) == legacy_fallback_classification(log)
+
+def test_matches_legacy_on_shuffled_rule_combinations():
+    # Several rule phrases in one line, in any order and case, check severity and root cause priority
+    rng = random.Random(11)
+    phrases = list(rule_phrases()) + ["login ok", "disk full", "fan speed normal"]
+    for _ in range(500):
+        words = rng.sample(phrases, rng.randint(1, 4))
+        log = " and ".join(word.upper() if rng.random() < 0.3 else word for word in words)
+        assert fallback_classification(log) == legacy_fallback_classification(log), log
+
+def test_unmatched_line_is_info():
+    assert fallback_classification("nothing to see here")['severity'] == 'Info'
@@ -0,0 +1,86 @@
+import time
+import pandas as pd
+import pytest
+import ingestion_worker
+from ingestion_worker import IngestionWorker
+from log_repository import LogRepository
+from log_tailer import LogTailer
+from risk_identification import fallback_classification
+from stub_model import StubModel
+
+def fallback_rows(templates):
+    return [
+        {'log': template, 'severity': 'Warning', 'suggestion': 'rule', 'explanation': 'rule',
+         'timestamp': pd.Timestamp("2024-11-01"), 'template': template, 'tier': 'fallback'}
+        for template in templates
+    ]
+
+def test_unanswered_templates_back_off_instead_of_blocking_the_rest(monkeypatch):
+    sent = []
+
+    def reclassify_templates(samples, model=None):
+        sent.append(sorted(samples))
+        # Gemini never answers for the "stuck" templates
+        return {
+            template: {'severity': 'Info', 'suggestion': 'ok', 'explanation': 'ok', 'tier': 'gemini'}
+            for template in samples if not template.startswith("stuck")
+        }
+
+    monkeypatch.setattr(ingestion_worker, "reclassify_templates", reclassify_templates)
+    monkeypatch.setattr(ingestion_worker, "RECLASSIFY_BATCH_SIZE", 2)
+    repository = LogRepository()
+    repository.append(fallback_rows(["stuck 1", "stuck 2", "fine 1", "fine 2", "fine 3"]))
+    worker = IngestionWorker(repository, tailer=None, model=StubModel(latency=0))
+    for _ in range(4):
+        worker.reclassify_fallbacks()
+
+    assert sent == [["stuck 1", "stuck 2"], ["fine 1", "fine 2"], ["fine 3"]]
+    assert list(repository.fallback_templates(10)) == ["stuck 1", "stuck 2"]
+    assert {template: misses for template, (misses, _) in worker.reclassify_backoff.items()} == {
+        "stuck 1": 1, "stuck 2": 1
+    }
+
+def test_backed_off_templates_are_retried_once_their_wait_passes(monkeypatch):
+    sent = []
+
+    def reclassify_templates(samples, model=None):
+        sent.append(list(samples))
+        return {}
+
+    monkeypatch.setattr(ingestion_worker, "reclassify_templates", reclassify_templates)
+    monkeypatch.setattr(ingestion_worker, "RECLASSIFY_RETRY_SECONDS", 0.0)
+    repository = LogRepository()
+    repository.append(fallback_rows(["stuck"]))
+    worker = IngestionWorker(repository, tailer=None, model=StubModel(latency=0))
+    worker.reclassify_fallbacks()
+    worker.reclassify_fallbacks()
+    assert sent == [["stuck"], ["stuck"]]
+    assert worker.reclassify_backoff["stuck"][0] == 2
+
+def test_without_gemini_fallback_rows_are_left_alone(monkeypatch):
+    monkeypatch.setattr(ingestion_worker, "reclassify_templates", lambda samples, model: pytest.fail("sent"))
+    repository = LogRepository()
+    repository.append(fallback_rows(["stuck"]))
+    IngestionWorker(repository, tailer=None).reclassify_fallbacks()
+    assert list(repository.fallback_templates(10)) == ["stuck"]
+
+LINES = ["2024-11-01 10:00:00 router-1 port 3 down", "2024-11-01 10:00:01 user 7 login success"]
+
+def test_without_an_api_key_lines_are_still_classified(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+    (tmp_path / "syslogs.txt").write_text("".join(line + "\n" for line in LINES))
+    repository = LogRepository()
+    worker = IngestionWorker(repository, LogTailer("syslogs.txt"), poll_seconds=0.05)
+    worker.start()
+    try:
+        deadline = time.monotonic() + 5
+        while repository.count('All') < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        worker.stop()
+        worker.join(5)
+    assert worker.model is None
+    rows = repository.page('All', 0, 2)
+    assert rows['tier'].tolist() == ['fallback', 'fallback']
+    assert rows['severity'].tolist() == [fallback_classification(line)['severity'] for line in LINES]
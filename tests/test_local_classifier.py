@@ -0,0 +1,22 @@
+import pytest
+from local_classifier import LocalClassifier
+
+LOGS = ["port 1 down on router-1", "disk sda full", "user 7 login success", "port 9 down on router-3"]
+LABELS = [
+    {'severity': severity, 'suggestion': f"handle {severity}", 'explanation': "gemini"}
+    for severity in ["Warning", "Critical", "Info", "Warning"]
+]
+
+def test_confident_predictions_match_the_training_labels():
+    model = LocalClassifier.train(LOGS, LABELS, threshold=0.5)
+    for result, label in zip(model.classify(LOGS), LABELS):
+        assert result is None or result['severity'] == label['severity']
+    assert any(result is not None for result in model.classify(LOGS))
+
+def test_single_severity_labels_are_rejected():
+    with pytest.raises(ValueError):
+        LocalClassifier.train(LOGS, [dict(label, severity="Info") for label in LABELS])
+
+def test_single_severity_model_escalates_everything():
+    model = LocalClassifier(["Info"])
+    assert model.classify(LOGS) == [None] * len(LOGS)
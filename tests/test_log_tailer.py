@@ -0,0 +1,66 @@
+import os
+from log_tailer import LogTailer
+
+def write(path, text, mode="a"):
+    with open(path, mode) as file:
+        file.write(text)
+
+def test_reads_only_complete_new_lines(tmp_path):
+    path = tmp_path / "syslog"
+    write(path, "one\ntwo\nthr")
+    tailer = LogTailer(str(path))
+    assert tailer.read_new_lines() == ["one", "two"]
+    assert tailer.read_new_lines() == []
+    write(path, "ee\nfour\n")
+    assert tailer.read_new_lines() == ["three", "four"]
+
+def test_rotation_drains_the_old_file_then_follows_the_new_one(tmp_path):
+    path = tmp_path / "syslog"
+    write(path, "old 1\n")
+    tailer = LogTailer(str(path))
+    assert tailer.read_new_lines() == ["old 1"]
+    write(path, "old 2\n")
+    os.rename(path, tmp_path / "syslog.1")
+    write(path, "new 1\n", "w")
+    assert tailer.read_new_lines() == ["old 2", "new 1"]
+    write(path, "new 2\n")
+    assert tailer.read_new_lines() == ["new 2"]
+
+def test_truncation_starts_again_from_the_beginning(tmp_path):
+    path = tmp_path / "syslog"
+    write(path, "a long first line\nanother long line\n")
+    tailer = LogTailer(str(path))
+    tailer.read_new_lines()
+    write(path, "short\n", "w")
+    assert tailer.read_new_lines() == ["short"]
+
+def test_copytruncate_rewritten_past_the_offset_is_noticed(tmp_path):
+    path = tmp_path / "syslog"
+    write(path, "first\n")
+    tailer = LogTailer(str(path))
+    assert tailer.read_new_lines() == ["first"]
+    # Truncated in place and written beyond the old size before the next poll
+    write(path, "rewritten line one\nrewritten line two\n", "w")
+    assert tailer.read_new_lines() == ["rewritten line one", "rewritten line two"]
+
+def test_checkpoint_resumes_without_rereading(tmp_path):
+    path = tmp_path / "syslog"
+    checkpoint = tmp_path / "tail.json"
+    write(path, "one\ntwo\n")
+    tailer = LogTailer(str(path), str(checkpoint))
+    assert tailer.read_new_lines() == ["one", "two"]
+    tailer.close()
+    write(path, "three\n")
+    resumed = LogTailer(str(path), str(checkpoint))
+    assert resumed.read_new_lines() == ["three"]
+
+def test_checkpoint_of_a_rotated_file_starts_the_new_file_from_the_beginning(tmp_path):
+    path = tmp_path / "syslog"
+    checkpoint = tmp_path / "tail.json"
+    write(path, "one\n")
+    tailer = LogTailer(str(path), str(checkpoint))
+    tailer.read_new_lines()
+    tailer.close()
+    os.rename(path, tmp_path / "syslog.1")
+    write(path, "fresh\n", "w")
+    assert LogTailer(str(path), str(checkpoint)).read_new_lines() == ["fresh"]
@@ -0,0 +1,21 @@
+import pytest
+from metrics import Counter, Histogram
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Test latency.", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, stage="read")
+    assert histogram.render().splitlines()[2:] == [
+        'test_seconds_bucket{stage="read",le="0.1"} 1',
+        'test_seconds_bucket{stage="read",le="1.0"} 3',
+        'test_seconds_bucket{stage="read",le="+Inf"} 4',
+        'test_seconds_sum{stage="read"} 4.05',
+        'test_seconds_count{stage="read"} 4',
+    ]
+
+def test_counter_escapes_label_values_and_checks_names():
+    counter = Counter("test_errors_total", "Test errors.", ["error"])
+    counter.inc(error='bad "quote"\n')
+    assert counter.render().splitlines()[-1] == 'test_errors_total{error="bad \\"quote\\"\\n"} 1'
+    with pytest.raises(ValueError):
+        counter.inc(kind="batch")
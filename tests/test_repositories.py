@@ -0,0 +1,165 @@
+import os
+import random
+import pandas as pd
+import pytest
+import log_repository
+from log_repository import SEVERITIES, LogRepository
+from log_store import LogStore
+
+START = pd.Timestamp("2024-11-01")
+WORDS = ["port", "down", "dns", "resolution", "failed", "high", "latency", "login", "success", "disk"]
+
+def make_rows(count, seed=0):
+    """Rows with repeating templates and timestamps slightly out of ingestion order."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        template = " ".join(rng.sample(WORDS, 3)) + f" on host-<NUM> unit {rng.randint(0, 9)}"
+        rows.append({
+            'log': template.replace("<NUM>", str(i)),
+            'severity': rng.choice(SEVERITIES),
+            'suggestion': f"suggestion {rng.randint(0, 4)}",
+            'explanation': f"explanation {rng.randint(0, 4)}",
+            'timestamp': START + pd.Timedelta(minutes=i) + pd.Timedelta(seconds=rng.randint(-600, 600)),
+            'template': template,
+            'tier': rng.choice(["gemini", "cache", "fallback"])
+        })
+    return rows
+
+FILTERS = [
+    (severity, since, query)
+    for severity in ['All'] + SEVERITIES
+    for since in [None, START + pd.Timedelta(hours=3)]
+    for query in [None, "dns", '"high latency"', "port failed"]
+]
+
+def snapshot(repository, limit=25):
+    """Everything the dashboard reads, in plain values so both repositories compare equal."""
+    views = {}
+    for severity, since, query in FILTERS:
+        total, unique, latest = repository.stats(severity, since, query)
+        groups = repository.groups(severity, 0, limit, since, query)
+        first = groups['template'].iloc[0] if len(groups) else None
+        views[(severity, since, query)] = {
+            'count': repository.count(severity, since, query),
+            'stats': (total, unique, None if latest is None else pd.Timestamp(latest)),
+            'series': repository.series(severity, since, query).astype({'timestamp': 'datetime64[ns]'}).to_dict('list'),
+            'group_count': repository.group_count(severity, since, query),
+            'groups': [
+                (row.template, row.count, pd.Timestamp(row.first_seen), pd.Timestamp(row.last_seen), row.severity)
+                for row in groups.itertuples()
+            ],
+            'page': repository.page(severity, 5, 5 + limit, since, query)['log'].tolist(),
+            'members': repository.members(first, severity, limit, since, query)['log'].tolist() if first else [],
+        }
+    return views
+
+@pytest.fixture
+def store(tmp_path):
+    return LogStore(str(tmp_path / "logs.db"))
+
+def append_in_batches(repository, rows, sizes=(1, 17, 250, 3, 400)):
+    position = 0
+    while position < len(rows):
+        for size in sizes:
+            repository.append(rows[position:position + size])
+            position += size
+
+def test_memory_and_sqlite_agree(store):
+    rows = make_rows(1500)
+    memory = LogRepository()
+    append_in_batches(memory, rows)
+    append_in_batches(store, rows)
+    assert snapshot(memory) == snapshot(store)
+    assert [memory.get(i)['log'] for i in (0, 700, 1499)] == [store.get(i + 1)['log'] for i in (0, 700, 1499)]
+    assert memory.tail(40)['log'].tolist() == store.tail(40)['log'].tolist() == [row['log'] for row in rows[-40:]]
+
+def test_reclassification_agrees(store):
+    rows = make_rows(800, seed=2)
+    memory = LogRepository()
+    memory.append(rows)
+    store.append(rows)
+    # Both sample each template's earliest fallback row
+    assert memory.fallback_templates(1000) == store.fallback_templates(1000)
+    samples = memory.fallback_templates(10)
+    results = {
+        template: {'severity': 'Critical', 'suggestion': 'new suggestion', 'explanation': 'new explanation',
+                   'tier': 'gemini'}
+        for template in samples
+    }
+    updated = memory.reclassify(results)
+    assert updated == store.reclassify(results) > 0
+    assert not set(samples) & set(memory.fallback_templates(1000))
+    assert snapshot(memory) == snapshot(store)
+
+def test_fallback_templates_skip_excluded(store):
+    rows = make_rows(300, seed=4)
+    memory = LogRepository()
+    memory.append(rows)
+    store.append(rows)
+    for repository in (memory, store):
+        everything = repository.fallback_templates(1000)
+        skipped = set(list(everything)[:3])
+        samples = repository.fallback_templates(5, exclude=skipped)
+        assert len(samples) == 5
+        assert not skipped & set(samples)
+        assert all(everything[template] == log for template, log in samples.items())
+
+def test_phrase_needs_words_in_order(store):
+    rows = make_rows(300, seed=1)
+    memory = LogRepository()
+    memory.append(rows)
+    store.append(rows)
+    expected = [row['log'] for row in rows if "high latency" in row['log']]
+    assert expected and len(expected) < sum("high" in row['log'] and "latency" in row['log'] for row in rows)
+    for repository in (memory, store):
+        assert repository.page('All', 0, len(rows), query='"high latency"')['log'].tolist() == expected
+
+def test_read_only_store_attaches_to_the_writer(tmp_path):
+    path = str(tmp_path / "logs.db")
+    reader = LogStore(path, read_only=True)
+    assert reader.count('All') == 0
+    assert not os.path.exists(path)
+    LogStore(path).append(make_rows(10), checkpoint=("syslogs.txt", (1, 2), 640))
+    assert reader.count('All') == 10
+    assert reader.load_checkpoint("syslogs.txt") == ((1, 2), 640)
+
+def test_checkpoint_survives_reopen(tmp_path):
+    path = str(tmp_path / "logs.db")
+    LogStore(path).append(make_rows(10), checkpoint=("syslogs.txt", (1, 2), 640))
+    reopened = LogStore(path)
+    assert reopened.count('All') == 10
+    assert reopened.load_checkpoint("syslogs.txt") == ((1, 2), 640)
+
+@pytest.mark.parametrize("block_rows", [16, 64, log_repository.BLOCK_ROWS])
+def test_eviction_matches_a_repository_of_the_kept_rows(monkeypatch, block_rows):
+    monkeypatch.setattr(log_repository, "BLOCK_ROWS", block_rows)
+    rows = make_rows(1200, seed=3)
+    bounded = LogRepository(max_rows=300)
+    append_in_batches(bounded, rows)
+    fresh = LogRepository()
+    fresh.append(rows[-300:])
+
+    assert bounded.count('All') == 300
+    assert snapshot(bounded) == snapshot(fresh)
+    assert bounded.get(len(rows) - 301) is None
+    assert bounded.get(len(rows) - 300)['log'] == rows[-300]['log']
+    assert bounded.tail(5)['log'].tolist() == [row['log'] for row in rows[-5:]]
+    # Whole blocks are dropped, so at most one partly evicted block is held beyond max_rows
+    held = sum(len(frame) for frame in bounded.blocks.frames)
+    assert held < 300 + 2 * block_rows
+
+def test_eviction_then_reclassification(monkeypatch):
+    monkeypatch.setattr(log_repository, "BLOCK_ROWS", 32)
+    rows = make_rows(500, seed=5)
+    bounded = LogRepository(max_rows=200)
+    append_in_batches(bounded, rows)
+    fresh = LogRepository()
+    fresh.append(rows[-200:])
+    results = {
+        template: {'severity': 'Info', 'suggestion': 'ok', 'explanation': 'ok', 'tier': 'gemini'}
+        for template in fresh.fallback_templates(5)
+    }
+    assert bounded.fallback_templates(5) == fresh.fallback_templates(5)
+    assert bounded.reclassify(results) == fresh.reclassify(results)
+    assert snapshot(bounded) == snapshot(fresh)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from log_repository import SEVERITIES, LogRepository
+from log_store import LogStore
+
+START = pd.Timestamp("2024-11-01")
+BACKGROUND = [("Info", "user <NUM> login success"), ("Info", "disk <NUM> checked"),
+              ("Warning", "high latency on link <NUM>"), ("Critical", "port <NUM> down")]
+BURST = ("Warning", "packet loss on link <NUM>")
+
+def make_stream(seed=0):
+    """Two hours of steady background traffic with a 200-event burst of one template after 90 minutes."""
+    rng = np.random.default_rng(seed)
+    events = []
+    for minute in range(120):
+        for severity, template in BACKGROUND:
+            for _ in range(rng.poisson(20)):
+                events.append((START + pd.Timedelta(seconds=minute * 60 + int(rng.integers(60))), severity, template))
+        if minute % 4 == 0:
+            events.append((START + pd.Timedelta(minutes=minute), *BURST))
+    for _ in range(200):
+        events.append((START + pd.Timedelta(minutes=90, seconds=int(rng.integers(180))), *BURST))
+    events.sort(key=lambda event: event[0])
+    return [
+        {'log': template.replace("<NUM>", str(i)), 'severity': severity, 'suggestion': "s", 'explanation': "e",
+         'timestamp': timestamp, 'template': template}
+        for i, (timestamp, severity, template) in enumerate(events)
+    ]
+
+def test_burst_is_flagged_once_and_backends_agree(tmp_path):
+    rows = make_stream()
+    memory = LogRepository()
+    store = LogStore(str(tmp_path / "logs.db"))
+    for start in range(0, len(rows), 500):
+        memory.append(rows[start:start + 500])
+        store.append(rows[start:start + 500])
+
+    spikes = memory.spikes('All', 10)
+    assert spikes['key'].tolist() == [BURST[1]]
+    spike = spikes.iloc[0]
+    assert spike['kind'] == 'template' and spike['severity'] == BURST[0]
+    assert spike['count'] >= 200 and spike['count'] >= 10 * spike['baseline']
+    assert spike['window_start'] <= START + pd.Timedelta(minutes=93) and spike['window_end'] >= START + pd.Timedelta(minutes=90)
+
+    for severity in ['All'] + SEVERITIES:
+        assert memory.spikes(severity, 10).to_dict('list') == store.spikes(severity, 10).to_dict('list')
@@ -0,0 +1,17 @@
+import pytest
+from syslog_receiver import parse_syslog, syslog_line
+
+@pytest.mark.parametrize("frame, line", [
+    ("<14>1 2024-11-01T10:00:00.123+02:00 router-1 pinto - - - port 3 down\n",
+     "2024-11-01T10:00:00.123+02:00 router-1 pinto: port 3 down"),
+    ('<14>1 - router-1 - - - [meta key="a\\]b"] disk full', "router-1 disk full"),
+    ("<34>Nov  1 10:00:00 router-1 sshd[42]: login failed", "Nov  1 10:00:00 router-1 sshd: login failed"),
+    ("<13>bare message", "bare message"),
+    ("no header at all", "no header at all"),
+])
+def test_frames_become_pipeline_lines(frame, line):
+    assert syslog_line(parse_syslog(frame)) == line
+
+def test_priority_splits_into_facility_and_severity():
+    fields = parse_syslog("<34>Nov  1 10:00:00 router-1 sshd[42]: login failed")
+    assert (fields['facility'], fields['priority'], fields['procid']) == (4, 2, "42")
@@ -0,0 +1,33 @@
+from datetime import datetime
+import pandas as pd
+from risk_identification import extract_timestamps
+
+NOW = datetime(2024, 11, 20, 12, 0, 0)
+
+def test_generated_and_syslog_times():
+    timestamps = extract_timestamps([
+        "2024-11-12 04:18:22 router-1 port down",
+        "Nov 12 04:18:22 host sshd[1]: login",
+        "Dec 31 23:59:59 host cron: year end",
+        "no time here",
+    ], NOW)
+    assert timestamps.tolist() == [
+        pd.Timestamp("2024-11-12 04:18:22"),
+        pd.Timestamp("2024-11-12 04:18:22"),
+        pd.Timestamp("2023-12-31 23:59:59"),
+        pd.Timestamp(NOW),
+    ]
+
+def test_rfc5424_offsets_are_converted_to_utc():
+    timestamps = extract_timestamps([
+        "2024-11-12T04:18:22.123+02:00 host app: port down",
+        "2024-11-12T04:18:22Z host app: port down",
+        "2024-11-12T04:18:22-05:30 host app: port down",
+        "2024-11-12T04:18:22 host app: port down",
+    ], NOW)
+    assert timestamps.tolist() == [
+        pd.Timestamp("2024-11-12 02:18:22"),
+        pd.Timestamp("2024-11-12 04:18:22"),
+        pd.Timestamp("2024-11-12 09:48:22"),
+        pd.Timestamp("2024-11-12 04:18:22"),
+    ]